@@ -0,0 +1,99 @@
+"""조회 응답 캐시와 ETag
+
+쓰기 경로는 커밋 전에 bump_data_version 으로 app_config 의 data_version 을 올린다.
+조회 엔드포인트는 cached_response 로 (경로, 쿼리, data_version) 별 JSON 본문을 재사용하고,
+If-None-Match 가 ETag 와 같으면 본문 없이 304 를 돌려준다.
+data_version 은 DB에 있으므로 워커 프로세스가 여러 개여도, import_csv.py 처럼
+다른 프로세스에서 쓰더라도 모든 캐시가 같은 시점에 무효화된다.
+"""
+import hashlib
+from collections import OrderedDict
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import Integer, Text, cast, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app import metrics
+from app.config import RESPONSE_CACHE_SIZE
+from app.models import AppConfig
+
+DATA_VERSION_KEY = "data_version"
+
+
+def bump_data_version(db):
+    """data_version += 1 (쓰기와 같은 트랜잭션에서 호출, 커밋은 호출자가)"""
+    stmt = sqlite_insert(AppConfig).values(key=DATA_VERSION_KEY, value="1")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={"value": cast(cast(AppConfig.value, Integer) + 1, Text)},
+    )
+    db.execute(stmt)
+
+
+async def get_data_version(db) -> str:
+    value = (await db.execute(
+        select(AppConfig.value).where(AppConfig.key == DATA_VERSION_KEY)
+    )).scalar()
+    return value or "0"
+
+
+class _ResponseCache:
+    """data_version 하나에 대한 LRU. 버전이 바뀌면 통째로 비움"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.version = None
+        self.entries = OrderedDict()
+
+    def get(self, version: str, key: tuple):
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+            return None
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, version: str, key: tuple, entry: tuple):
+        # 계산하는 사이 버전이 바뀌었으면 저장하지 않음
+        if version != self.version:
+            return
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+_caches = {}
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+async def cached_response(name: str, request: Request, db, load, *key_parts) -> Response:
+    """load() 결과(JSON으로 변환 가능한 값)를 캐시해서 ETag 와 함께 응답.
+
+    key_parts: 쿼리 외에 응답에 영향을 주는 값 (예: 기본 주차가 달라지는 현재 날짜)
+    """
+    version = await get_data_version(db)
+    cache = _caches.setdefault(name, _ResponseCache(RESPONSE_CACHE_SIZE))
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())), *key_parts)
+
+    entry = cache.get(version, key)
+    metrics.record_cache(name, entry is not None)
+    if entry is None:
+        body = ORJSONResponse(await load()).body
+        # 내용 기반 ETag: 다른 데이터가 바뀌어 버전이 올라가도 내용이 같으면 304
+        entry = (body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+        cache.put(version, key, entry)
+
+    body, etag = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
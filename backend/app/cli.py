@@ -0,0 +1,253 @@
+"""관리 작업 CLI (HTTP 없이 정산 / 가져오기 / 내보내기 / 유지보수)
+
+라우터와 같은 서비스 함수를 쓰고, 명령 하나를 세션 하나로 처리한다.
+여러 주차 정산은 주차마다 커밋하고 진행 상황과 소요 시간을 출력한다.
+backend 디렉토리에서 실행한다 (import / export 는 import_csv.py, export_data.py 를 재사용).
+
+사용 예:
+    python -m app.cli settle --week 2026-02-02                 # Gmail 최신 내보내기로 한 주 정산
+    python -m app.cli settle --start 2026-W01 --end 2026-W05 --file chat.zip
+    python -m app.cli import sheet.csv --dry-run
+    python -m app.cli export --layout sheet --year 2026 -o sheet.csv
+    python -m app.cli migrate
+    python -m app.cli reindex                                  # 검색 색인 / 멤버 통계 재계산
+    python -m app.cli analyze --vacuum                         # 변경 기록 정리 + ANALYZE (+ VACUUM)
+    python -m app.cli archive --dry-run                        # 오래된 주차 상태 보관 (옮길 행 수만 확인)
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from sqlalchemy import text
+from app import cache
+from app.services.weeks import week_label_of, week_label_to_monday, week_labels_between
+
+
+@contextmanager
+def timed(label: str):
+    """단계 이름과 소요 시간 출력"""
+    started = time.perf_counter()
+    print(f"{label} ...", flush=True)
+    yield
+    print(f"{label} 완료 ({(time.perf_counter() - started) * 1000:.1f}ms)", flush=True)
+
+
+def week_arg(value: str) -> str:
+    """주차 인자: 주차 라벨(2026-W05) 또는 그 주의 아무 날짜(2026-02-02) -> 주차 라벨"""
+    if "W" in value:
+        monday = week_label_to_monday(value)
+        if monday is None or week_label_of(monday) != value:
+            raise argparse.ArgumentTypeError(f"잘못된 주차: {value}")
+        return value
+    try:
+        return week_label_of(date.fromisoformat(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"잘못된 날짜: {value}")
+
+
+def cmd_settle(db, args):
+    from app.routers.admin import get_config
+    from app.services.settlement import SettlementError, SettlementPipeline
+    from app.services.versioning import VersionConflict
+
+    if args.week:
+        labels = [args.week]
+    elif args.start and args.end:
+        labels = week_labels_between(args.start, args.end)
+    else:
+        sys.exit("--week 또는 --start/--end 를 지정하세요.")
+    if not labels:
+        sys.exit("주차 범위가 비어 있습니다 (--start 가 --end 보다 늦음).")
+
+    manager_name = get_config(db, "manager_name") or "운영진"
+    chat_text = None  # 내보내기 본문은 한 번만 읽고 모든 주차에 재사용
+    for index, week_label in enumerate(labels, 1):
+        pipeline = SettlementPipeline(db, week_label_to_monday(week_label))
+        try:
+            if chat_text is not None:
+                pipeline.text = chat_text
+            elif args.file:
+                chat_text = pipeline.read_export(args.file)
+            else:
+                chat_text = pipeline.fetch_text()
+        except SettlementError as e:
+            sys.exit(f"정산 실패: {e}")
+
+        pipeline.parse()
+        results = pipeline.match()
+        summary = pipeline.summarize(manager_name)
+        if args.dry_run:
+            db.rollback()
+        else:
+            try:
+                pipeline.persist(summary)  # 주차마다 커밋
+            except VersionConflict as e:
+                sys.exit(f"{week_label}: 정산 중 다른 운영진이 고친 상태 {len(e.current)}행과 충돌해 반영하지 않았습니다. 다시 실행하세요.")
+        pipeline.log_timings("settlement")
+
+        counts = Counter(r["status"] for r in results)
+        stages = ", ".join(f"{t['stage']}={t['ms']:.0f}" for t in pipeline.timings)
+        print(
+            f"[{index}/{len(labels)}] {week_label}: {len(results)}명 "
+            f"({', '.join(f'{k} {v}' for k, v in sorted(counts.items()))}) "
+            f"{sum(t['ms'] for t in pipeline.timings):.1f}ms ({stages})",
+            flush=True,
+        )
+        if args.print_summary:
+            print(summary + "\n")
+    if args.dry_run:
+        print("[dry-run] DB에 반영하지 않았습니다.")
+
+
+def cmd_import(db, args):
+    import import_csv
+
+    source_key = args.source_key or import_csv.default_source_key(args.source, args.sheet_id, args.sheet_name)
+    lines = import_csv.open_source(args.source, args.sheet_id, args.sheet_name)
+    if lines is None:
+        sys.exit("구글 스프레드시트를 다운로드할 수 없습니다.")
+    try:
+        plan = import_csv.import_lines(db, lines, source_key, args.dry_run, args.full)
+    finally:
+        if lines is not sys.stdin and hasattr(lines, "close"):
+            lines.close()
+    if plan is not None:
+        import_csv.print_plan(plan)
+
+
+def cmd_export(db, args):
+    import export_data
+
+    export_data.run(args)
+
+
+def cmd_migrate(db, args):
+    from app.database import Base, engine
+    from app.migrations import current_version, run_migrations
+
+    Base.metadata.create_all(bind=engine)
+    if not run_migrations(engine, verbose=True):
+        print("적용할 마이그레이션이 없습니다.")
+    print(f"현재 버전: {current_version(engine)}")
+
+
+def cmd_reindex(db, args):
+    from app.services import member_stats, search
+
+    with timed("검색 색인 재구성"):
+        search.rebuild_index(db)
+    with timed("멤버 통계 재계산"):
+        count = member_stats.rebuild(db)
+    cache.bump_data_version(db)
+    db.commit()
+    print(f"멤버 통계 {count}명")
+
+
+def cmd_analyze(db, args):
+    from app.database import engine
+    from app.services import changes
+
+    with timed("변경 기록 정리"):
+        result = changes.compact(db)
+        db.commit()
+    print(f"중복 {result['superseded']}건, 만료 {result['expired']}건 삭제")
+
+    with timed("ANALYZE"):
+        db.execute(text("ANALYZE"))
+        db.execute(text("PRAGMA optimize"))
+        db.commit()
+
+    if args.vacuum:
+        path = engine.url.database
+        before = os.path.getsize(path) if path and os.path.exists(path) else 0
+        db.close()  # VACUUM 은 트랜잭션 밖에서
+        with timed("VACUUM"):
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
+                conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        if before:
+            print(f"DB 크기: {before:,} -> {os.path.getsize(path):,} bytes")
+
+
+def cmd_archive(db, args):
+    from app.services import archive
+
+    with timed("주차 상태 보관"):
+        moved = archive.run(db)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    print(f"탈퇴 멤버 {moved['left']}행, 닫힌 시즌({archive.season_cutoff()} 이전) {moved['season']}행")
+    if args.dry_run:
+        print("[dry-run] DB에 반영하지 않았습니다.")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    import export_data
+    import import_csv
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Corgi Check 관리 작업")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    settle = commands.add_parser("settle", help="주간 정산 (한 주 또는 범위)")
+    settle.add_argument("--week", type=week_arg, help="정산할 주 (2026-W05 또는 그 주의 날짜)")
+    settle.add_argument("--start", type=week_arg, help="범위 정산 시작 주")
+    settle.add_argument("--end", type=week_arg, help="범위 정산 마지막 주")
+    settle.add_argument("--file", help="Gmail 대신 사용할 카카오톡 내보내기 파일 (.zip / .txt)")
+    settle.add_argument("--dry-run", action="store_true", help="DB에 반영하지 않고 결과만 출력")
+    settle.add_argument("--print-summary", action="store_true", help="주차별 안내 문구 출력")
+    settle.set_defaults(handler=cmd_settle)
+
+    import_cmd = commands.add_parser("import", help="구글 스프레드시트 / CSV 가져오기 (import_csv.py 와 같은 인자)")
+    import_csv.add_arguments(import_cmd)
+    import_cmd.set_defaults(handler=cmd_import)
+
+    export_cmd = commands.add_parser("export", help="주차별 상태 / 정산 문구 내보내기 (export_data.py 와 같은 인자)")
+    export_data.add_arguments(export_cmd)
+    export_cmd.set_defaults(handler=cmd_export)
+
+    commands.add_parser("migrate", help="스키마 생성 + 마이그레이션").set_defaults(handler=cmd_migrate)
+    commands.add_parser("reindex", help="검색 색인 / 멤버 통계 재계산").set_defaults(handler=cmd_reindex)
+
+    analyze = commands.add_parser("analyze", help="변경 기록 정리 + ANALYZE")
+    analyze.add_argument("--vacuum", action="store_true", help="VACUUM 으로 파일 크기 줄이기 (DB 잠금)")
+    analyze.set_defaults(handler=cmd_analyze)
+
+    archive = commands.add_parser("archive", help="탈퇴 멤버 / 닫힌 시즌의 주차 상태를 보관 테이블로 이동")
+    archive.add_argument("--dry-run", action="store_true", help="DB에 반영하지 않고 옮길 행 수만 출력")
+    archive.set_defaults(handler=cmd_archive)
+    return parser
+
+
+def main(argv: list = None):
+    from app.database import Base, SessionLocal, engine
+    import app.models  # noqa: F401  (테이블 등록)
+
+    # import_csv / export_data 는 backend 디렉토리의 스크립트
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = build_parser().parse_args(argv)
+
+    if args.command != "migrate":
+        # 서버 시작(lifespan)과 같이 스키마를 최신으로 맞춘 뒤 실행
+        from app.migrations import run_migrations
+
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine, verbose=True)
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        args.handler(db, args)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    print(f"{args.command} 완료 ({time.perf_counter() - started:.2f}초)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,43 @@
 import os
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "..", "corgi_check.db")
-DATABASE_URL = f"sqlite:///{DB_PATH}"
+DB_PATH = os.environ.get("CORGI_CHECK_DB_PATH", os.path.join(BASE_DIR, "..", "corgi_check.db"))
+DATABASE_URL = os.environ.get("CORGI_CHECK_DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+# SQLite 연결별 PRAGMA (app/database.py)
+SQLITE_JOURNAL_MODE = os.environ.get("CORGI_CHECK_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("CORGI_CHECK_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("CORGI_CHECK_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE = int(os.environ.get("CORGI_CHECK_SQLITE_CACHE_SIZE", "-20000"))  # 음수: KiB 단위 (약 20MB)
+SQLITE_MMAP_SIZE = int(os.environ.get("CORGI_CHECK_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+READ_POOL_SIZE = int(os.environ.get("CORGI_CHECK_READ_POOL_SIZE", "8"))  # 조회 전용 커넥션 풀 크기
+
+# 요청 프로파일러 (app/profiler.py)
+PROFILING_ENABLED = os.environ.get("CORGI_CHECK_PROFILING", "0") == "1"  # 기본 꺼짐, 1 이면 미들웨어 등록
+PROFILE_DIR = os.environ.get("CORGI_CHECK_PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_MAX_FILES = 20  # 최근 프로파일 수 (pstats + collapsed 한 쌍 기준)
+PROFILE_INTERVAL = 0.001  # 샘플링 간격 (초)
+
+# 조회 응답 캐시 (app/cache.py)
+RESPONSE_CACHE_SIZE = int(os.environ.get("CORGI_CHECK_RESPONSE_CACHE_SIZE", "256"))  # 엔드포인트별 최대 항목 수
+
+# 실시간 알림 SSE (app/events.py)
+EVENT_BUFFER_SIZE = 1000  # Last-Event-ID 재전송용으로 보관하는 최근 이벤트 수
+EVENT_QUEUE_SIZE = 100  # 클라이언트별 대기 이벤트 수 (넘으면 resync)
+EVENT_KEEPALIVE_SECONDS = 15  # 이벤트가 없을 때 keepalive 주석을 보내는 간격
+
+# 변경 기록 / 증분 동기화 (app/services/changes.py)
+CHANGE_LOG_RETENTION_DAYS = int(os.environ.get("CORGI_CHECK_CHANGE_LOG_RETENTION_DAYS", "30"))  # 보관 기간
+CHANGE_LOG_MAX_ROWS = int(os.environ.get("CORGI_CHECK_CHANGE_LOG_MAX_ROWS", "200000"))  # 정리 후 최대 행 수
+CHANGE_LOG_COMPACT_EVERY = 5000  # 프로세스에서 이만큼 기록할 때마다 커밋 후 백그라운드로 정리
+CHANGES_PAGE_SIZE = 5000  # /api/changes 한 번에 처리하는 기록 수
+
+# 빌드된 프론트엔드 서빙 (app/frontend.py). dist 에 index.html 이 있을 때만 마운트
+SERVE_FRONTEND = os.environ.get("CORGI_CHECK_SERVE_FRONTEND", "1") == "1"
+FRONTEND_DIST_DIR = os.environ.get("CORGI_CHECK_FRONTEND_DIST", os.path.join(BASE_DIR, "..", "frontend", "dist"))
+# 프론트엔드를 서빙하지 않을 때(Vite 개발 서버 등) Gmail 연동 후 돌아갈 주소
+FRONTEND_ORIGIN = os.environ.get("CORGI_CHECK_FRONTEND_ORIGIN", "http://localhost:5173")
+
+# 오래된 주차 상태 보관 (app/services/archive.py)
+ARCHIVE_LEFT_AFTER_DAYS = int(os.environ.get("CORGI_CHECK_ARCHIVE_LEFT_AFTER_DAYS", "90"))  # 탈퇴 후 이 기간이 지나면 보관
+ARCHIVE_KEEP_SEASONS = int(os.environ.get("CORGI_CHECK_ARCHIVE_KEEP_SEASONS", "2"))  # 올해 포함 weekly_status 에 남기는 시즌(연도) 수
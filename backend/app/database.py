@@ -1,10 +1,85 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from app.config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.config import (
+    DATABASE_URL,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    READ_POOL_SIZE,
+)
+
+
+def is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def _install_sqlite_pragmas(engine, readonly: bool):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if readonly:
+            cursor.execute("PRAGMA query_only=ON")
+        else:
+            # journal_mode는 DB 파일에 유지되므로 쓰기 연결에서만 설정
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.close()
+
+
+def create_db_engine(url: str = DATABASE_URL, readonly: bool = False):
+    """DB 엔진 생성. SQLite면 연결마다 WAL/synchronous/busy_timeout/cache/mmap PRAGMA 적용.
+
+    readonly=True 이면 query_only 연결로 구성된 조회 전용 풀을 만든다.
+    WAL 모드에서는 조회 연결이 쓰기 트랜잭션을 기다리지 않는다.
+    """
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url)
+
+    kwargs = {}
+    if readonly and not is_memory_sqlite(url):
+        kwargs = {"pool_size": READ_POOL_SIZE, "max_overflow": READ_POOL_SIZE}
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+    _install_sqlite_pragmas(engine, readonly)
+    return engine
+
+
+def create_async_read_engine(url: str = DATABASE_URL):
+    """조회 전용 async 엔진 (SQLite는 aiosqlite 드라이버 사용)"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return create_async_engine(url)
+
+    async_engine = create_async_engine(
+        parsed.set(drivername="sqlite+aiosqlite"),
+        poolclass=AsyncAdaptedQueuePool,  # aiosqlite 기본값(NullPool)은 요청마다 새 연결을 염
+        pool_size=READ_POOL_SIZE,
+        max_overflow=READ_POOL_SIZE,
+    )
+    _install_sqlite_pragmas(async_engine.sync_engine, readonly=True)
+    return async_engine
+
+
+engine = create_db_engine(DATABASE_URL)
+# 메모리 DB는 연결마다 별도 DB가 되므로 쓰기 엔진을 그대로 사용
+read_engine = engine if is_memory_sqlite(DATABASE_URL) else create_db_engine(DATABASE_URL, readonly=True)
+# async 조회 경로: 느린 관리자 작업이 threadpool을 점유해도 조회 요청은 이벤트 루프에서 처리
+async_read_engine = create_async_read_engine(DATABASE_URL)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
+# 뷰 매핑용 (create_all 대상이 아님, 뷰는 app/migrations.py 에서 만듦)
+ViewBase = declarative_base()
 
 
 def get_db():
@@ -13,3 +88,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """조회 전용 엔드포인트용 세션 (query_only 연결 풀)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """get_read_db 의 async 버전 (async def 조회 엔드포인트용)"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
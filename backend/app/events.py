@@ -0,0 +1,131 @@
+"""상태 변경 실시간 알림 (Server-Sent Events)
+
+update_status / 정산 / 초기화가 커밋된 뒤 publish 로 이벤트를 보내면
+GET /api/status/events 를 구독 중인 클라이언트에게 바로 전달된다.
+
+- 클라이언트마다 크기가 제한된 큐(EVENT_QUEUE_SIZE)를 두고, 느린 클라이언트의 큐가 가득 차면
+  밀린 이벤트를 버리고 resync 이벤트 하나로 바꾼다 (클라이언트는 현황판을 다시 읽음).
+- 최근 EVENT_BUFFER_SIZE 개 이벤트를 보관해 Last-Event-ID 로 재연결하면 놓친 이벤트를 다시 보낸다.
+  보관 범위를 벗어났거나 서버가 재시작된 경우(id 앞부분의 부팅 구분값이 다름)는 resync.
+- 브로커는 프로세스 단위이므로 워커를 여러 개 띄우면 같은 워커에서 일어난 변경만 전달된다.
+"""
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+from app import metrics
+from app.config import EVENT_BUFFER_SIZE, EVENT_QUEUE_SIZE, EVENT_KEEPALIVE_SECONDS
+
+
+class _Subscriber:
+    def __init__(self, loop, queue_size: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+
+class EventBroker:
+    """이벤트: (id, 순번, 종류, JSON 문자열). id 는 "<부팅 구분값>-<순번>" """
+
+    def __init__(self, buffer_size: int, queue_size: int):
+        self.boot = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._seq = 0
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, data: dict):
+        """이벤트 발행. sync 엔드포인트(threadpool)에서도 호출 가능"""
+        with self._lock:
+            self._seq += 1
+            event = (
+                f"{self.boot}-{self._seq}", self._seq, event_type,
+                json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+            )
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        metrics.EVENTS_PUBLISHED.inc(type=event_type)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(self._deliver, subscriber, event)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힌 구독자
+                self.unsubscribe(subscriber)
+
+    def _deliver(self, subscriber: _Subscriber, event: tuple):
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 밀린 이벤트를 모두 버리고 resync 하나로 대체 (이 이벤트 id 부터 이어서 받음)
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(self._resync_event(event[0], event[1]))
+            metrics.EVENT_RESYNCS.inc(reason="overflow")
+
+    @staticmethod
+    def _resync_event(event_id: str, seq: int) -> tuple:
+        return (event_id, seq, "resync", "{}")
+
+    def _replay(self, last_event_id: str):
+        """last_event_id 이후 이벤트 목록. 이어서 보낼 수 없으면 None"""
+        if not last_event_id:
+            return []
+        boot, _, seq = last_event_id.rpartition("-")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._buffer[0][1] if self._buffer else self._seq + 1
+        if seq > self._seq or seq < oldest - 1:
+            return None
+        return [event for event in self._buffer if event[1] > seq]
+
+    def subscribe(self, last_event_id: str = None) -> tuple:
+        """(구독자, 재전송할 이벤트 목록). 목록 대신 resync 이벤트 하나가 올 수 있음"""
+        subscriber = _Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            replay = self._replay(last_event_id)
+            if replay is None:
+                replay = [self._resync_event(f"{self.boot}-{self._seq}", self._seq)]
+                metrics.EVENT_RESYNCS.inc(reason="cursor")
+        metrics.EVENT_SUBSCRIBERS.inc()
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        with self._lock:
+            if subscriber not in self._subscribers:
+                return
+            self._subscribers.discard(subscriber)
+        metrics.EVENT_SUBSCRIBERS.dec()
+
+    async def stream(self, request, last_event_id: str = None):
+        """text/event-stream 본문 generator"""
+        subscriber, replay = self.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            for event in replay:
+                yield format_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+def format_event(event: tuple) -> str:
+    event_id, _, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+broker = EventBroker(EVENT_BUFFER_SIZE, EVENT_QUEUE_SIZE)
+
+
+def publish(event_type: str, data: dict):
+    broker.publish(event_type, data)
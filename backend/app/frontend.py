@@ -0,0 +1,99 @@
+"""빌드된 프론트엔드(frontend/dist) 서빙
+
+`npm run build` 결과가 있으면 app.main 이 "/" 에 마운트해 API 와 같은 프로세스에서 서빙한다.
+- assets/ 아래 파일은 Vite 가 내용 해시를 붙인 이름이므로 1년 immutable 캐시,
+  index.html 등 나머지는 no-cache (ETag 로 재검증, 바뀌지 않았으면 304)
+- 빌드 시 만든 .br / .gz 가 있으면 Accept-Encoding 에 따라 그 파일을 그대로 보냄 (서버에서 압축하지 않음)
+- 파일이 아닌 경로(/status, /history/2026-W05 등 클라이언트 라우트)는 index.html 로 응답
+"""
+import mimetypes
+import os
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+IMMUTABLE_PREFIX = "assets/"  # Vite 가 해시 붙은 파일을 출력하는 디렉토리
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# (Accept-Encoding 이름, 사전 압축 파일 확장자) - 앞의 것을 우선
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+# SPA fallback 을 하지 않는 경로 (없는 API 는 index.html 이 아니라 404)
+BACKEND_PATHS = ("api", "metrics", "docs", "redoc", "openapi.json")
+
+
+def is_available(dist_dir: str) -> bool:
+    return os.path.isfile(os.path.join(dist_dir, "index.html"))
+
+
+def accepted_encodings(header: str) -> set:
+    """Accept-Encoding 에서 q=0 이 아닌 인코딩 이름"""
+    accepted = set()
+    for part in header.lower().split(","):
+        name, _, params = part.partition(";")
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name.strip():
+            accepted.add(name.strip())
+    return accepted
+
+
+class FrontendFiles(StaticFiles):
+    def __init__(self, directory: str):
+        super().__init__(directory=directory, html=True)
+
+    async def get_response(self, path: str, scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or not self._is_client_route(path):
+                raise
+        # 클라이언트 라우트: index.html (라우팅은 react-router 가 처리)
+        full_path, stat_result = self.lookup_path("index.html")
+        if stat_result is None:
+            raise HTTPException(status_code=404)
+        return self.file_response(full_path, stat_result, scope)
+
+    @staticmethod
+    def _is_client_route(path: str) -> bool:
+        first = path.split("/", 1)[0]
+        last = path.rsplit("/", 1)[-1]
+        # 확장자가 있으면 없는 정적 파일 요청 -> 404 그대로
+        return first not in BACKEND_PATHS and "." not in last
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        headers = {"Cache-Control": IMMUTABLE_CACHE if relative.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE}
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+
+        variants = []
+        for encoding, suffix in ENCODINGS:
+            try:
+                variants.append((encoding, f"{full_path}{suffix}", os.stat(f"{full_path}{suffix}")))
+            except FileNotFoundError:
+                continue
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        path, stat_result_to_send = full_path, stat_result
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, variant_path, variant_stat in variants:
+            if encoding in accepted or "*" in accepted:
+                headers["Content-Encoding"] = encoding
+                path, stat_result_to_send = variant_path, variant_stat
+                break
+
+        # ETag / Last-Modified 는 실제로 보내는 파일 기준 (인코딩별로 다름)
+        response = FileResponse(
+            path, status_code=status_code, stat_result=stat_result_to_send,
+            media_type=media_type, headers=headers,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
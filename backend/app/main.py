@@ -1,11 +1,39 @@
+import logging
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from app import frontend, metrics, profiler
+from app.config import FRONTEND_DIST_DIR, PROFILING_ENABLED, SERVE_FRONTEND
 from app.database import engine, Base
-from app.routers import auth, status, history, members, admin
+from app.migrations import run_migrations
+from app.routers import auth, status, history, members, admin, stats, changes
+from app.services.versioning import VersionConflict
 
-Base.metadata.create_all(bind=engine)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 스키마 생성 / 마이그레이션은 import 시점이 아니라 서버 시작 시 한 번
+    # (import 만 하는 도구나 --reload 감시 프로세스는 DB를 건드리지 않음)
+    started = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    logger.info(
+        "schema ready in %.1fms (migrations applied: %s)",
+        (time.perf_counter() - started) * 1000, applied or "none",
+    )
+    yield
 
-app = FastAPI(title="Corgi Check API")
+
+# dict 를 반환하는 엔드포인트도 orjson 으로 직렬화
+app = FastAPI(title="Corgi Check API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,14 +42,36 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+if PROFILING_ENABLED:
+    app.add_middleware(profiler.ProfilerMiddleware)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(status.router, prefix="/api/status", tags=["status"])
 app.include_router(history.router, prefix="/api/history", tags=["history"])
 app.include_router(members.router, prefix="/api/members", tags=["members"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
+app.include_router(changes.router, prefix="/api/changes", tags=["changes"])
+
+
+@app.exception_handler(VersionConflict)
+async def version_conflict_handler(request, exc: VersionConflict):
+    # 다른 운영진 / 정산이 먼저 고친 행: 현재 값을 함께 보내 클라이언트가 병합 후 다시 보내게 함
+    return ORJSONResponse(status_code=409, content={"detail": "version_conflict", "current": exc.current})
 
 
-@app.get("/")
 def root():
     return {"message": "Corgi Check API"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return metrics.render()
+
+
+# 빌드된 프론트엔드가 있으면 같은 프로세스에서 서빙 (API 라우트보다 뒤에 등록해야 함)
+if SERVE_FRONTEND and frontend.is_available(FRONTEND_DIST_DIR):
+    app.mount("/", frontend.FrontendFiles(FRONTEND_DIST_DIR), name="frontend")
+else:
+    app.add_api_route("/", root)
@@ -0,0 +1,242 @@
+"""Prometheus 텍스트 형식 메트릭 (외부 의존성 없는 in-process 레지스트리)
+
+- MetricsMiddleware: 라우트별 지연 시간 히스토그램, 처리 중 요청 수, 요청당 DB 쿼리 수/시간
+- SQLAlchemy Engine 이벤트: 모든 엔진의 쿼리 수/시간 집계
+- render(): /metrics 응답 본문 생성
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_registry = []
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(k, "") for k in self.labelnames)
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            items = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in self._values.items())
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+HTTP_DB_QUERIES = Histogram(
+    "http_request_db_queries", "DB queries executed per request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "DB time spent per request", ("method", "route")
+)
+
+# DB (요청 밖의 스크립트 실행 포함)
+DB_QUERIES = Counter("db_queries_total", "DB queries executed")
+DB_SECONDS = Counter("db_query_seconds_total", "Total DB query time")
+
+# Gmail / 정산
+GMAIL_API_CALLS = Counter("gmail_api_calls_total", "Gmail API calls", ("method",))
+GMAIL_BYTES = Counter("gmail_downloaded_bytes_total", "Bytes downloaded from Gmail attachments")
+PARSER_LINES = Counter("chat_parser_lines_total", "Chat export lines parsed")
+PARSER_SECONDS = Counter("chat_parser_seconds_total", "Time spent parsing chat exports")
+PARSER_LINES_PER_SECOND = Gauge("chat_parser_lines_per_second", "Parse throughput of the last chat export")
+
+# 실시간 알림 (SSE)
+EVENT_SUBSCRIBERS = Gauge("sse_subscribers", "Connected server-sent event clients")
+EVENTS_PUBLISHED = Counter("sse_events_published_total", "Events published", ("type",))
+EVENT_RESYNCS = Counter("sse_resyncs_total", "Resync signals sent to clients", ("reason",))
+
+# 변경 기록 (증분 동기화)
+CHANGE_LOG_RESYNCS = Counter("change_log_resyncs_total", "Full resync signals returned by /api/changes")
+CHANGE_LOG_PRUNED = Counter("change_log_pruned_rows_total", "Change log rows removed by compaction / retention", ("reason",))
+
+# 캐시 (hit rate = hit / (hit + miss))
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by result", ("cache", "result"))
+
+
+def record_parse(lines: int, seconds: float):
+    PARSER_LINES.inc(lines)
+    PARSER_SECONDS.inc(seconds)
+    if seconds > 0:
+        PARSER_LINES_PER_SECOND.set(round(lines / seconds, 1))
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# 요청 단위 DB 집계: [쿼리 수, 누적 시간]. 리스트를 공유하므로 threadpool에서 실행되는
+# sync 엔드포인트에서 누적한 값도 미들웨어에서 그대로 읽을 수 있다.
+_request_db_stats: ContextVar[Optional[list]] = ContextVar("request_db_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    DB_QUERIES.inc()
+    DB_SECONDS.inc(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
+
+class MetricsMiddleware:
+    """HTTP 요청별 지연 시간/상태 코드/DB 사용량 기록 (ASGI 미들웨어)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = [0, 0.0]
+        token = _request_db_stats.set(stats)
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            _request_db_stats.reset(token)
+
+            # 경로 파라미터가 들어간 실제 URL 대신 라우트 템플릿으로 집계 (라벨 수 제한)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=str(status_code))
+            HTTP_LATENCY.observe(elapsed, method=method, route=route_path)
+            HTTP_DB_QUERIES.observe(stats[0], method=method, route=route_path)
+            HTTP_DB_SECONDS.observe(stats[1], method=method, route=route_path)
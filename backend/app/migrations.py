@@ -0,0 +1,313 @@
+"""버전 기반 스키마 마이그레이션
+
+`Base.metadata.create_all` 은 새 테이블만 만들고 기존 테이블은 바꾸지 않으므로,
+기존 DB의 컬럼/인덱스 변경은 여기 MIGRATIONS 에 순서대로 추가한다.
+적용된 버전은 schema_migrations 테이블에 기록되고, 각 단계는 멱등하게 작성한다
+(create_all 로 이미 최신 스키마가 만들어진 새 DB에서도 그대로 실행됨).
+
+    python -m app.migrations            # 미적용 단계 실행
+    python -m app.migrations --status   # 현재 버전 / 미적용 단계 확인
+    python -m app.migrations --explain  # 주요 조회 쿼리의 실행 계획 확인 (인덱스를 안 쓰면 exit 1)
+    python -m app.migrations --check    # 임시 DB에 단계별로 적용하며 인덱스 적용 전 / 후 계획 확인
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime
+from sqlalchemy import MetaData, Table, create_engine, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+
+def _add_certified_columns(conn: Connection):
+    columns = {c["name"] for c in inspect(conn).get_columns("weekly_status")}
+    if "certified_date" not in columns:
+        conn.execute(text("ALTER TABLE weekly_status ADD COLUMN certified_date TEXT"))
+    if "certified_at" not in columns:
+        conn.execute(text("ALTER TABLE weekly_status ADD COLUMN certified_at TEXT"))
+
+
+def _add_lookup_indexes(conn: Connection):
+    # 주차 단위 조회 (현황판, 정산, 과거 내역)
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_weekly_status_week_member "
+        "ON weekly_status (week_label, member_id)"
+    ))
+    # 멤버 단위 조회 (연속 제외 구간 계산, 멤버별 이력)
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_weekly_status_member_week "
+        "ON weekly_status (member_id, week_label)"
+    ))
+    # 활동 멤버 목록 (이름순)
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_members_active_name "
+        "ON members (is_active, name)"
+    ))
+
+
+def _backfill_member_stats(conn: Connection):
+    from app.models import MemberQuarterStats, MemberStats
+    from app.services import member_stats
+
+    MemberStats.__table__.create(conn, checkfirst=True)
+    MemberQuarterStats.__table__.create(conn, checkfirst=True)
+    member_stats.rebuild(conn)
+
+
+def _add_summary_search(conn: Connection):
+    from app.services import search
+
+    search.create_index(conn)
+    search.rebuild_index(conn)
+
+
+def _add_change_log(conn: Connection):
+    from app.models import ChangeLog
+
+    ChangeLog.__table__.create(conn, checkfirst=True)
+
+
+def _add_chat_activity(conn: Connection):
+    from app.models import ChatActivity
+
+    ChatActivity.__table__.create(conn, checkfirst=True)
+
+
+def _add_mid_settlement_state(conn: Connection):
+    from app.models import MidSettlementState
+
+    MidSettlementState.__table__.create(conn, checkfirst=True)
+
+
+def _add_status_archive(conn: Connection):
+    from app.models import WeeklyStatusArchive
+    from app.services import archive
+
+    WeeklyStatusArchive.__table__.create(conn, checkfirst=True)
+    archive.create_view(conn)
+
+
+def _add_version_columns(conn: Connection):
+    from app.services import archive
+
+    for table in ("weekly_status", "weekly_status_archive", "members"):
+        columns = {c["name"] for c in inspect(conn).get_columns(table)}
+        if "version" not in columns:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+    # 뷰는 만들 때의 열 목록을 고정하므로 다시 만듦
+    archive.create_view(conn)
+
+
+# (버전, 설명, 적용 함수) - 버전은 1부터 빠짐없이 증가
+MIGRATIONS = [
+    (1, "weekly_status.certified_date / certified_at 컬럼 추가", _add_certified_columns),
+    (2, "weekly_status(week_label, member_id), (member_id, week_label), members(is_active, name) 인덱스", _add_lookup_indexes),
+    (3, "member_stats / member_quarter_stats 테이블 생성 및 기존 상태로 채우기", _backfill_member_stats),
+    (4, "weekly_summary 전문 검색 (FTS5 trigram) 테이블 / 트리거 생성 및 백필", _add_summary_search),
+    (5, "change_log 변경 기록 테이블 생성", _add_change_log),
+    (6, "chat_activity 멤버별 사진 이벤트 테이블 생성", _add_chat_activity),
+    (7, "mid_settlement_state 중간정산 진행 상태 테이블 생성", _add_mid_settlement_state),
+    (8, "weekly_status_archive 보관 테이블 / weekly_status_all 조회 뷰 생성", _add_status_archive),
+    (9, "weekly_status / weekly_status_archive / members.version 컬럼 추가 (낙관적 동시성 제어)", _add_version_columns),
+]
+
+# 실행 계획 확인용 주요 조회 쿼리
+# {이름: (SQL, 파라미터, 계획에 나와야 하는 인덱스, 그 인덱스를 만드는 마이그레이션 버전)}
+EXPLAIN_QUERIES = {
+    "status_by_week_member": (
+        "SELECT * FROM weekly_status WHERE week_label = :week AND member_id = :member_id",
+        {"week": "2026-W06", "member_id": 1},
+        ("ix_weekly_status_member_week",), 2,
+    ),
+    "exclude_run_by_member": (
+        "SELECT week_label FROM weekly_status "
+        "WHERE member_id = :member_id AND week_label >= :week AND status = 'exclude'",
+        {"week": "2026-W06", "member_id": 1},
+        ("ix_weekly_status_member_week",), 2,
+    ),
+    "week_detail": (
+        "SELECT * FROM weekly_status WHERE week_label = :week",
+        {"week": "2026-W06"},
+        ("ix_weekly_status_week_member",), 2,
+    ),
+    "status_weeks": (
+        "SELECT DISTINCT week_label FROM weekly_status ORDER BY week_label DESC",
+        {},
+        ("ix_weekly_status_week_member",), 2,
+    ),
+    "history_week_all": (
+        "SELECT * FROM weekly_status_all WHERE week_label = :week",
+        {"week": "2022-W06"},
+        ("ix_weekly_status_week_member", "ix_weekly_status_archive_week_member"), 8,
+    ),
+    "summary_search": (
+        "SELECT week_label FROM weekly_summary_fts WHERE weekly_summary_fts MATCH :q",
+        {"q": '"장영범"'},
+        ("weekly_summary_fts VIRTUAL TABLE INDEX",), 4,
+    ),
+    "active_members": (
+        "SELECT * FROM members WHERE is_active = 1 ORDER BY name",
+        {},
+        ("ix_members_active_name",), 2,
+    ),
+}
+# 인덱스 없이 테이블 전체를 읽는 계획 (SCAN ... USING [COVERING] INDEX 는 인덱스만 읽으므로 허용)
+FULL_SCAN = re.compile(r"^SCAN (weekly_status|members)\b(?! USING)")
+
+# 마이그레이션 이전(0단계) 스키마의 테이블과, 이후 단계에서 추가된 열 (--check 의 시작 상태)
+BASELINE_TABLES = ("members", "weekly_status", "weekly_summary", "app_config")
+ADDED_COLUMNS = {"members": ("version",), "weekly_status": ("version",)}
+
+
+def _ensure_version_table(conn: Connection):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description TEXT, applied_at TEXT)"
+    ))
+
+
+def current_version(engine: Engine) -> int:
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def pending_migrations(engine: Engine) -> list:
+    version = current_version(engine)
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def _apply(engine: Engine, version: int, description: str, step):
+    """한 단계를 버전 기록과 같은 트랜잭션으로 실행"""
+    with engine.begin() as conn:
+        step(conn)
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+            {"v": version, "d": description, "t": datetime.now().isoformat()},
+        )
+
+
+def run_migrations(engine: Engine, verbose: bool = False) -> list:
+    """미적용 단계를 순서대로 실행. 단계마다 별도 트랜잭션으로 버전까지 함께 커밋."""
+    applied = []
+    for version, description, step in pending_migrations(engine):
+        _apply(engine, version, description, step)
+        applied.append(version)
+        if verbose:
+            print(f"마이그레이션 {version} 적용: {description}")
+    return applied
+
+
+def explain_queries(engine: Engine, names=None) -> dict:
+    """EXPLAIN QUERY PLAN 결과 {쿼리 이름: [detail, ...]} (SQLite 전용)"""
+    plans = {}
+    with engine.connect() as conn:
+        for name in EXPLAIN_QUERIES if names is None else names:
+            sql, params = EXPLAIN_QUERIES[name][:2]
+            rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+            plans[name] = [row[-1] for row in rows]
+    return plans
+
+
+def plan_problems(name: str, plan: list) -> list:
+    """계획이 테이블 전체를 읽거나 기대한 인덱스를 쓰지 않으면 그 내용 목록"""
+    problems = [f"{name}: {detail}" for detail in plan if FULL_SCAN.match(detail)]
+    joined = " / ".join(plan)
+    problems += [f"{name}: {index} 미사용" for index in EXPLAIN_QUERIES[name][2] if index not in joined]
+    return problems
+
+
+def _source_table(name: str) -> str:
+    return re.search(r"FROM (\w+)", EXPLAIN_QUERIES[name][0]).group(1)
+
+
+def _create_baseline(engine: Engine):
+    """마이그레이션 이전 스키마: 원래 테이블을 이후 단계의 인덱스 / 열 없이 생성"""
+    from app.database import Base
+    import app.models  # noqa: F401  (테이블 등록)
+
+    metadata = MetaData()
+    for name in BASELINE_TABLES:
+        skipped = ADDED_COLUMNS.get(name, ())
+        Table(name, metadata, *[c._copy() for c in Base.metadata.tables[name].columns if c.name not in skipped])
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+
+
+def check_migrations(verbose: bool = False) -> list:
+    """임시 DB에 단계를 하나씩 적용하며 실행 계획 확인. 문제 목록 (비어 있으면 통과)
+
+    weekly_status / members 쿼리는 인덱스를 만드는 단계 직전에는 기대한 인덱스 없이 전체 SCAN,
+    모든 쿼리는 그 단계 직후와 마지막 단계 뒤에 plan_problems 에 걸리는 것이 없어야 한다.
+    """
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'check.db')}")
+        try:
+            _create_baseline(engine)
+            for version, description, step in MIGRATIONS:
+                names = [name for name, query in EXPLAIN_QUERIES.items() if query[3] == version]
+                # 뷰 / FTS 처럼 그 단계에서 처음 생기는 대상은 적용 전 계획이 없음
+                before = [name for name in names if _source_table(name) in BASELINE_TABLES]
+                for name, plan in explain_queries(engine, before).items():
+                    if verbose:
+                        print(f"[{version - 1}단계] {name}: {' / '.join(plan)}")
+                    if not any(FULL_SCAN.match(detail) for detail in plan) or not plan_problems(name, plan):
+                        problems.append(f"{version - 1}단계 {name}: 인덱스 적용 전인데 전체 SCAN 이 아님 ({' / '.join(plan)})")
+
+                _apply(engine, version, description, step)
+                for name, plan in explain_queries(engine, names).items():
+                    if verbose:
+                        print(f"[{version}단계] {name}: {' / '.join(plan)}")
+                    problems += [f"{version}단계 {problem}" for problem in plan_problems(name, plan)]
+
+            for name, plan in explain_queries(engine).items():
+                problems += [f"{MIGRATIONS[-1][0]}단계 {problem}" for problem in plan_problems(name, plan)]
+        finally:
+            engine.dispose()
+    return problems
+
+
+def main():
+    from app.database import Base, engine
+    import app.models  # noqa: F401  (테이블 등록)
+
+    parser = argparse.ArgumentParser(description="Corgi Check DB 마이그레이션")
+    parser.add_argument("--status", action="store_true", help="현재 버전과 미적용 단계만 출력")
+    parser.add_argument("--explain", action="store_true", help="주요 조회 쿼리의 실행 계획 확인 (문제가 있으면 exit 1)")
+    parser.add_argument("--check", action="store_true", help="임시 DB로 단계별 인덱스 적용 전 / 후 실행 계획 확인")
+    args = parser.parse_args()
+
+    if args.status:
+        print(f"현재 버전: {current_version(engine)} / 최신 버전: {MIGRATIONS[-1][0]}")
+        for version, description, _ in pending_migrations(engine):
+            print(f"- 미적용 {version}: {description}")
+        return
+
+    if args.explain:
+        problems = []
+        for name, plan in explain_queries(engine).items():
+            print(f"{name}: {' / '.join(plan)}")
+            problems += plan_problems(name, plan)
+        for problem in problems:
+            print(f"- 문제: {problem}")
+        sys.exit(1 if problems else 0)
+
+    if args.check:
+        problems = check_migrations(verbose=True)
+        for problem in problems:
+            print(f"- 문제: {problem}")
+        print("실행 계획 확인 실패" if problems else "실행 계획 확인 통과")
+        sys.exit(1 if problems else 0)
+
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine, verbose=True)
+    if not applied:
+        print("적용할 마이그레이션이 없습니다.")
+    print(f"현재 버전: {current_version(engine)}")
+
+
+if __name__ == "__main__":
+    main()
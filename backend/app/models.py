@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, LargeBinary, Text, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, ViewBase
 
 
 class Member(Base):
@@ -13,9 +13,16 @@ class Member(Base):
     left_date = Column(Text)
     left_reason = Column(Text)
     created_at = Column(Text)
+    # 낙관적 동시성 제어: ORM UPDATE 마다 조건(WHERE version = 읽은 값) + 1 (app/services/versioning.py)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     statuses = relationship("WeeklyStatus", back_populates="member")
 
+    __table_args__ = (
+        Index("ix_members_active_name", "is_active", "name"),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
 
 class WeeklyStatus(Base):
     __tablename__ = "weekly_status"
@@ -30,9 +37,57 @@ class WeeklyStatus(Base):
     certified_at = Column(Text)  # 인증 시간 (HH:MM 형식)
     is_exclude_but_certified = Column(Boolean, default=False)  # 제외됐지만 인증한 경우
     created_at = Column(Text)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Member.version 과 같음
 
     member = relationship("Member", back_populates="statuses")
 
+    # 기존 DB에는 app/migrations.py 의 마이그레이션으로 추가됨
+    __table_args__ = (
+        Index("ix_weekly_status_week_member", "week_label", "member_id"),
+        Index("ix_weekly_status_member_week", "member_id", "week_label"),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
+
+class WeeklyStatusArchive(Base):
+    """탈퇴 후 오래 지난 멤버 / 닫힌 시즌의 weekly_status 행 (app/services/archive.py)"""
+    __tablename__ = "weekly_status_archive"
+
+    id = Column(Integer, primary_key=True)
+    member_id = Column(Integer, ForeignKey("members.id"), nullable=False)
+    week_label = Column(Text, nullable=False)
+    status = Column(Text)
+    exclude_reason = Column(Text)
+    exclude_reason_detail = Column(Text)
+    certified_date = Column(Text)
+    certified_at = Column(Text)
+    is_exclude_but_certified = Column(Boolean, default=False)
+    created_at = Column(Text)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    archived_reason = Column(Text, nullable=False)  # left (탈퇴) / season (닫힌 시즌)
+    archived_at = Column(Text)
+
+    __table_args__ = (
+        Index("ix_weekly_status_archive_member_week", "member_id", "week_label"),
+        Index("ix_weekly_status_archive_week_member", "week_label", "member_id"),
+    )
+
+
+class WeeklyStatusAll(ViewBase):
+    """weekly_status + weekly_status_archive 를 이어 붙인 조회 전용 뷰 (과거 내역 / 통계 / 내보내기)"""
+    __tablename__ = "weekly_status_all"
+
+    member_id = Column(Integer, primary_key=True)
+    week_label = Column(Text, primary_key=True)
+    status = Column(Text)
+    exclude_reason = Column(Text)
+    exclude_reason_detail = Column(Text)
+    certified_date = Column(Text)
+    certified_at = Column(Text)
+    is_exclude_but_certified = Column(Boolean)
+    created_at = Column(Text)
+    version = Column(Integer)
+
 
 class WeeklySummary(Base):
     __tablename__ = "weekly_summary"
@@ -48,3 +103,85 @@ class AppConfig(Base):
 
     key = Column(Text, primary_key=True)
     value = Column(Text)
+
+
+class ImportRowHash(Base):
+    """import_csv.py 의 행별 내용 해시 (변경 없는 행 건너뛰기용)"""
+    __tablename__ = "import_row_hash"
+
+    source = Column(Text, primary_key=True)  # 시트 / 파일 구분 키
+    row_key = Column(Text, primary_key=True)  # 이름|생년
+    row_hash = Column(Text, nullable=False)
+    updated_at = Column(Text)
+
+
+class MemberStats(Base):
+    """멤버별 누적 통계 (app/services/member_stats.py 에서 상태 변경 시 증분 갱신)"""
+    __tablename__ = "member_stats"
+
+    member_id = Column(Integer, ForeignKey("members.id"), primary_key=True)
+    weeks = Column(Integer, nullable=False, default=0)  # 상태가 기록된 주 수
+    injeung = Column(Integer, nullable=False, default=0)
+    fine = Column(Integer, nullable=False, default=0)
+    penalty = Column(Integer, nullable=False, default=0)
+    exclude = Column(Integer, nullable=False, default=0)
+    current_streak = Column(Integer, nullable=False, default=0)  # 마지막 주차까지 연속 인증 (제외 주는 건너뜀)
+    best_streak = Column(Integer, nullable=False, default=0)
+    last_week = Column(Text)  # 상태가 기록된 마지막 주차
+    updated_at = Column(Text)
+
+
+class MemberQuarterStats(Base):
+    """멤버 × 분기 상태별 주 수 (연도/분기 단위 집계용)"""
+    __tablename__ = "member_quarter_stats"
+
+    member_id = Column(Integer, ForeignKey("members.id"), primary_key=True)
+    quarter = Column(Text, primary_key=True)  # 예: 2026-Q1
+    injeung = Column(Integer, nullable=False, default=0)
+    fine = Column(Integer, nullable=False, default=0)
+    penalty = Column(Integer, nullable=False, default=0)
+    exclude = Column(Integer, nullable=False, default=0)
+
+
+class ChangeLog(Base):
+    """변경 기록 (app/services/changes.py). id 가 /api/changes 의 cursor"""
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(Text, nullable=False)  # member / status / summary / reset
+    entity_key = Column(Text, nullable=False)  # member: id, status: member_id|week_label, summary: week_label
+    created_at = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index("ix_change_log_entity_key", "entity", "entity_key"),
+        # 삭제된 id 를 다시 쓰지 않도록 (cursor 가 되돌아가지 않게)
+        {"sqlite_autoincrement": True},
+    )
+
+
+class ChatActivity(Base):
+    """정산한 주의 멤버별 사진 이벤트 (app/services/activity.py)"""
+    __tablename__ = "chat_activity"
+
+    member_id = Column(Integer, ForeignKey("members.id"), primary_key=True)
+    week_label = Column(Text, primary_key=True)
+    # int16 (주 시작(월 00:00)부터 분, 사진 수) 쌍을 이어 붙인 배열
+    events = Column(LargeBinary, nullable=False)
+    photos = Column(Integer, nullable=False)  # 사진 수 합계
+
+    __table_args__ = (
+        Index("ix_chat_activity_week", "week_label"),
+    )
+
+
+class MidSettlementState(Base):
+    """주차별 중간정산 진행 상태 (이전 실행 이후 추가된 채팅만 파싱하기 위한 위치와 누적 집계)"""
+    __tablename__ = "mid_settlement_state"
+
+    week_label = Column(Text, primary_key=True)
+    message_id = Column(Text)  # 마지막으로 읽은 Gmail 메시지 id
+    text_offset = Column(Integer, nullable=False, default=0)  # 파싱을 마친 위치 (문자 수, 줄 끝)
+    anchor_hash = Column(Text)  # offset 직전 글자들의 해시 (이어진 내보내기인지 확인)
+    tally = Column(Text, nullable=False)  # parse_chat 누적 결과 JSON
+    penalty_ids = Column(Text, nullable=False)  # 직전 실행의 벌점 대상 member_id JSON 배열
+    updated_at = Column(Text)
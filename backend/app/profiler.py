@@ -0,0 +1,241 @@
+"""요청 단위 프로파일러 (관리자 전용, opt-in)
+
+`X-Profile: <관리자 비밀번호>` 헤더로 요청하면 해당 요청 하나를 샘플링 프로파일러로 실행하고
+결과를 PROFILE_DIR 에 저장한다. 비밀번호가 URL / 접근 로그에 남지 않도록 쿼리 파라미터는 받지 않는다.
+다른 요청을 프로파일링 중이면 409 profiler_busy, text/event-stream 응답은 저장하지 않고
+`X-Profile: skipped` 헤더를 붙인다.
+
+- <id>.pstats     : pstats.Stats / snakeviz 로 열 수 있는 통계 파일
+- <id>.collapsed  : flamegraph.pl / speedscope 용 collapsed stack 파일
+
+sync 엔드포인트는 threadpool 스레드에서 실행되므로 cProfile(스레드 단위) 대신
+스레드들을 주기적으로 샘플링하고, 이 요청을 실행 중인 스레드의 app 패키지 코드가 포함된 스택만 남긴다.
+- 이벤트 루프 스레드: 스택에 이 요청의 미들웨어 프레임이 있을 때
+- threadpool 스레드: 실행 중인 contextvars.Context 에 이 요청의 토큰이 있을 때
+  (run_in_threadpool 은 요청의 context 를 복사해 워커에서 context.run 으로 실행)
+"""
+import contextvars
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from app.config import PROFILE_DIR, PROFILE_MAX_FILES, PROFILE_INTERVAL
+from app.database import ReadSessionLocal
+from app.models import AppConfig
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_HEADER = b"x-profile"
+
+logger = logging.getLogger(__name__)
+
+_profile_lock = threading.Lock()
+_profile_token = contextvars.ContextVar("profile_token", default=None)
+
+
+def _runs_token(frame, token) -> bool:
+    """threadpool 워커 프레임(anyio WorkerThread.run)이 token 을 가진 context 를 실행 중인지"""
+    if frame.f_code.co_name != "run":
+        return False
+    context = frame.f_locals.get("context")
+    return isinstance(context, contextvars.Context) and context.get(_profile_token) is token
+
+
+class _Sampler(threading.Thread):
+    """interval 마다 요청을 실행 중인 스레드의 스택을 수집 (root → leaf 순서의 튜플)
+
+    request_frame: 이벤트 루프에서 요청을 실행하는 미들웨어 프레임, token: 요청의 _profile_token 값
+    """
+
+    def __init__(self, interval: float, request_frame, token):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.request_frame = request_frame
+        self.token = token
+        self.samples = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        me = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                in_app = False
+                in_request = False
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    if code.co_filename.startswith(APP_DIR) and code.co_filename != __file__:
+                        in_app = True
+                    if not in_request and (frame is self.request_frame or _runs_token(frame, self.token)):
+                        in_request = True
+                    frame = frame.f_back
+                if in_app and in_request:
+                    self.samples[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def _frame_label(func: tuple) -> str:
+    filename, lineno, name = func
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+
+def _write_collapsed(path: str, samples: Counter):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(";".join(_frame_label(func) for func in stack) + f" {count}\n")
+
+
+def _write_pstats(path: str, samples: Counter, interval: float):
+    """샘플을 pstats 형식 {func: (cc, nc, tt, ct, callers)} 로 변환해 저장.
+
+    호출 횟수 대신 샘플 수를 쓰고, 시간은 샘플 수 × 샘플링 간격으로 추정한다.
+    """
+    stats = {}
+    for stack, count in samples.items():
+        for func in set(stack):
+            cc, nc, tt, ct, callers = stats.get(func, (0, 0, 0.0, 0.0, {}))
+            stats[func] = (cc + count, nc + count, tt, ct + count * interval, callers)
+        leaf = stack[-1]
+        cc, nc, tt, ct, callers = stats[leaf]
+        stats[leaf] = (cc, nc, tt + count * interval, ct, callers)
+        for caller, callee in zip(stack, stack[1:]):
+            callers = stats[callee][4]
+            callers[caller] = callers.get(caller, 0) + count
+    with open(path, "wb") as f:
+        marshal.dump(stats, f)
+
+
+def _prune(directory: str, keep: int):
+    """가장 최근 keep 개 프로파일만 남기고 삭제"""
+    ids = sorted({os.path.splitext(name)[0] for name in os.listdir(directory)}, reverse=True)
+    for profile_id in ids[keep:]:
+        for ext in (".pstats", ".collapsed"):
+            path = os.path.join(directory, profile_id + ext)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _save(samples: Counter, method: str, path: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{method}_{slug}"
+    _write_pstats(os.path.join(PROFILE_DIR, profile_id + ".pstats"), samples, PROFILE_INTERVAL)
+    _write_collapsed(os.path.join(PROFILE_DIR, profile_id + ".collapsed"), samples)
+    _prune(PROFILE_DIR, PROFILE_MAX_FILES)
+    return profile_id
+
+
+def list_profiles() -> list:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        path = os.path.join(PROFILE_DIR, name)
+        if name.endswith((".pstats", ".collapsed")) and os.path.isfile(path):
+            profiles.append({
+                "name": name,
+                "size": os.path.getsize(path),
+                "created_at": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(),
+            })
+    return profiles
+
+
+def get_profile_path(name: str):
+    """목록에 있는 파일만 허용 (경로 조작 방지)"""
+    if name not in {p["name"] for p in list_profiles()}:
+        return None
+    return os.path.join(PROFILE_DIR, name)
+
+
+def _requested_password(scope):
+    for key, value in scope["headers"]:
+        if key == PROFILE_HEADER:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_event_stream(message) -> bool:
+    for key, value in message.get("headers", []):
+        if key.lower() == b"content-type":
+            return value.startswith(b"text/event-stream")
+    return False
+
+
+def _is_admin_password(password: str) -> bool:
+    db = ReadSessionLocal()
+    try:
+        config = db.query(AppConfig).filter(AppConfig.key == "admin_password").first()
+        return bool(config and config.value) and config.value == password
+    finally:
+        db.close()
+
+
+class ProfilerMiddleware:
+    """프로파일 요청이 아닌 경우 헤더 확인 외에는 아무 일도 하지 않음"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        password = _requested_password(scope)
+        if password is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await run_in_threadpool(_is_admin_password, password):
+            response = JSONResponse({"detail": "invalid_password"}, status_code=401)
+            await response(scope, receive, send)
+            return
+
+        # 샘플링 오버헤드가 서로의 측정에 섞이지 않도록 동시에 하나의 요청만 프로파일링
+        if not _profile_lock.acquire(blocking=False):
+            response = JSONResponse({"detail": "profiler_busy"}, status_code=409)
+            await response(scope, receive, send)
+            return
+
+        token = object()
+        reset = _profile_token.set(token)
+        sampler = _Sampler(PROFILE_INTERVAL, sys._getframe(), token)
+        started = time.perf_counter()
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start" and _is_event_stream(message):
+                # SSE 는 연결이 끝날 때까지 응답이 이어지므로 프로파일하지 않고 잠금을 바로 놓음
+                streaming = True
+                sampler.stop()
+                _profile_lock.release()
+                message = {**message, "headers": [*message.get("headers", []), (PROFILE_HEADER, b"skipped")]}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile_token.reset(reset)
+            if not streaming:
+                sampler.stop()
+                try:
+                    profile_id = await run_in_threadpool(_save, sampler.samples, scope["method"], scope["path"])
+                    logger.info(
+                        "profiled %s %s in %.1fms -> %s",
+                        scope["method"], scope["path"], (time.perf_counter() - started) * 1000, profile_id,
+                    )
+                finally:
+                    _profile_lock.release()
@@ -1,26 +1,19 @@
 import os
-from datetime import date, timedelta
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import RedirectResponse
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, RedirectResponse
 from pydantic import BaseModel
+from typing import Optional
 from sqlalchemy.orm import Session
+from app.config import FRONTEND_DIST_DIR, FRONTEND_ORIGIN, SERVE_FRONTEND
 from app.database import get_db
-from app.models import AppConfig, Member, WeeklyStatus, WeeklySummary
-from app.services import gmail, chat_parser
+from app.models import AppConfig, ChatActivity, MidSettlementState, WeeklyStatus, WeeklyStatusArchive, WeeklySummary
+from app import cache, events, frontend, profiler
+from app.services import changes, gmail, member_stats
+from app.services.settlement import SettlementPipeline, SettlementError
 
 router = APIRouter()
 
-DAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
-
-EXCLUDE_LABELS = {
-    'illness': '질병',
-    'travel': '여행',
-    'business': '출장',
-    'injury': '부상',
-    'surgery': '수술',
-    'custom': '직접쓰기',
-}
-
 
 class PasswordSet(BaseModel):
     password: str
@@ -32,6 +25,7 @@ class ManagerSet(BaseModel):
 
 class SettlementRequest(BaseModel):
     week_start: str  # 월요일 날짜 YYYY-MM-DD
+    include_timings: bool = False  # 단계별 소요 시간 포함 여부
 
 
 class ResetRequest(BaseModel):
@@ -53,9 +47,14 @@ def get_config(db: Session, key: str):
     return config.value if config else None
 
 
-def _format_date(d: date) -> str:
-    dn = DAY_NAMES[d.weekday()]
-    return f"{d.year}-{d.month:02d}-{d.day:02d}({dn})"
+def require_admin(
+    x_admin_password: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """X-Admin-Password 헤더로 관리자 비밀번호 검증"""
+    saved_password = get_config(db, "admin_password")
+    if not saved_password or saved_password != x_admin_password:
+        raise HTTPException(status_code=401, detail="invalid_password")
 
 
 @router.post("/password")
@@ -88,7 +87,9 @@ def gmail_auth_url():
 @router.get("/gmail/callback")
 def gmail_callback(code: str = Query(...), db: Session = Depends(get_db)):
     gmail.handle_callback(code, db)
-    return RedirectResponse(url="http://localhost:5173/admin?gmail=connected")
+    # 빌드된 프론트엔드를 같은 서버에서 서빙하면 상대 경로, 아니면 FRONTEND_ORIGIN
+    served = SERVE_FRONTEND and frontend.is_available(FRONTEND_DIST_DIR)
+    return RedirectResponse(url=("" if served else FRONTEND_ORIGIN) + "/admin?gmail=connected")
 
 
 @router.get("/gmail/status")
@@ -106,252 +107,74 @@ def gmail_disconnect(db: Session = Depends(get_db)):
 
 @router.post("/settlement")
 def run_settlement(body: SettlementRequest, db: Session = Depends(get_db)):
-    if not gmail.is_connected(db):
-        return {"error": "Gmail not connected"}
-
     monday = date.fromisoformat(body.week_start)
-    sunday = monday + timedelta(days=6)
-
-    message = gmail.find_latest_chat_mail(db)
-    if not message:
-        return {"error": "No Kakaotalk_Chat mail found"}
-
-    zip_path = gmail.download_attachment(db, message)
-    if not zip_path:
-        return {"error": "No zip attachment found"}
-
-    text = chat_parser.unzip_and_read(zip_path)
-    if not text:
-        return {"error": "No txt file found in zip"}
-
-    photo_counts = chat_parser.parse_chat(text, monday, sunday)
+    pipeline = SettlementPipeline(db, monday)
 
-    members = db.query(Member).filter(Member.is_active == True).all()
-
-    # 해당 주차의 weekly_status 조회
-    iso = monday.isocalendar()
-    week_label = f"{iso[0]}-W{iso[1]:02d}"
-    statuses = db.query(WeeklyStatus).filter(
-        WeeklyStatus.week_label == week_label
-    ).all()
-    ws_map = {ws.member_id: ws for ws in statuses}
+    try:
+        pipeline.fetch_text()
+    except SettlementError as e:
+        return {"error": str(e)}
 
-    results = chat_parser.build_result(photo_counts, members, ws_map)
+    pipeline.parse()
+    results = pipeline.match()
 
     # 안내 문구 생성
     manager_name = get_config(db, "manager_name") or "운영진"
-    summary = _build_summary(results, monday, sunday, manager_name)
-
-    # WeeklyStatus에 정산 결과 저장
-    from datetime import datetime
-    now_iso = datetime.now().isoformat()
-
-    for result in results:
-        if result["member_id"] is None:
-            continue  # DB에 없는 멤버는 스킵
-
-        # 기존 WeeklyStatus 조회
-        existing_ws = db.query(WeeklyStatus).filter(
-            WeeklyStatus.member_id == result["member_id"],
-            WeeklyStatus.week_label == week_label
-        ).first()
-
-        if existing_ws:
-            # 기존 데이터 업데이트 (제외 상태가 아니면 정산 결과로 덮어쓰기)
-            if existing_ws.status != "exclude":
-                existing_ws.status = result["status"]
-                existing_ws.exclude_reason = result["exclude_reason"]
-                existing_ws.exclude_reason_detail = result["exclude_reason_detail"]
-                existing_ws.certified_date = result.get("certified_date")
-                existing_ws.certified_at = result.get("certified_at")
-                existing_ws.is_exclude_but_certified = False
-            else:
-                existing_ws.is_exclude_but_certified = result.get("is_exclude_but_certified", False)
-        else:
-            # 새로운 데이터 생성
-            new_ws = WeeklyStatus(
-                member_id=result["member_id"],
-                week_label=week_label,
-                status=result["status"],
-                exclude_reason=result["exclude_reason"],
-                exclude_reason_detail=result["exclude_reason_detail"],
-                certified_date=result.get("certified_date"),
-                certified_at=result.get("certified_at"),
-                is_exclude_but_certified=result.get("is_exclude_but_certified", False),
-                created_at=now_iso
-            )
-            db.add(new_ws)
-
-    # WeeklySummary에 저장 (과거 내역용)
-    from app.models import WeeklySummary
-
-    existing_summary = db.query(WeeklySummary).filter(
-        WeeklySummary.week_label == week_label
-    ).first()
-
-    if existing_summary:
-        # 기존 데이터 업데이트
-        existing_summary.summary_text = summary
-    else:
-        # 새로운 데이터 생성
-        new_summary = WeeklySummary(
-            week_label=week_label,
-            summary_text=summary,
-            created_at=now_iso
-        )
-        db.add(new_summary)
+    summary = pipeline.summarize(manager_name)
 
-    db.commit()
+    # WeeklyStatus / WeeklySummary 에 정산 결과 저장
+    pipeline.persist(summary)
+    pipeline.log_timings("settlement")
 
-    return {
+    response = {
         "results": results,
         "summary": summary,
         "period": {
             "start": body.week_start,
-            "end": sunday.isoformat(),
+            "end": pipeline.sunday.isoformat(),
         },
     }
-
-
-def _build_summary(results: list, start: date, end: date, manager_name: str) -> str:
-    total = len(results)
-    injeung_list = [r for r in results if r["status"] == "injeung"]
-    exclude_list = [r for r in results if r["status"] == "exclude"]
-    fine_list = [r for r in results if r["status"] == "fine"]
-    penalty_list = [r for r in results if r["status"] == "penalty"]
-    exclude_but_certified_list = [r for r in results if r.get("is_exclude_but_certified", False)]
-
-    # 생년→가나다 순 정렬 함수 (2000년대생 고려)
-    def sort_by_birth_name(lst):
-        def birth_sort_key(birth_prefix):
-            # 빈 값 처리
-            if not birth_prefix:
-                return (9999, "")
-            # 2자리 숫자를 4자리로 변환 (00-29 → 2000-2029, 30-99 → 1930-1999)
-            year_2digit = int(birth_prefix)
-            if year_2digit <= 29:
-                return (2000 + year_2digit, birth_prefix)
-            else:
-                return (1900 + year_2digit, birth_prefix)
-
-        return sorted(lst, key=lambda r: (birth_sort_key(r["birth_prefix"])[0], r["name"]))
-
-    lines = []
-    lines.append(f"집계 기간: {_format_date(start)} ~ {_format_date(end)}")
-    lines.append("")
-    lines.append(
-        f"총 인원: {total}명, "
-        f"인증 인원: {len(injeung_list)}명, "
-        f"미인증 인원: {len(fine_list) + len(penalty_list)}명, "
-        f"인증 제외 인원: {len(exclude_list)}명"
-    )
-    lines.append("")
-
-    if exclude_list:
-        sorted_exclude = sort_by_birth_name(exclude_list)
-        names = []
-        for r in sorted_exclude:
-            label = r["birth_prefix"] + r["name"]
-            # custom인 경우 상세 내용 표시, 아니면 매핑된 라벨 사용
-            if r["exclude_reason"] == "custom":
-                reason = r.get("exclude_reason_detail") or "기타"
-            else:
-                reason = EXCLUDE_LABELS.get(r["exclude_reason"], "")
-            if reason:
-                label += f"({reason})"
-            names.append(label)
-        lines.append(f"인증 제외 인원 ({len(exclude_list)}명): {', '.join(names)}")
-    else:
-        lines.append("인증 제외 인원이 없습니다.")
-    lines.append("")
-
-    # 제외됐지만 인증한 인원 (있을 때만 표시)
-    if exclude_but_certified_list:
-        sorted_certified = sort_by_birth_name(exclude_but_certified_list)
-        names = [r["birth_prefix"] + r["name"] for r in sorted_certified]
-        lines.append(f"인증 제외됐지만 인증한 인원 ({len(exclude_but_certified_list)}명): {', '.join(names)} 😎")
-        lines.append("")
-
-    if fine_list:
-        sorted_fine = sort_by_birth_name(fine_list)
-        names = [r["birth_prefix"] + r["name"] for r in sorted_fine]
-        lines.append(f"벌금 납부 인원 ({len(fine_list)}명): {', '.join(names)} 💰")
-    else:
-        lines.append("벌금 납부 인원이 없습니다.")
-    lines.append("")
-
-    if penalty_list:
-        sorted_penalty = sort_by_birth_name(penalty_list)
-        names = [r["birth_prefix"] + r["name"] for r in sorted_penalty]
-        lines.append(f"벌점 대상 인원 ({len(penalty_list)}명): {', '.join(names)} 😭")
-    else:
-        lines.append("벌점 대상 인원이 없습니다. 👍")
-    lines.append("")
-
-    lines.append(f"궁금한 사항은 담당 운영진 {manager_name}에게 문의 바랍니다.")
-
-    return "\n".join(lines)
+    if body.include_timings:
+        response["timings"] = pipeline.timings
+    return response
 
 
 @router.post("/mid-settlement")
 def run_mid_settlement(body: SettlementRequest, db: Session = Depends(get_db)):
-    if not gmail.is_connected(db):
-        return {"error": "Gmail not connected"}
-
     monday = date.fromisoformat(body.week_start)
-    sunday = monday + timedelta(days=6)
-
-    message = gmail.find_latest_chat_mail(db)
-    if not message:
-        return {"error": "No Kakaotalk_Chat mail found"}
-
-    zip_path = gmail.download_attachment(db, message)
-    if not zip_path:
-        return {"error": "No zip attachment found"}
+    pipeline = SettlementPipeline(db, monday)
 
-    text = chat_parser.unzip_and_read(zip_path)
-    if not text:
-        return {"error": "No txt file found in zip"}
-
-    photo_counts = chat_parser.parse_chat(text, monday, sunday)
-
-    members = db.query(Member).filter(Member.is_active == True).all()
-
-    iso = monday.isocalendar()
-    week_label = f"{iso[0]}-W{iso[1]:02d}"
-    statuses = db.query(WeeklyStatus).filter(
-        WeeklyStatus.week_label == week_label
-    ).all()
-    ws_map = {ws.member_id: ws for ws in statuses}
-
-    results = chat_parser.build_result(photo_counts, members, ws_map)
+    # 이전 중간정산 이후 추가된 채팅만 파싱 (같은 메일이면 다운로드도 생략)
+    state = pipeline.load_mid_state()
+    try:
+        pipeline.fetch_text(known_message_id=state.message_id if state else None)
+    except SettlementError as e:
+        return {"error": str(e)}
 
-    # 중간정산은 벌점 대상자만 포함 (벌금은 이미 납부했으므로 제외)
-    penalty_members = [r for r in results if r["status"] == "penalty"]
+    pipeline.parse_incremental()
+    pipeline.match()
+    summary = pipeline.summarize_mid()
+    newly_cleared = pipeline.save_mid_state()
+    pipeline.log_timings("mid-settlement")
 
-    # 생년→가나다 순 정렬 함수 (2000년대생 고려)
-    def sort_by_birth_name(lst):
-        def birth_sort_key(birth_prefix):
-            # 빈 값 처리
-            if not birth_prefix:
-                return (9999, "")
-            # 2자리 숫자를 4자리로 변환 (00-29 → 2000-2029, 30-99 → 1930-1999)
-            year_2digit = int(birth_prefix)
-            if year_2digit <= 29:
-                return (2000 + year_2digit, birth_prefix)
-            else:
-                return (1900 + year_2digit, birth_prefix)
+    response = {"summary": summary, "newly_cleared": newly_cleared}
+    if body.include_timings:
+        response["timings"] = pipeline.timings
+    return response
 
-        return sorted(lst, key=lambda r: (birth_sort_key(r["birth_prefix"])[0], r["name"]))
 
-    sorted_penalty = sort_by_birth_name(penalty_members)
-    names = [r["birth_prefix"] + r["name"] for r in sorted_penalty]
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+def get_profiles():
+    """최근 요청 프로파일 목록 (최신순)"""
+    return profiler.list_profiles()
 
-    lines = []
-    lines.append("[알림] 태그되신 분들은 현재 시간 기준 아직 인증이 되지 않았거나 벌금을 납부하지 않은 것으로 확인 됩니다. 오늘 자정까지 늦지 않게 인증 또는 증빙 또는 벌금 납부 해주시기 바랍니다 ~")
-    lines.append(", ".join(names))
 
-    return {"summary": "\n".join(lines)}
+@router.get("/profiles/{name}", dependencies=[Depends(require_admin)])
+def download_profile(name: str):
+    path = profiler.get_profile_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="profile_not_found")
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
 
 
 @router.post("/reset")
@@ -360,15 +183,25 @@ def reset_all_data(body: ResetRequest, db: Session = Depends(get_db)):
     # 비밀번호 검증
     saved_password = get_config(db, "admin_password")
     if not saved_password or saved_password != body.password:
-        from fastapi import HTTPException
         raise HTTPException(status_code=401, detail="Invalid password")
 
     # WeeklyStatus 모든 데이터 삭제
     db.query(WeeklyStatus).delete()
+    db.query(WeeklyStatusArchive).delete()
 
     # WeeklySummary 모든 데이터 삭제
     db.query(WeeklySummary).delete()
 
+    # 사진 업로드 시간대 / 중간정산 진행 상태 삭제
+    db.query(ChatActivity).delete()
+    db.query(MidSettlementState).delete()
+
+    # 멤버별 통계 초기화
+    member_stats.clear(db)
+    changes.record_reset(db)
+    cache.bump_data_version(db)
+
     db.commit()
+    events.publish("reset", {})
 
     return {"success": True}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.config import CHANGES_PAGE_SIZE
+from app.database import get_async_read_db
+from app.services import changes
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_changes(
+    since: Optional[int] = None,
+    limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=CHANGES_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """since(cursor) 이후 바뀐 멤버 / 주차별 상태 / 정산 문구
+
+    since 없이 부르거나 cursor 가 너무 오래됐으면 {"resync": true, "cursor": ...}:
+    전체를 다시 읽은 뒤 돌려받은 cursor 부터 이어서 조회한다.
+    has_more 가 true 면 돌려받은 cursor 로 바로 다시 조회.
+    """
+    return ORJSONResponse(await changes.changes_since(db, since, limit))
@@ -1,60 +1,290 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import WeeklyStatus, WeeklySummary, Member
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import cache
+from app.database import get_async_read_db
+from app.models import Member, WeeklyStatus, WeeklyStatusAll, WeeklyStatusArchive, WeeklySummary
+from app.services import export, search
+from app.services.weeks import week_labels_between, year_week_range
 
 router = APIRouter()
 
+# 주차 상태 표(matrix)의 상태 코드. 0 = 기록 없음
+STATUS_CODES = {"injeung": 1, "fine": 2, "penalty": 3, "exclude": 4}
+STATUS_LEGEND = {"0": "none", **{str(code): status for status, code in STATUS_CODES.items()}}
+MATRIX_MAX_WEEKS = 53 * 5
+MATRIX_MAX_MEMBERS = 1000
+
 
 @router.get("/weeks")
-def get_weeks(db: Session = Depends(get_db)):
-    rows = (
-        db.query(WeeklySummary.week_label)
+async def get_weeks(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return await cache.cached_response("history_weeks", request, db, lambda: load_weeks(db))
+
+
+async def load_weeks(db: AsyncSession) -> list:
+    rows = await db.execute(
+        select(WeeklySummary.week_label)
         .order_by(WeeklySummary.week_label.desc())
-        .all()
     )
-    return [r[0] for r in rows]
+    return rows.scalars().all()
 
 
 @router.get("/status-weeks")
-def get_status_weeks(db: Session = Depends(get_db)):
-    rows = (
-        db.query(WeeklyStatus.week_label)
-        .distinct()
-        .order_by(WeeklyStatus.week_label.desc())
-        .all()
+async def get_status_weeks(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return await cache.cached_response("history_status_weeks", request, db, lambda: load_status_weeks(db))
+
+
+async def load_status_weeks(db: AsyncSession) -> list:
+    # 뷰에 DISTINCT 를 걸면 두 테이블을 모두 펼쳐 정렬하므로 테이블별 인덱스로 주차만 모아 합침
+    weeks = union(
+        select(WeeklyStatus.week_label).distinct(),
+        select(WeeklyStatusArchive.week_label).distinct(),
+    ).subquery()
+    rows = await db.execute(select(weeks.c.week_label).order_by(weeks.c.week_label.desc()))
+    return rows.scalars().all()
+
+
+@router.get("/matrix")
+async def get_history_matrix(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    year: Optional[int] = None,
+    after_id: int = 0,
+    limit: int = Query(200, ge=1, le=MATRIX_MAX_MEMBERS),
+    include_left: bool = True,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """멤버 × 주차 상태 표. start/end(주차 라벨) 또는 year 로 범위 지정 (기본: 올해).
+
+    멤버는 id 순 keyset 페이지네이션: 응답의 next_after_id 를 after_id 로 넘기면 다음 페이지.
+    statuses[i] 는 weeks[i] 주차의 상태 코드 (legend 참고).
+    """
+    if start or end:
+        if not (start and end):
+            raise HTTPException(status_code=400, detail="start_and_end_required")
+    else:
+        start, end = year_week_range(year or date.today().year)
+
+    weeks = week_labels_between(start, end)
+    if not weeks:
+        raise HTTPException(status_code=400, detail="invalid_week_range")
+    if len(weeks) > MATRIX_MAX_WEEKS:
+        raise HTTPException(status_code=400, detail="week_range_too_large")
+
+    # 행 수가 많으므로 ORM 결과 처리를 거치지 않는 Core 커넥션으로 조회
+    conn = await db.connection()
+
+    # 1) 멤버 한 페이지 (limit + 1 개를 읽어 다음 페이지 여부 판단)
+    member_query = select(Member.id, Member.name, Member.birth_date, Member.is_active).where(Member.id > after_id)
+    if not include_left:
+        member_query = member_query.where(Member.is_active == True)
+    members = (await conn.execute(
+        member_query.order_by(Member.id).limit(limit + 1)
+    )).all()
+    next_after_id = members[limit - 1].id if len(members) > limit else None
+    members = members[:limit]
+
+    # 2) 해당 멤버들의 주차 범위 상태를 한 번에 조회
+    week_index = {wl: i for i, wl in enumerate(weeks)}
+    grid = {m.id: [0] * len(weeks) for m in members}
+    if members:
+        rows = await conn.execute(
+            select(WeeklyStatusAll.member_id, WeeklyStatusAll.week_label, WeeklyStatusAll.status)
+            .where(
+                WeeklyStatusAll.member_id.in_(list(grid)),
+                WeeklyStatusAll.week_label >= weeks[0],
+                WeeklyStatusAll.week_label <= weeks[-1],
+            )
+        )
+        for member_id, wl, status in rows:
+            idx = week_index.get(wl)
+            if idx is not None:
+                grid[member_id][idx] = STATUS_CODES.get(status, 0)
+
+    # 큰 응답이므로 jsonable_encoder 를 거치지 않고 바로 직렬화
+    return ORJSONResponse({
+        "weeks": weeks,
+        "legend": STATUS_LEGEND,
+        "members": [
+            {
+                "id": m.id,
+                "name": m.name,
+                "birth_date": m.birth_date,
+                "is_active": m.is_active,
+                "statuses": grid[m.id],
+            }
+            for m in members
+        ],
+        "next_after_id": next_after_id,
+    })
+
+
+@router.get("/search")
+async def search_history(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    year: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """정산 문구 전문 검색. 공백으로 나눈 단어를 모두 포함하는 주차를 관련도 순으로 반환.
+
+    snippet 의 일치 부분은 <mark></mark> 로 감싸져 있음.
+    """
+    return await cache.cached_response(
+        "history_search", request, db,
+        lambda: search.search_summaries(db, q, limit, offset, year),
     )
-    return [r[0] for r in rows]
 
 
-@router.get("/{week_label}")
-def get_week_detail(week_label: str, db: Session = Depends(get_db)):
-    summary = (
-        db.query(WeeklySummary)
-        .filter(WeeklySummary.week_label == week_label)
-        .first()
+@router.get("/export")
+def export_history(
+    layout: str = "statuses",
+    format: str = "csv",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    year: Optional[int] = None,
+    member_id: Optional[List[int]] = Query(None),
+    include_left: bool = True,
+    gzip: bool = False,
+):
+    """주차별 상태 / 정산 문구 내보내기 (스트리밍).
+
+    layout: statuses / summaries / sheet(import_csv.py 형식, CSV 전용)
+    format: csv / jsonl / parquet, gzip=true 면 .gz 로 압축
+    """
+    if year and not (start or end):
+        start, end = year_week_range(year)
+    try:
+        chunks = export.export_chunks(layout, format, start, end, member_id, include_left, gzip)
+    except export.ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = export.filename_for(layout, format, gzip)
+    media_type = "application/gzip" if gzip else export.MEDIA_TYPES[format]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    if not summary and not db.query(WeeklyStatus).filter(WeeklyStatus.week_label == week_label).first():
-        raise HTTPException(status_code=404, detail="week_not_found")
 
-    statuses = (
-        db.query(WeeklyStatus)
-        .filter(WeeklyStatus.week_label == week_label)
-        .all()
+
+def _analytics_range(start: Optional[str], end: Optional[str], year: Optional[int]) -> tuple:
+    """분석 범위: start/end 또는 year, 둘 다 없으면 전체 기간 (None, None)"""
+    if start or end:
+        if not (start and end):
+            raise HTTPException(status_code=400, detail="start_and_end_required")
+        if not week_labels_between(start, end):
+            raise HTTPException(status_code=400, detail="invalid_week_range")
+        return start, end
+    if year:
+        return year_week_range(year)
+    return None, None
+
+
+# numpy 는 무거우므로 app.services.analytics 는 분석 엔드포인트를 처음 호출할 때 import
+
+@router.get("/analytics/weekly")
+async def get_weekly_trends(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    year: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """주차별 상태 수 / 인증률 / 벌점률 (열 단위: weeks[i] 의 값이 각 목록의 i 번째)"""
+    from app.services import analytics
+
+    start, end = _analytics_range(start, end, year)
+    return await cache.cached_response(
+        "history_analytics", request, db, lambda: analytics.weekly_trends(db, start, end),
+    )
+
+
+@router.get("/analytics/cohorts")
+async def get_cohort_stats(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    year: Optional[int] = None,
+    band: int = Query(1, ge=1, le=10),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """생년 구간(band 년 단위)별 상태 수 / 인증률 / 벌점률"""
+    from app.services import analytics
+
+    start, end = _analytics_range(start, end, year)
+    return await cache.cached_response(
+        "history_analytics", request, db, lambda: analytics.cohorts(db, start, end, band),
+    )
+
+
+@router.get("/analytics/exclusions")
+async def get_exclusion_mix(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    year: Optional[int] = None,
+    period: str = "quarter",
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """기간(week / quarter / year)별 제외 사유 구성"""
+    from app.services import analytics
+
+    if period not in analytics.PERIODS:
+        raise HTTPException(status_code=400, detail="invalid_period")
+    start, end = _analytics_range(start, end, year)
+    return await cache.cached_response(
+        "history_analytics", request, db, lambda: analytics.exclusions(db, start, end, period),
     )
-    members_map = {}
-    member_ids = [s.member_id for s in statuses]
-    if member_ids:
-        members = db.query(Member).filter(Member.id.in_(member_ids)).all()
-        members_map = {m.id: m for m in members}
+
+
+@router.get("/analytics/retention")
+async def get_retention(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """첫 기록 분기별 4 / 13 / 26 / 52주 유지율"""
+    from app.services import analytics
+
+    return await cache.cached_response(
+        "history_analytics", request, db, lambda: analytics.retention(db),
+    )
+
+
+@router.get("/{week_label}")
+async def get_week_detail(week_label: str, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return await cache.cached_response("history_week", request, db, lambda: load_week_detail(week_label, db))
+
+
+async def load_week_detail(week_label: str, db: AsyncSession) -> dict:
+    summary = (await db.execute(
+        select(WeeklySummary.summary_text)
+        .where(WeeklySummary.week_label == week_label)
+    )).first()
+
+    # 주차 상태 + 멤버 정보를 한 번에 (멤버가 없으면 joined_id 가 None)
+    statuses = (await (await db.connection()).execute(
+        select(
+            Member.id.label("joined_id"), Member.name, Member.birth_date, Member.is_active,
+            WeeklyStatusAll.status, WeeklyStatusAll.exclude_reason, WeeklyStatusAll.exclude_reason_detail,
+            WeeklyStatusAll.certified_date, WeeklyStatusAll.certified_at, WeeklyStatusAll.is_exclude_but_certified,
+        )
+        .outerjoin(Member, Member.id == WeeklyStatusAll.member_id)
+        .where(WeeklyStatusAll.week_label == week_label)
+        .order_by(WeeklyStatusAll.member_id)
+    )).all()
+    if not summary and not statuses:
+        raise HTTPException(status_code=404, detail="week_not_found")
 
     data = []
     for s in statuses:
-        m = members_map.get(s.member_id)
+        found = s.joined_id is not None
         data.append({
-            "name": m.name if m else "unknown",
-            "birth_date": m.birth_date if m else None,
-            "is_active": m.is_active if m else False,
+            "name": s.name if found else "unknown",
+            "birth_date": s.birth_date,
+            "is_active": s.is_active if found else False,
             "status": s.status,
             "exclude_reason": s.exclude_reason,
             "exclude_reason_detail": s.exclude_reason_detail,
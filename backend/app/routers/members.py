@@ -1,13 +1,21 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.database import get_db
+from app import cache
+from app.database import get_db, get_async_read_db
 from app.models import Member
+from app.services import archive, changes, member_stats, versioning
 
 router = APIRouter()
 
+# 목록 응답 필드 (ORM 객체 대신 이 컬럼만 조회해 행 튜플을 그대로 dict 로)
+MEMBER_FIELDS = ("id", "name", "birth_date", "is_active", "left_date", "left_reason", "created_at", "version")
+MEMBER_COLUMNS = [getattr(Member, field) for field in MEMBER_FIELDS]
+
 
 class MemberCreate(BaseModel):
     name: str
@@ -17,31 +25,27 @@ class MemberCreate(BaseModel):
 class MemberUpdate(BaseModel):
     name: Optional[str] = None
     birth_year: Optional[int] = None
+    version: int  # 클라이언트가 본 version. 다르면 409
 
 
 class MemberLeave(BaseModel):
     left_date: str
     left_reason: str
+    version: int
 
 
 @router.get("")
-def get_members(include_left: bool = False, db: Session = Depends(get_db)):
-    query = db.query(Member)
+async def get_members(request: Request, include_left: bool = False, db: AsyncSession = Depends(get_async_read_db)):
+    return await cache.cached_response("members", request, db, lambda: load_members(include_left, db))
+
+
+async def load_members(include_left: bool, db: AsyncSession) -> list:
+    query = select(*MEMBER_COLUMNS)
     if not include_left:
-        query = query.filter(Member.is_active == True)
-    members = query.order_by(Member.name).all()
-    return [
-        {
-            "id": m.id,
-            "name": m.name,
-            "birth_date": m.birth_date,
-            "is_active": m.is_active,
-            "left_date": m.left_date,
-            "left_reason": m.left_reason,
-            "created_at": m.created_at,
-        }
-        for m in members
-    ]
+        query = query.where(Member.is_active == True)
+    # ORM 결과 처리를 거치지 않도록 Core 커넥션으로 조회
+    rows = await (await db.connection()).execute(query.order_by(Member.name))
+    return [dict(zip(MEMBER_FIELDS, row)) for row in rows]
 
 
 @router.post("")
@@ -52,6 +56,9 @@ def create_member(body: MemberCreate, db: Session = Depends(get_db)):
         created_at=datetime.now().isoformat(),
     )
     db.add(member)
+    db.flush()
+    changes.record(db, "member", [member.id])
+    cache.bump_data_version(db)
     db.commit()
     db.refresh(member)
     return {"id": member.id, "name": member.name}
@@ -62,12 +69,16 @@ def update_member(member_id: int, body: MemberUpdate, db: Session = Depends(get_
     member = db.query(Member).filter(Member.id == member_id).first()
     if not member:
         raise HTTPException(status_code=404, detail="member_not_found")
+    current = lambda: versioning.current_member(db, member_id)
+    versioning.check(body.version, member.version, current)
     if body.name is not None:
         member.name = body.name
     if body.birth_year is not None:
         member.birth_date = str(body.birth_year)
-    db.commit()
-    return {"success": True}
+    changes.record(db, "member", [member_id])
+    cache.bump_data_version(db)
+    versioning.commit(db, current)
+    return {"success": True, "version": member.version}
 
 
 @router.put("/{member_id}/leave")
@@ -75,11 +86,15 @@ def leave_member(member_id: int, body: MemberLeave, db: Session = Depends(get_db
     member = db.query(Member).filter(Member.id == member_id).first()
     if not member:
         raise HTTPException(status_code=404, detail="member_not_found")
+    current = lambda: versioning.current_member(db, member_id)
+    versioning.check(body.version, member.version, current)
     member.is_active = False
     member.left_date = body.left_date
     member.left_reason = body.left_reason
-    db.commit()
-    return {"success": True}
+    changes.record(db, "member", [member_id])
+    cache.bump_data_version(db)
+    versioning.commit(db, current)
+    return {"success": True, "version": member.version}
 
 
 @router.put("/{member_id}/return")
@@ -89,8 +104,12 @@ def return_member(member_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="member_not_found")
     member.is_active = True
     # 탈퇴 이력은 유지 (left_date, left_reason 그대로)
-    db.commit()
-    return {"success": True}
+    # 탈퇴로 보관된 주차 상태는 열린 시즌 것만 weekly_status 로 되돌림
+    archive.restore_member(db, member_id)
+    changes.record(db, "member", [member_id])
+    cache.bump_data_version(db)
+    versioning.commit(db, lambda: versioning.current_member(db, member_id))
+    return {"success": True, "version": member.version}
 
 
 @router.delete("/{member_id}")
@@ -98,8 +117,15 @@ def delete_member(member_id: int, db: Session = Depends(get_db)):
     member = db.query(Member).filter(Member.id == member_id).first()
     if not member:
         raise HTTPException(status_code=404, detail="member_not_found")
-    from app.models import WeeklyStatus
+    from app.models import ChatActivity, WeeklyStatus, WeeklyStatusAll, WeeklyStatusArchive
+    week_labels = db.execute(select(WeeklyStatusAll.week_label).where(WeeklyStatusAll.member_id == member_id)).scalars().all()
     db.query(WeeklyStatus).filter(WeeklyStatus.member_id == member_id).delete()
+    db.query(WeeklyStatusArchive).filter(WeeklyStatusArchive.member_id == member_id).delete()
+    db.query(ChatActivity).filter(ChatActivity.member_id == member_id).delete()
+    member_stats.forget_member(db, member_id)
     db.delete(member)
+    changes.record(db, "status", [(member_id, wl) for wl in week_labels])
+    changes.record(db, "member", [member_id])
+    cache.bump_data_version(db)
     db.commit()
     return {"success": True}
@@ -0,0 +1,171 @@
+import re
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import cache
+from app.database import get_async_read_db
+from app.models import Member, MemberQuarterStats, MemberStats
+from app.services.member_stats import STATUSES
+from app.services.weeks import week_labels_between, year_week_range
+
+router = APIRouter()
+
+LEADERBOARD_METRICS = ["injeung_rate", "injeung", "fine", "penalty", "exclude", "current_streak", "best_streak"]
+STREAK_METRICS = {"current_streak", "best_streak"}
+PERIOD_PATTERN = re.compile(r"^(all|\d{4}|\d{4}-Q[1-4])$")
+
+
+def injeung_rate(counts: dict):
+    """인증률 = 인증 / (인증 + 벌금 + 벌점). 제외 주는 제외하고 계산"""
+    graded = counts["injeung"] + counts["fine"] + counts["penalty"]
+    return round(counts["injeung"] / graded, 4) if graded else None
+
+
+def _counts(row) -> dict:
+    counts = {status: row[status] or 0 for status in STATUSES}
+    counts["injeung_rate"] = injeung_rate(counts)
+    return counts
+
+
+@router.get("/leaderboard")
+async def get_leaderboard(
+    metric: str = "injeung_rate",
+    period: str = "all",
+    limit: int = Query(20, ge=1, le=1000),
+    min_weeks: int = 1,
+    include_left: bool = False,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """멤버별 통계 순위. period: all / 2026 / 2026-Q1 (연속 인증은 all 만)"""
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail="invalid_metric")
+    if not PERIOD_PATTERN.match(period):
+        raise HTTPException(status_code=400, detail="invalid_period")
+    if metric in STREAK_METRICS and period != "all":
+        raise HTTPException(status_code=400, detail="streak_period_unsupported")
+
+    if period == "all":
+        query = select(
+            MemberStats.member_id, MemberStats.current_streak, MemberStats.best_streak,
+            *[getattr(MemberStats, status) for status in STATUSES],
+        )
+    else:
+        # 연도는 해당 연도 분기 합계
+        quarter_filter = (
+            MemberQuarterStats.quarter == period if "-Q" in period
+            else MemberQuarterStats.quarter.like(f"{period}-Q%")
+        )
+        query = (
+            select(
+                MemberQuarterStats.member_id,
+                *[func.sum(getattr(MemberQuarterStats, status)).label(status) for status in STATUSES],
+            )
+            .where(quarter_filter)
+            .group_by(MemberQuarterStats.member_id)
+        )
+    # 멤버 수만큼 행이 오므로 ORM 결과 처리를 거치지 않는 Core 커넥션으로 조회
+    conn = await db.connection()
+    stats = {row.member_id: row._mapping for row in await conn.execute(query)}
+
+    member_query = select(Member.id, Member.name, Member.birth_date).where(Member.id.in_(stats))
+    if not include_left:
+        member_query = member_query.where(Member.is_active == True)
+
+    entries = []
+    for member in await conn.execute(member_query):
+        row = stats[member.id]
+        counts = _counts(row)
+        if counts["injeung"] + counts["fine"] + counts["penalty"] < min_weeks:
+            continue
+        if period == "all":
+            counts["current_streak"] = row["current_streak"]
+            counts["best_streak"] = row["best_streak"]
+        entries.append({"id": member.id, "name": member.name, "birth_date": member.birth_date, **counts})
+
+    entries.sort(key=lambda e: (e[metric] is None, -(e[metric] or 0), e["name"]))
+    for rank, entry in enumerate(entries, 1):
+        entry["rank"] = rank
+        entry["value"] = entry[metric]
+    return ORJSONResponse({"metric": metric, "period": period, "members": entries[:limit]})
+
+
+@router.get("/activity")
+async def get_activity_heatmap(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    year: Optional[int] = None,
+    member_id: Optional[List[int]] = Query(None),
+    per_member: bool = False,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """사진 업로드 요일 × 시각 heatmap (정산한 주 기준).
+
+    group[요일(월=0)][시] 는 전체 사진 수, members 는 member_id 로 지정한 멤버(per_member=true 면 전체 멤버)별 같은 형식.
+    """
+    if start or end:
+        if not (start and end):
+            raise HTTPException(status_code=400, detail="start_and_end_required")
+        if not week_labels_between(start, end):
+            raise HTTPException(status_code=400, detail="invalid_week_range")
+    elif year:
+        start, end = year_week_range(year)
+
+    # numpy 는 처음 호출할 때 import
+    from app.services import activity
+
+    return await cache.cached_response(
+        "stats_activity", request, db,
+        lambda: activity.heatmaps(db, start, end, member_id, per_member),
+    )
+
+
+@router.get("/members/{member_id}")
+async def get_member_stats(member_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """멤버 한 명의 누적 / 연도별 / 분기별 통계"""
+    member = (await db.execute(
+        select(Member.id, Member.name, Member.birth_date).where(Member.id == member_id)
+    )).first()
+    if not member:
+        raise HTTPException(status_code=404, detail="member_not_found")
+
+    stats = (await db.execute(
+        select(
+            MemberStats.weeks, MemberStats.current_streak, MemberStats.best_streak, MemberStats.last_week,
+            *[getattr(MemberStats, status) for status in STATUSES],
+        ).where(MemberStats.member_id == member_id)
+    )).first()
+    quarter_rows = (await db.execute(
+        select(MemberQuarterStats.quarter, *[getattr(MemberQuarterStats, status) for status in STATUSES])
+        .where(MemberQuarterStats.member_id == member_id)
+        .order_by(MemberQuarterStats.quarter)
+    )).all()
+
+    quarters = []
+    years = {}
+    for q in quarter_rows:
+        counts = {status: getattr(q, status) for status in STATUSES}
+        quarters.append({"quarter": q.quarter, **counts, "injeung_rate": injeung_rate(counts)})
+        year = years.setdefault(q.quarter[:4], dict.fromkeys(STATUSES, 0))
+        for status in STATUSES:
+            year[status] += counts[status]
+
+    total = {status: getattr(stats, status) if stats else 0 for status in STATUSES}
+    return ORJSONResponse({
+        "id": member.id,
+        "name": member.name,
+        "birth_date": member.birth_date,
+        "weeks": stats.weeks if stats else 0,
+        **total,
+        "injeung_rate": injeung_rate(total),
+        "current_streak": stats.current_streak if stats else 0,
+        "best_streak": stats.best_streak if stats else 0,
+        "last_week": stats.last_week if stats else None,
+        "years": [
+            {"year": year, **counts, "injeung_rate": injeung_rate(counts)}
+            for year, counts in sorted(years.items())
+        ],
+        "quarters": quarters,
+    })
@@ -1,14 +1,21 @@
 from datetime import datetime, timedelta, date
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
-import re
-from app.database import get_db
-from app.models import Member, WeeklyStatus
+from app import cache, events
+from app.database import get_db, get_async_read_db
+from app.models import Member, WeeklyStatus, WeeklyStatusAll
+from app.services import archive, changes, member_stats, versioning
+from app.services.weeks import week_labels_from
 
 router = APIRouter()
 
+EXCLUDE_SEARCH_WEEKS = 16  # 연속 제외 구간 최대 탐색 주 수
+
 
 def get_current_week_label():
     """월요일 기준 주차 라벨. 예: 2026-W05 (내부용)"""
@@ -52,10 +59,82 @@ class StatusUpdate(BaseModel):
     exclude_reason_detail: Optional[str] = None
     consecutive_weeks: Optional[int] = 1
     week_start: Optional[str] = None  # 특정 주차부터 시작 (YYYY-MM-DD)
+    version: int  # 클라이언트가 본 첫 주차 행의 version (행이 없었으면 0). 다르면 409
+
+
+def exclude_end_from(window: list, exclude_labels: set) -> Optional[str]:
+    """window(연속 주차 라벨) 앞에서부터 제외 상태가 이어지는 마지막 주차"""
+    last_exclude_week = None
+    for wl in window:
+        if wl in exclude_labels:
+            last_exclude_week = wl
+        else:
+            break
+    return last_exclude_week
+
+
+def calc_exclude_end(member_id: int, week_start_label: str, db: Session) -> str:
+    """주어진 주차부터 연속 제외 구간의 마지막 주차를 DB에서 계산"""
+    window = week_labels_from(week_start_label, EXCLUDE_SEARCH_WEEKS)
+    if not window:
+        return None
+
+    rows = (
+        db.query(WeeklyStatus.week_label)
+        .filter(
+            WeeklyStatus.member_id == member_id,
+            WeeklyStatus.week_label.in_(window),
+            WeeklyStatus.status == "exclude"
+        )
+        .all()
+    )
+    return exclude_end_from(window, {r[0] for r in rows})
+
+
+def status_source(week_label: str):
+    """닫힌 시즌의 주차는 보관된 행도 보이도록 weekly_status_all 뷰, 나머지는 weekly_status"""
+    return WeeklyStatusAll if week_label < archive.season_cutoff() else WeeklyStatus
+
+
+async def calc_exclude_ends(member_ids: list, week_start_label: str, db: AsyncSession) -> dict:
+    """calc_exclude_end 의 async 일괄 버전. {member_id: 마지막 제외 주차}"""
+    window = week_labels_from(week_start_label, EXCLUDE_SEARCH_WEEKS)
+    if not window or not member_ids:
+        return {}
+
+    source = status_source(window[0])
+    rows = await db.execute(
+        select(source.member_id, source.week_label)
+        .where(
+            source.member_id.in_(member_ids),
+            source.week_label.in_(window),
+            source.status == "exclude"
+        )
+    )
+    exclude_labels = {member_id: set() for member_id in member_ids}
+    for member_id, wl in rows:
+        exclude_labels[member_id].add(wl)
+    return {
+        member_id: exclude_end_from(window, labels)
+        for member_id, labels in exclude_labels.items()
+    }
 
 
 @router.get("/current")
-def get_current_status(week_start: Optional[str] = None, db: Session = Depends(get_db)):
+async def get_current_status(
+    request: Request,
+    week_start: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    # week_start 가 없으면 이번 주 기준이므로 현재 주차도 캐시 키에 포함
+    return await cache.cached_response(
+        "status_current", request, db,
+        lambda: load_current_status(week_start, db),
+        get_current_week_label(),
+    )
+
+
+async def load_current_status(week_start: Optional[str], db: AsyncSession) -> list:
     # week_start가 제공되면 해당 날짜로 week_label 계산
     if week_start:
         monday = date.fromisoformat(week_start)
@@ -69,78 +148,69 @@ def get_current_status(week_start: Optional[str] = None, db: Session = Depends(g
         week_label = get_current_week_label()
         week_display = get_week_display_label()
 
-    members = db.query(Member).filter(Member.is_active == True).all()
+    # 필요한 컬럼만 Core 커넥션으로 조회 (ORM 객체 / 결과 처리 없이 행 튜플)
+    conn = await db.connection()
+    members = (await conn.execute(
+        select(Member.id, Member.name, Member.birth_date).where(Member.is_active == True)
+    )).all()
+
+    # 멤버별 조회 대신 해당 주차 상태를 한 번에 조회
+    source = status_source(week_label)
+    statuses = await conn.execute(
+        select(
+            source.member_id, source.status,
+            source.exclude_reason, source.exclude_reason_detail, source.version,
+        ).where(source.week_label == week_label)
+    )
+    ws_map = {}
+    for member_id, *values in statuses:
+        ws_map.setdefault(member_id, values)
+
+    # 제외 상태인 멤버들의 연속 제외 구간 종료 주차
+    excluded_ids = [m.id for m in members if m.id in ws_map and ws_map[m.id][0] == "exclude"]
+    exclude_ends = await calc_exclude_ends(excluded_ids, week_label, db)
+
+    no_status = ("injeung", None, None, 0)
     result = []
-    for m in members:
-        ws = (
-            db.query(WeeklyStatus)
-            .filter(
-                WeeklyStatus.member_id == m.id,
-                WeeklyStatus.week_label == week_label,
-            )
-            .first()
-        )
-
-        # 제외 상태인 경우 연속 제외 구간의 종료 주차를 계산
-        exclude_end_label = None
-        if ws and ws.status == "exclude":
-            exclude_end_label = calc_exclude_end(m.id, week_label, db)
-
+    for member_id, name, birth_date in members:
+        status, exclude_reason, exclude_detail, version = ws_map.get(member_id, no_status)
         result.append({
-            "id": m.id,
-            "name": m.name,
-            "birth_date": m.birth_date,
-            "status": ws.status if ws else "injeung",
-            "exclude_reason": ws.exclude_reason if ws else None,
-            "exclude_reason_detail": ws.exclude_reason_detail if ws else None,
+            "id": member_id,
+            "name": name,
+            "birth_date": birth_date,
+            "status": status,
+            "exclude_reason": exclude_reason,
+            "exclude_reason_detail": exclude_detail,
             "week_label": week_label,
             "week_display": week_display,
-            "exclude_end_label": exclude_end_label,
+            "exclude_end_label": exclude_ends.get(member_id),
+            "version": version,  # 상태 변경 요청에 그대로 보냄 (행이 없으면 0)
         })
     return result
 
 
-def calc_exclude_end(member_id: int, week_start_label: str, db: Session) -> str:
-    """주어진 주차부터 연속 제외 구간의 마지막 주차를 DB에서 계산"""
-    # week_start_label (예: "2026-W06")에서 월요일 날짜 계산
-    match = re.match(r'(\d{4})-W(\d{2})', week_start_label)
-    if not match:
-        return None
-
-    year = int(match.group(1))
-    week = int(match.group(2))
-    # ISO week의 월요일 구하기
-    jan4 = date(year, 1, 4)
-    start_of_week1 = jan4 - timedelta(days=jan4.weekday())
-    monday = start_of_week1 + timedelta(weeks=week - 1)
-
-    last_exclude_week = None
-    for i in range(16):  # 최대 16주까지 탐색
-        target = monday + timedelta(weeks=i)
-        iso = target.isocalendar()
-        wl = f"{iso[0]}-W{iso[1]:02d}"
-        ws = (
-            db.query(WeeklyStatus)
-            .filter(
-                WeeklyStatus.member_id == member_id,
-                WeeklyStatus.week_label == wl,
-                WeeklyStatus.status == "exclude"
-            )
-            .first()
-        )
-        if ws:
-            last_exclude_week = wl
-        else:
-            break
+@router.get("/events")
+async def status_events(
+    request: Request,
+    cursor: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+):
+    """상태 변경 실시간 알림 (SSE). 재연결 시 Last-Event-ID 헤더 또는 cursor 로 이어받기.
 
-    return last_exclude_week
+    이벤트 종류: status, settlement, reset, resync(현황판을 다시 읽어야 함)
+    """
+    return StreamingResponse(
+        events.broker.stream(request, last_event_id or cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{member_id}/exclude-end")
-def get_exclude_end(
+async def get_exclude_end(
     member_id: int,
     week_start: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """해당 멤버의 제외 종료 주차 조회. week_start가 주어지면 해당 주차부터 탐색."""
     if week_start:
@@ -150,8 +220,8 @@ def get_exclude_end(
     else:
         start_label = get_current_week_label()
 
-    last_week = calc_exclude_end(member_id, start_label, db)
-    return {"last_week_label": last_week}
+    exclude_ends = await calc_exclude_ends([member_id], start_label, db)
+    return {"last_week_label": exclude_ends.get(member_id)}
 
 
 @router.put("/{member_id}")
@@ -183,6 +253,19 @@ def update_status(member_id: int, body: StatusUpdate, db: Session = Depends(get_
 
     now_iso = datetime.now().isoformat()
 
+    # 보관된 주차를 고치는 경우 먼저 weekly_status 로 되돌림 (연속 제외 구간을 찾는 범위까지)
+    restore_end = max(week_labels[-1], week_labels_from(week_labels[0], EXCLUDE_SEARCH_WEEKS)[-1])
+    archive.restore(db, [member_id], week_labels[0], restore_end)
+
+    # 클라이언트가 본 뒤 다른 운영진 / 정산이 먼저 고쳤으면 덮어쓰지 않고 409 + 현재 행
+    first_version = db.execute(
+        select(WeeklyStatus.version).where(
+            WeeklyStatus.member_id == member_id,
+            WeeklyStatus.week_label == week_labels[0],
+        )
+    ).scalar()
+    versioning.check(body.version, first_version or 0, lambda: versioning.current_statuses(db, week_labels, [member_id]))
+
     # 연속 제외 생성 시 이미 제외된 주차는 덮어쓰지 않음 (주차별 사유 보존)
     skip_existing_exclude = (num_weeks > 1 and body.status == "exclude")
 
@@ -209,23 +292,14 @@ def update_status(member_id: int, body: StatusUpdate, db: Session = Depends(get_
 
             if exclude_end:
                 # first_week부터 exclude_end까지의 모든 주차 라벨 생성
-                match = re.match(r'(\d{4})-W(\d{2})', first_week)
-                year = int(match.group(1))
-                week = int(match.group(2))
-                jan4 = date(year, 1, 4)
-                start_of_week1 = jan4 - timedelta(days=jan4.weekday())
-                start_monday = start_of_week1 + timedelta(weeks=week - 1)
-
                 target_week_labels = []
-                for i in range(16):  # 최대 16주
-                    target = start_monday + timedelta(weeks=i)
-                    iso = target.isocalendar()
-                    wl = f"{iso[0]}-W{iso[1]:02d}"
+                for wl in week_labels_from(first_week, EXCLUDE_SEARCH_WEEKS):
                     target_week_labels.append(wl)
                     if wl == exclude_end:
                         break
 
     # 각 주차에 대해 WeeklyStatus 생성/업데이트
+    stat_changes = []
     for week_label in target_week_labels:
         ws = (
             db.query(WeeklyStatus)
@@ -239,6 +313,7 @@ def update_status(member_id: int, body: StatusUpdate, db: Session = Depends(get_
             # 연속 제외 시 이미 제외 상태인 주차는 건너뜀 (사유 보존)
             if skip_existing_exclude and ws.status == "exclude":
                 continue
+            stat_changes.append((member_id, week_label, ws.status, body.status))
             ws.status = body.status
             ws.exclude_reason = body.exclude_reason
             ws.exclude_reason_detail = body.exclude_reason_detail
@@ -252,8 +327,20 @@ def update_status(member_id: int, body: StatusUpdate, db: Session = Depends(get_
                 created_at=now_iso,
             )
             db.add(ws)
-
-    db.commit()
+            stat_changes.append((member_id, week_label, None, body.status))
+
+    member_stats.record_changes(db, stat_changes)
+    changes.record(db, "status", [(m, wl) for m, wl, _, _ in stat_changes])
+    cache.bump_data_version(db)
+    versioning.commit(
+        db, lambda: versioning.current_statuses(db, target_week_labels, [member_id]),
+        new_keys=[(m, wl) for m, wl, old, _ in stat_changes if old is None],
+    )
+    # 바뀐 주차의 새 version (클라이언트가 다음 요청에 씀)
+    versions = {
+        row["week_label"]: row["version"]
+        for row in versioning.current_statuses(db, [change[1] for change in stat_changes], [member_id])
+    }
 
     # 제외 종료 주차를 DB에서 재계산 (단일 소스)
     exclude_end_label = None
@@ -264,9 +351,21 @@ def update_status(member_id: int, body: StatusUpdate, db: Session = Depends(get_
         # 제외 해제된 경우: 해당 주차에서 아직 제외 상태가 남아있는지 확인
         exclude_end_label = calc_exclude_end(member_id, week_labels[0], db)
 
+    if stat_changes:
+        events.publish("status", {
+            "member_id": member_id,
+            "week_labels": [change[1] for change in stat_changes],
+            "status": body.status,
+            "exclude_reason": body.exclude_reason,
+            "exclude_reason_detail": body.exclude_reason_detail,
+            "exclude_end_label": exclude_end_label,
+            "versions": versions,
+        })
+
     return {
         "success": True,
         "weeks_processed": num_weeks,
         "member_name": member.name,
-        "exclude_end_label": exclude_end_label
+        "exclude_end_label": exclude_end_label,
+        "versions": versions,
     }
@@ -0,0 +1,84 @@
+"""사진 업로드 시간대 (요일 × 시각 heatmap)
+
+정산 persist 단계에서 parse_chat 이 모은 사진 이벤트를 멤버 × 주차 한 행씩
+chat_activity 에 저장한다 (int16 (분, 사진 수) 쌍 배열, 같은 주를 다시 정산하면 교체).
+heatmap 은 요청마다 채팅을 다시 파싱하지 않고 저장된 배열을 이어 붙여 NumPy bincount 로 집계한다.
+
+numpy 는 heatmaps 를 처음 호출할 때 import 한다 (정산 경로 / 서버 시작에서는 필요 없음).
+"""
+import sys
+from array import array
+from sqlalchemy import delete, func, insert, select
+from app.models import ChatActivity
+
+HOURS_PER_WEEK = 7 * 24
+CHUNK_SIZE = 500
+
+
+def save_week(db, week_label: str, events, results: list) -> int:
+    """정산 결과(results)의 닉네임 -> member_id 로 이벤트를 멤버별로 묶어 저장 (커밋은 호출자가)"""
+    by_nickname = events.by_nickname()
+    by_member = {}
+    for result in results:
+        pairs = by_nickname.get(result["nickname"]) if result.get("nickname") else None
+        if result["member_id"] is None or pairs is None:
+            continue
+        by_member.setdefault(result["member_id"], array("h")).extend(pairs)
+
+    rows = []
+    for member_id, pairs in by_member.items():
+        if sys.byteorder != "little":
+            pairs.byteswap()  # 저장 형식은 little endian
+        rows.append({
+            "member_id": member_id,
+            "week_label": week_label,
+            "events": pairs.tobytes(),
+            "photos": sum(pairs[1::2]),
+        })
+
+    db.execute(delete(ChatActivity).where(ChatActivity.week_label == week_label))
+    for i in range(0, len(rows), CHUNK_SIZE):
+        db.execute(insert(ChatActivity), rows[i:i + CHUNK_SIZE])
+    return len(rows)
+
+
+async def heatmaps(db, start: str = None, end: str = None, member_ids: list = None, per_member: bool = False) -> dict:
+    """요일(월=0) × 시각 사진 수. group 은 전체, members 는 {member_id: 7×24} (member_ids 또는 per_member)"""
+    import numpy as np
+
+    filters = []
+    if start:
+        filters.append(ChatActivity.week_label >= start)
+    if end:
+        filters.append(ChatActivity.week_label <= end)
+    conn = await db.connection()
+    rows = (await conn.execute(select(ChatActivity.member_id, ChatActivity.events).where(*filters))).all()
+    weeks = (await conn.execute(
+        select(func.count(func.distinct(ChatActivity.week_label))).where(*filters)
+    )).scalar()
+
+    # 행마다 배열을 이어 붙여 한 번에 해석: (분, 사진 수) 쌍 + 각 쌍의 멤버
+    pairs = np.frombuffer(b"".join(row.events for row in rows), dtype="<i2").reshape(-1, 2)
+    lengths = np.fromiter((len(row.events) // 4 for row in rows), dtype=np.int64, count=len(rows))
+    owners = np.repeat(np.fromiter((row.member_id for row in rows), dtype=np.int64, count=len(rows)), lengths)
+    hour = pairs[:, 0].astype(np.int64) // 60
+    photos = pairs[:, 1].astype(np.int64)
+
+    group = np.bincount(hour, weights=photos, minlength=HOURS_PER_WEEK).astype(np.int64)
+    response = {
+        "weeks": weeks,
+        "photos": int(photos.sum()),
+        "group": group.reshape(7, 24).tolist(),
+        "members": {},
+    }
+
+    if per_member or member_ids:
+        wanted = np.unique(owners) if per_member else np.array(sorted(set(member_ids)), dtype=np.int64)
+        selected = np.isin(owners, wanted)
+        index = np.searchsorted(wanted, owners[selected])
+        grid = np.bincount(
+            index * HOURS_PER_WEEK + hour[selected], weights=photos[selected],
+            minlength=len(wanted) * HOURS_PER_WEEK,
+        ).astype(np.int64).reshape(len(wanted), 7, 24)
+        response["members"] = {str(member_id): grid[i].tolist() for i, member_id in enumerate(wanted.tolist())}
+    return response
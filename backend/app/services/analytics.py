@@ -0,0 +1,257 @@
+"""인증 추이 분석 (NumPy 열 단위 집계)
+
+weekly_status_all (보관된 행 포함) 전체를 한 번 읽어 행마다 (멤버 index, 주차 순번, 상태 코드, 사유 코드) 를
+NumPy 배열로 들고 있고, 집계는 bincount 기반 group-by 로 계산한다.
+배열은 data_version 이 바뀔 때까지 재사용한다 (쓰기 경로가 bump_data_version 으로 올림).
+
+- weekly_trends : 주차별 상태 수 / 인증률 / 벌점률
+- cohorts       : 생년 구간별 상태 수 / 인증률 / 벌점률
+- exclusions    : 기간(주 / 분기 / 연)별 제외 사유 구성
+- retention     : 첫 기록 분기별로 N주 뒤에도 기록이 있는 멤버 비율
+
+numpy 는 무거우므로 app.routers.history 에서 처음 호출할 때 import 한다.
+"""
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from itertools import chain
+import numpy as np
+from sqlalchemy import Integer, case, cast, func, select
+from app import cache, metrics
+from app.models import Member, WeeklyStatusAll
+from app.services.member_stats import STATUSES
+from app.services.settlement import EXCLUDE_LABELS
+from app.services.weeks import week_labels_between, week_quarter
+
+logger = logging.getLogger(__name__)
+
+# 상태 코드: 0 = 알 수 없음, 1.. = STATUSES 순서 (history matrix 의 코드와 같음)
+EXCLUDE_CODE = STATUSES.index("exclude") + 1
+PENALTY_CODE = STATUSES.index("penalty") + 1
+INJEUNG_CODE = STATUSES.index("injeung") + 1
+# 사유 코드: 0 = 없음, 1.. = EXCLUDE_LABELS 순서, 목록에 없는 값은 custom
+REASONS = tuple(EXCLUDE_LABELS)
+PERIODS = ("week", "quarter", "year")
+RETENTION_HORIZONS = (4, 13, 26, 52)
+
+
+class StatusArrays:
+    """weekly_status_all 한 행 = 각 배열의 같은 위치"""
+
+    def __init__(self, version: str, weeks: list, member_ids, birth_years, member, week, status, reason):
+        self.version = version
+        self.weeks = weeks              # 주차 순번 -> 주차 라벨 (첫 기록 ~ 마지막 기록, 빈 주 포함)
+        self.member_ids = member_ids    # 멤버 index -> member id (오름차순)
+        self.birth_years = birth_years  # 멤버 index -> 출생 연도 (모르면 0)
+        self.member = member
+        self.week = week
+        self.status = status
+        self.reason = reason
+
+    def week_bounds(self, start: str = None, end: str = None) -> tuple:
+        """주차 라벨 범위 -> 주차 순번 [lo, hi)"""
+        lo = bisect_left(self.weeks, start) if start else 0
+        hi = bisect_right(self.weeks, end) if end else len(self.weeks)
+        return lo, max(lo, hi)
+
+    def rows_in(self, lo: int, hi: int):
+        return (self.week >= lo) & (self.week < hi)
+
+
+_arrays = None
+
+
+def _birth_year(birth_date: str) -> int:
+    """birth_date(YYYY, YYYY-MM-DD 또는 YY) -> 출생 연도. 모르면 0"""
+    if not birth_date:
+        return 0
+    prefix = birth_date[:4] if len(birth_date) >= 4 else birth_date[:2]
+    if not prefix.isdigit():
+        return 0
+    year = int(prefix)
+    if len(prefix) == 2:
+        # 00-29 -> 2000년대, 30-99 -> 1900년대 (settlement.birth_sort_key 와 같은 기준)
+        year += 2000 if year <= 29 else 1900
+    return year
+
+
+async def _load(db, version: str) -> StatusArrays:
+    started = time.perf_counter()
+    conn = await db.connection()
+
+    members = (await conn.execute(select(Member.id, Member.birth_date).order_by(Member.id))).all()
+    member_ids = np.array([m.id for m in members], dtype=np.int64)
+    birth_years = np.array([_birth_year(m.birth_date) for m in members], dtype=np.int32)
+
+    # 문자열 -> 코드 변환은 SQL 에서 (행마다 파이썬 dict 조회를 하지 않도록)
+    week_key = (
+        cast(func.substr(WeeklyStatusAll.week_label, 1, 4), Integer) * 100
+        + cast(func.substr(WeeklyStatusAll.week_label, 7, 2), Integer)
+    )
+    status_code = case(
+        {status: code for code, status in enumerate(STATUSES, 1)}, value=WeeklyStatusAll.status, else_=0,
+    )
+    reason_code = case(
+        (WeeklyStatusAll.exclude_reason.is_(None), 0),
+        *[(WeeklyStatusAll.exclude_reason == reason, code) for code, reason in enumerate(REASONS, 1)],
+        else_=REASONS.index("custom") + 1,
+    )
+    rows = (await conn.execute(
+        select(WeeklyStatusAll.member_id, week_key, status_code, reason_code)
+    )).all()
+    # Row 를 그대로 np.array 에 넘기면 행마다 속성 조회가 일어나 매우 느림 -> 평탄화해서 fromiter
+    table = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 4).reshape(-1, 4)
+
+    # 주차 키(YYYYWW) -> 첫 주 ~ 마지막 주 사이 순번 (빈 주도 자리를 차지해 주 간격이 유지됨)
+    keys, key_index = np.unique(table[:, 1], return_inverse=True)
+    labels = [f"{key // 100}-W{key % 100:02d}" for key in keys.tolist()]
+    weeks = week_labels_between(labels[0], labels[-1]) if labels else []
+    ordinal = {label: i for i, label in enumerate(weeks)}
+    week = np.array([ordinal[label] for label in labels], dtype=np.int32)[key_index] if labels else np.zeros(0, np.int32)
+
+    arrays = StatusArrays(
+        version, weeks, member_ids, birth_years,
+        member=np.searchsorted(member_ids, table[:, 0]).astype(np.int32),
+        week=week,
+        status=table[:, 2].astype(np.int8),
+        reason=table[:, 3].astype(np.int8),
+    )
+    logger.info(
+        "analytics arrays loaded: rows=%d members=%d weeks=%d %.1fms",
+        len(table), len(member_ids), len(weeks), (time.perf_counter() - started) * 1000,
+    )
+    return arrays
+
+
+async def load_arrays(db) -> StatusArrays:
+    """현재 data_version 의 배열 (바뀌었으면 다시 읽음)"""
+    global _arrays
+    version = await cache.get_data_version(db)
+    hit = _arrays is not None and _arrays.version == version
+    metrics.record_cache("analytics_arrays", hit)
+    if not hit:
+        _arrays = await _load(db, version)
+    return _arrays
+
+
+def _status_counts(group, status, groups: int):
+    """(그룹 수, 5) 상태별 행 수. 열 0 은 알 수 없는 상태"""
+    width = len(STATUSES) + 1
+    return np.bincount(group * width + status, minlength=groups * width).reshape(groups, width)
+
+
+def _rate(numerator, denominator) -> list:
+    rate = np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+    return np.round(rate, 4).tolist()
+
+
+def _count_columns(counts) -> dict:
+    """상태 수 + 인증률 / 벌점률 (제외 주는 분모에서 뺌)"""
+    eligible = counts[:, 1:].sum(axis=1) - counts[:, EXCLUDE_CODE]
+    return {
+        "total": counts.sum(axis=1).tolist(),
+        **{status: counts[:, code].tolist() for code, status in enumerate(STATUSES, 1)},
+        "certification_rate": _rate(counts[:, INJEUNG_CODE], eligible),
+        "penalty_rate": _rate(counts[:, PENALTY_CODE], eligible),
+    }
+
+
+async def weekly_trends(db, start: str = None, end: str = None) -> dict:
+    data = await load_arrays(db)
+    lo, hi = data.week_bounds(start, end)
+    rows = data.rows_in(lo, hi)
+    counts = _status_counts(data.week[rows] - lo, data.status[rows], hi - lo)
+    return {"weeks": data.weeks[lo:hi], **_count_columns(counts)}
+
+
+async def cohorts(db, start: str = None, end: str = None, band: int = 1) -> dict:
+    """생년 구간(band 년 단위)별 집계. cohort 는 구간 시작 연도, 생년을 모르면 null"""
+    data = await load_arrays(db)
+    lo, hi = data.week_bounds(start, end)
+    rows = data.rows_in(lo, hi)
+    member_cohort = np.where(data.birth_years > 0, data.birth_years // band * band, 0)
+
+    row_cohort = member_cohort[data.member[rows]]
+    cohort_values = np.unique(row_cohort)
+    group = np.searchsorted(cohort_values, row_cohort)
+    counts = _status_counts(group, data.status[rows], len(cohort_values))
+
+    active_members = np.unique(data.member[rows])
+    members = np.bincount(
+        np.searchsorted(cohort_values, member_cohort[active_members]), minlength=len(cohort_values),
+    )
+    return {
+        "band": band,
+        "cohorts": [int(value) or None for value in cohort_values],
+        "members": members.tolist(),
+        **_count_columns(counts),
+    }
+
+
+async def exclusions(db, start: str = None, end: str = None, period: str = "quarter") -> dict:
+    """기간별 제외 사유 수. reasons[사유][i] 는 periods[i] 기간의 제외 주 수 (none = 사유 없음)"""
+    data = await load_arrays(db)
+    lo, hi = data.week_bounds(start, end)
+    rows = data.rows_in(lo, hi) & (data.status == EXCLUDE_CODE)
+
+    if period == "week":
+        week_periods = data.weeks[lo:hi]
+    elif period == "quarter":
+        week_periods = [week_quarter(label) for label in data.weeks[lo:hi]]
+    else:
+        week_periods = [label[:4] for label in data.weeks[lo:hi]]
+    periods, period_of_week = np.unique(np.array(week_periods, dtype=str), return_inverse=True)
+
+    width = len(REASONS) + 1
+    counts = np.bincount(
+        period_of_week[data.week[rows] - lo] * width + data.reason[rows], minlength=len(periods) * width,
+    ).reshape(len(periods), width)
+    return {
+        "period": period,
+        "periods": periods.tolist(),
+        "total": counts.sum(axis=1).tolist(),
+        "reasons": {
+            "none": counts[:, 0].tolist(),
+            **{reason: counts[:, code].tolist() for code, reason in enumerate(REASONS, 1)},
+        },
+    }
+
+
+async def retention(db, horizons: tuple = RETENTION_HORIZONS) -> dict:
+    """첫 기록 분기(cohort)별 N주 유지율: 첫 기록 주 + N주 이후에도 기록이 있는 멤버 비율.
+
+    마지막 기록 주까지 N주가 지나지 않은 멤버는 해당 N 의 분모에서 뺀다 (아직 알 수 없음).
+    """
+    data = await load_arrays(db)
+    if not len(data.member):
+        return {"horizons": list(horizons), "cohorts": [], "members": [], "retention": []}
+
+    member_count = len(data.member_ids)
+    first = np.full(member_count, len(data.weeks), dtype=np.int32)
+    last = np.full(member_count, -1, dtype=np.int32)
+    np.minimum.at(first, data.member, data.week)
+    np.maximum.at(last, data.member, data.week)
+    seen = last >= 0
+    first, last = first[seen], last[seen]
+
+    week_cohort = np.array([week_quarter(label) for label in data.weeks], dtype=str)
+    cohort_values, cohort_index = np.unique(week_cohort[first], return_inverse=True)
+    latest = len(data.weeks) - 1
+    span = last - first
+
+    members = np.bincount(cohort_index, minlength=len(cohort_values))
+    columns = []
+    for horizon in horizons:
+        observable = first + horizon <= latest
+        eligible = np.bincount(cohort_index[observable], minlength=len(cohort_values))
+        retained = np.bincount(cohort_index[observable & (span >= horizon)], minlength=len(cohort_values))
+        columns.append([
+            round(r / e, 4) if e else None for r, e in zip(retained.tolist(), eligible.tolist())
+        ])
+    return {
+        "horizons": list(horizons),
+        "cohorts": cohort_values.tolist(),
+        "members": members.tolist(),
+        # retention[i][j]: cohorts[j] 의 horizons[i] 주 유지율 (관찰 기간이 부족하면 null)
+        "retention": columns,
+    }
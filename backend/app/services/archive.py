@@ -0,0 +1,117 @@
+"""오래된 주차 상태 보관 (weekly_status hot / cold 분리)
+
+weekly_status 에는 현황판 / 정산 / 상태 변경이 다루는 행만 남기고
+- 탈퇴 후 ARCHIVE_LEFT_AFTER_DAYS 일이 지난 멤버의 행 (archived_reason = left)
+- 최근 ARCHIVE_KEEP_SEASONS 시즌(ISO 연도) 이전 주차의 행 (archived_reason = season)
+을 weekly_status_archive 로 옮긴다. 과거 내역 / 통계 / 내보내기는 두 테이블을 이어 붙인
+weekly_status_all 뷰를 읽으므로 옮기기 전후 결과가 같다.
+
+보관된 행을 다시 써야 하는 경로(복귀, 과거 주차 상태 변경 / 재정산 / 가져오기)는 restore 로
+먼저 weekly_status 로 되돌린다. 행 내용은 바뀌지 않으므로 멤버 통계 / 변경 기록은 건드리지 않는다.
+
+    python -m app.cli archive            # 보관 대상 이동
+    python -m app.cli archive --dry-run  # 옮길 행 수만 확인
+"""
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, insert, inspect, literal, or_, select, text, update
+from app import cache
+from app.config import ARCHIVE_KEEP_SEASONS, ARCHIVE_LEFT_AFTER_DAYS
+from app.models import Member, WeeklyStatus, WeeklyStatusAll, WeeklyStatusArchive
+
+# weekly_status / weekly_status_archive / 뷰에 공통인 열 (id 는 테이블마다 따로 매김)
+COLUMNS = [column.name for column in WeeklyStatusAll.__table__.columns]
+CHUNK_SIZE = 500
+
+
+def create_view(conn):
+    """weekly_status_all 뷰를 현재 열 목록으로 다시 만듦 (열을 바꾸는 마이그레이션에서도 호출)
+
+    오래된 DB를 단계별로 올리는 중이면 아직 추가되지 않은 열은 빼고 만든다 (열을 추가하는 단계에서 다시 만듦).
+    """
+    existing = {column["name"] for column in inspect(conn).get_columns("weekly_status")}
+    columns = ", ".join(name for name in COLUMNS if name in existing)
+    conn.execute(text("DROP VIEW IF EXISTS weekly_status_all"))
+    conn.execute(text(
+        f"CREATE VIEW weekly_status_all AS "
+        f"SELECT {columns} FROM weekly_status "
+        f"UNION ALL SELECT {columns} FROM weekly_status_archive"
+    ))
+
+
+def season_cutoff(today: date = None) -> str:
+    """이 주차보다 앞선 주차는 닫힌 시즌"""
+    year = (today or date.today()).isocalendar()[0]
+    return f"{year - ARCHIVE_KEEP_SEASONS + 1}-W01"
+
+
+def _move(db, source, target, conditions: list, **values) -> int:
+    """조건에 맞는 source 행을 target 으로 옮김 (INSERT ... SELECT 후 DELETE). 옮긴 행 수"""
+    query = select(
+        *[getattr(source, name) for name in COLUMNS],
+        *[literal(value) for value in values.values()],
+    ).where(*conditions)
+    moved = db.execute(insert(target).from_select(COLUMNS + list(values), query)).rowcount
+    if moved:
+        db.execute(delete(source).where(*conditions).execution_options(synchronize_session=False))
+    return moved
+
+
+def archive_left_members(db, today: date = None) -> int:
+    cutoff = ((today or date.today()) - timedelta(days=ARCHIVE_LEFT_AFTER_DAYS)).isoformat()
+    departed = select(Member.id).where(
+        Member.is_active == False,
+        or_(Member.left_date.is_(None), Member.left_date <= cutoff),
+    )
+    return _move(
+        db, WeeklyStatus, WeeklyStatusArchive, [WeeklyStatus.member_id.in_(departed)],
+        archived_reason="left", archived_at=datetime.now().isoformat(),
+    )
+
+
+def archive_seasons(db, today: date = None) -> int:
+    return _move(
+        db, WeeklyStatus, WeeklyStatusArchive, [WeeklyStatus.week_label < season_cutoff(today)],
+        archived_reason="season", archived_at=datetime.now().isoformat(),
+    )
+
+
+def run(db, today: date = None) -> dict:
+    """보관 대상을 모두 옮김 {사유: 행 수} (커밋은 호출자가)"""
+    result = {"left": archive_left_members(db, today), "season": archive_seasons(db, today)}
+    if any(result.values()):
+        cache.bump_data_version(db)
+    return result
+
+
+def restore(db, member_ids: list = None, start: str = None, end: str = None) -> int:
+    """보관된 행(멤버 / 주차 범위)을 weekly_status 로 되돌림. 쓰기 전에 호출 (커밋은 호출자가)"""
+    conditions = []
+    if start:
+        conditions.append(WeeklyStatusArchive.week_label >= start)
+    if end:
+        conditions.append(WeeklyStatusArchive.week_label <= end)
+
+    if member_ids is None:
+        moved = _move(db, WeeklyStatusArchive, WeeklyStatus, conditions)
+    else:
+        member_ids = list(member_ids)
+        moved = 0
+        for i in range(0, len(member_ids), CHUNK_SIZE):
+            moved += _move(db, WeeklyStatusArchive, WeeklyStatus, [
+                WeeklyStatusArchive.member_id.in_(member_ids[i:i + CHUNK_SIZE]), *conditions,
+            ])
+    if moved:
+        cache.bump_data_version(db)
+    return moved
+
+
+def restore_member(db, member_id: int, today: date = None) -> int:
+    """복귀한 멤버: 열린 시즌의 행은 되돌리고 닫힌 시즌의 행은 season 보관으로 남김"""
+    moved = restore(db, [member_id], start=season_cutoff(today))
+    db.execute(
+        update(WeeklyStatusArchive)
+        .where(WeeklyStatusArchive.member_id == member_id, WeeklyStatusArchive.archived_reason == "left")
+        .values(archived_reason="season")
+        .execution_options(synchronize_session=False)
+    )
+    return moved
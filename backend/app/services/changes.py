@@ -0,0 +1,251 @@
+"""변경 기록 (change_log) 과 cursor 기반 증분 동기화
+
+members / weekly_status / weekly_summary 를 바꾸는 경로는 커밋 전에 record 로
+바뀐 행의 키를 같은 트랜잭션에 기록한다. 기록 id 가 cursor 이고,
+GET /api/changes?since=<cursor> 는 그 뒤에 바뀐 행의 현재 값(삭제된 행은 키만)을 돌려준다.
+
+- 압축: 같은 행의 기록은 마지막 것만 남김 (현재 값을 읽어 보내므로 이전 기록은 필요 없음)
+- 보관: CHANGE_LOG_RETENTION_DAYS 보다 오래됐거나 CHANGE_LOG_MAX_ROWS 를 넘는 기록은 삭제하고,
+  삭제한 마지막 id 를 floor 로 저장. floor 보다 작은 cursor 는 놓친 변경이 있을 수 있으므로 resync
+- 전체 초기화(admin reset)는 reset 기록을 남기고 그 이전 기록을 모두 지워 기존 cursor 를 resync 로 보냄
+
+SQLite 는 쓰기 트랜잭션이 한 번에 하나이므로 id 순서와 커밋 순서가 같다
+(작은 id 가 나중에 커밋되어 cursor 를 건너뛰는 일이 없음).
+
+정리는 `python -m app.cli analyze` 또는 아래 명령으로 실행한다. 서버에서도 CHANGE_LOG_COMPACT_EVERY 건을
+기록할 때마다, 기록한 요청이 커밋된 뒤 별도 스레드 / 세션에서 한 번 정리한다 (요청 트랜잭션을 늘리지 않음).
+
+    python -m app.services.changes --compact  # 압축 / 보관 기간 정리
+"""
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import delete, event, func, insert, select, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app import metrics
+from app.config import (
+    CHANGE_LOG_COMPACT_EVERY, CHANGE_LOG_MAX_ROWS, CHANGE_LOG_RETENTION_DAYS, CHANGES_PAGE_SIZE,
+)
+from app.database import SessionLocal
+from app.models import AppConfig, ChangeLog, Member, WeeklyStatus, WeeklyStatusArchive, WeeklySummary
+
+logger = logging.getLogger(__name__)
+
+FLOOR_KEY = "change_log_floor"
+ENTITIES = ("member", "status", "summary")
+CHUNK_SIZE = 500
+STATUS_FIELDS = [
+    "member_id", "week_label", "status", "exclude_reason", "exclude_reason_detail",
+    "certified_date", "certified_at", "is_exclude_but_certified", "version",
+]
+
+_recorded = 0  # 마지막 정리 이후 이 프로세스에서 기록한 수 (_recorded_lock 으로 보호)
+_recorded_lock = threading.Lock()
+_compacting = threading.Lock()  # 백그라운드 정리는 한 번에 하나
+
+
+def _chunks(items: list):
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+def _encode(entity: str, key) -> str:
+    if entity == "status":
+        member_id, week_label = key
+        return f"{member_id}|{week_label}"
+    return str(key)
+
+
+def record(db, entity: str, keys):
+    """바뀐 행의 키를 기록 (커밋은 호출자가, 쓰기와 같은 트랜잭션)
+
+    keys - member: member_id, status: (member_id, week_label), summary: week_label
+    """
+    global _recorded
+    encoded = list(dict.fromkeys(_encode(entity, key) for key in keys))
+    if not encoded:
+        return
+    now_iso = datetime.now().isoformat()
+    for chunk in _chunks(encoded):
+        db.execute(insert(ChangeLog), [
+            {"entity": entity, "entity_key": key, "created_at": now_iso} for key in chunk
+        ])
+
+    with _recorded_lock:
+        _recorded += len(encoded)
+        due = _recorded >= CHANGE_LOG_COMPACT_EVERY
+        if due:
+            _recorded = 0
+    if due:
+        # 호출자의 트랜잭션이 커밋된 뒤에 정리 (롤백되면 다음 커밋 때)
+        event.listen(db, "after_commit", _compact_after_commit, once=True)
+
+
+def _compact_after_commit(session):
+    threading.Thread(target=_compact_in_background, daemon=True).start()
+
+
+def _compact_in_background():
+    if not _compacting.acquire(blocking=False):
+        return
+    db = SessionLocal()
+    try:
+        result = compact(db)
+        db.commit()
+        logger.info("change_log compacted: %s", result)
+    except Exception:
+        db.rollback()
+        logger.exception("change_log compaction failed")
+    finally:
+        db.close()
+        _compacting.release()
+
+
+def record_reset(db):
+    """전체 초기화: reset 기록을 남기고 이전 기록을 지워 모든 기존 cursor 를 resync 로"""
+    db.execute(insert(ChangeLog).values(
+        entity="reset", entity_key="", created_at=datetime.now().isoformat(),
+    ))
+    reset_id = db.execute(select(func.max(ChangeLog.id))).scalar()
+    db.execute(delete(ChangeLog).where(ChangeLog.id < reset_id))
+    _set_floor(db, reset_id)
+
+
+def _get_floor(db) -> int:
+    value = db.execute(select(AppConfig.value).where(AppConfig.key == FLOOR_KEY)).scalar()
+    return int(value or 0)
+
+
+def _set_floor(db, floor: int):
+    stmt = sqlite_insert(AppConfig).values(key=FLOOR_KEY, value=str(floor))
+    db.execute(stmt.on_conflict_do_update(index_elements=["key"], set_={"value": stmt.excluded.value}))
+
+
+def compact(db) -> dict:
+    """같은 행의 이전 기록 삭제 + 보관 기간 / 최대 행 수를 넘는 기록 삭제 (커밋은 호출자가)"""
+    superseded = db.execute(text(
+        "DELETE FROM change_log WHERE id NOT IN "
+        "(SELECT MAX(id) FROM change_log GROUP BY entity, entity_key)"
+    )).rowcount
+
+    # 이 id 까지(포함) 삭제 -> 이보다 작은 cursor 는 resync
+    cutoff = (datetime.now() - timedelta(days=CHANGE_LOG_RETENTION_DAYS)).isoformat()
+    horizon = db.execute(select(func.max(ChangeLog.id)).where(ChangeLog.created_at < cutoff)).scalar() or 0
+    overflow = db.execute(
+        select(ChangeLog.id).order_by(ChangeLog.id.desc()).limit(1).offset(CHANGE_LOG_MAX_ROWS)
+    ).scalar() or 0
+    horizon = max(horizon, overflow)
+
+    expired = 0
+    if horizon:
+        expired = db.execute(delete(ChangeLog).where(ChangeLog.id <= horizon)).rowcount
+        if horizon > _get_floor(db):
+            _set_floor(db, horizon)
+
+    metrics.CHANGE_LOG_PRUNED.inc(superseded, reason="superseded")
+    metrics.CHANGE_LOG_PRUNED.inc(expired, reason="expired")
+    return {"superseded": superseded, "expired": expired}
+
+
+async def changes_since(db, since: int = None, limit: int = CHANGES_PAGE_SIZE) -> dict:
+    """since 이후 바뀐 행의 현재 값. cursor 를 이어 쓸 수 없으면 {"resync": True, "cursor": 최신}
+
+    변경 기록을 먼저 읽고 floor 를 나중에 읽어, 그 사이 정리로 지워진 기록이 있으면 resync 로 처리한다.
+    행 값은 기록을 읽은 뒤의 현재 값이므로 cursor 보다 새로울 수 있다 (다음 조회에서 같은 값이 다시 옴).
+    """
+    rows = []
+    if since is not None:
+        rows = (await db.execute(
+            select(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_key)
+            .where(ChangeLog.id > since)
+            .order_by(ChangeLog.id)
+            .limit(limit + 1)
+        )).all()
+    floor_value = (await db.execute(select(AppConfig.value).where(AppConfig.key == FLOOR_KEY))).scalar()
+    floor = int(floor_value or 0)
+    latest = max((await db.execute(select(func.max(ChangeLog.id)))).scalar() or 0, floor)
+
+    if since is None or since < floor or since > latest:
+        metrics.CHANGE_LOG_RESYNCS.inc()
+        return {"resync": True, "cursor": latest}
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    keys = {entity: {} for entity in ENTITIES}
+    for row in rows:
+        if row.entity in keys:
+            keys[row.entity][row.entity_key] = None
+
+    member_ids = [int(key) for key in keys["member"]]
+    status_keys = [(int(m), w) for m, w in (key.split("|", 1) for key in keys["status"])]
+    week_labels = list(keys["summary"])
+
+    members = []
+    for chunk in _chunks(member_ids):
+        result = await db.execute(
+            select(
+                Member.id, Member.name, Member.birth_date, Member.is_active,
+                Member.left_date, Member.left_reason, Member.created_at, Member.version,
+            ).where(Member.id.in_(chunk))
+        )
+        members.extend(dict(row._mapping) for row in result)
+
+    statuses = []
+    for chunk in _chunks(status_keys):
+        # 행 값 IN 은 뷰 안으로 내려가지 않아(전체 스캔) 보관 테이블과 따로 조회
+        for model in (WeeklyStatus, WeeklyStatusArchive):
+            result = await db.execute(
+                select(*[getattr(model, field) for field in STATUS_FIELDS])
+                .where(tuple_(model.member_id, model.week_label).in_(chunk))
+            )
+            statuses.extend(list(row) for row in result)
+
+    summaries = []
+    for chunk in _chunks(week_labels):
+        result = await db.execute(
+            select(WeeklySummary.week_label, WeeklySummary.summary_text)
+            .where(WeeklySummary.week_label.in_(chunk))
+        )
+        summaries.extend(dict(row._mapping) for row in result)
+
+    found_members = {m["id"] for m in members}
+    found_statuses = {(s[0], s[1]) for s in statuses}
+    found_summaries = {s["week_label"] for s in summaries}
+    return {
+        "resync": False,
+        "cursor": rows[-1].id if rows else since,
+        "has_more": has_more,
+        "members": members,
+        "deleted_members": [m for m in member_ids if m not in found_members],
+        "status_fields": STATUS_FIELDS,
+        "statuses": statuses,
+        "deleted_statuses": [list(key) for key in status_keys if key not in found_statuses],
+        "summaries": summaries,
+        "deleted_summaries": [w for w in week_labels if w not in found_summaries],
+    }
+
+
+def main():
+    from app.database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="변경 기록 정리")
+    parser.add_argument("--compact", action="store_true", help="압축 / 보관 기간 정리 실행")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.compact:
+            result = compact(db)
+            db.commit()
+            print(f"정리 완료: 중복 {result['superseded']}건, 만료 {result['expired']}건 삭제")
+        count = db.execute(select(func.count()).select_from(ChangeLog)).scalar()
+        latest = db.execute(select(func.max(ChangeLog.id))).scalar() or 0
+        print(f"변경 기록 {count}건 (cursor {_get_floor(db)} ~ {latest})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
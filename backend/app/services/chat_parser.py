@@ -1,5 +1,8 @@
 import os
 import re
+import shutil
+from array import array
+import tempfile
 import zipfile
 from datetime import date
 from typing import Optional
@@ -23,13 +26,69 @@ def unzip_and_read(zip_path: str) -> str:
     return ""
 
 
+def read_export_file(path: str) -> str:
+    """로컬에 저장한 카카오톡 내보내기(.zip 또는 .txt) 본문
+
+    zip 은 원본 옆이 아니라 임시 디렉토리에 풀어서 읽는다.
+    """
+    if zipfile.is_zipfile(path):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            zip_path = os.path.join(tmp_dir, os.path.basename(path))
+            shutil.copyfile(path, zip_path)
+            return unzip_and_read(zip_path)
+    for encoding in ["utf-8", "cp949", "euc-kr"]:
+        try:
+            with open(path, "r", encoding=encoding) as fh:
+                return fh.read()
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return ""
+
+
+class PhotoEvents:
+    """parse_chat(events=...) 이 채우는 사진 이벤트 (닉네임 index, 주 시작(월 00:00)부터 분, 사진 수)"""
+
+    def __init__(self):
+        self.nicknames = []  # 닉네임 index -> 닉네임
+        self._index = {}
+        self.nickname_index = array("i")
+        self.minute = array("h")  # 0 ~ 10079
+        self.count = array("h")
+
+    def __len__(self):
+        return len(self.minute)
+
+    def add(self, nickname: str, minute_of_week: int, count: int):
+        index = self._index.get(nickname)
+        if index is None:
+            index = self._index[nickname] = len(self.nicknames)
+            self.nicknames.append(nickname)
+        self.nickname_index.append(index)
+        self.minute.append(minute_of_week)
+        self.count.append(min(count, 32767))
+
+    def by_nickname(self) -> dict:
+        """{닉네임: array("h") [분, 사진 수, 분, 사진 수, ...]}"""
+        packed = {}
+        for index, minute, count in zip(self.nickname_index, self.minute, self.count):
+            pairs = packed.get(index)
+            if pairs is None:
+                pairs = packed[index] = array("h")
+            pairs.append(minute)
+            pairs.append(count)
+        return {self.nicknames[index]: pairs for index, pairs in packed.items()}
+
+
 def parse_chat(
     text: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    events: Optional[PhotoEvents] = None,
 ) -> dict:
     """txt 파싱하여 인원별 사진 수 및 마지막 인증 날짜/시간 집계.
 
+    events 를 넘기면 사진 메시지마다 (닉네임, 요일/시각, 사진 수) 를 추가로 기록한다.
+
     Returns:
         dict: {nickname: {"count": int, "last_date": str, "last_time": str}}
     """
@@ -67,6 +126,8 @@ def parse_chat(
                 nickname = "94김용진"
 
             count = int(match.group(7))
+            if events is not None:
+                events.add(nickname, line_date.weekday() * 1440 + int(hour) * 60 + int(minute), count)
 
             if nickname not in photo_data:
                 photo_data[nickname] = {"count": 0, "last_date": date_str, "last_time": time_str}
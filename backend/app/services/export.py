@@ -0,0 +1,300 @@
+"""주차별 상태 / 정산 문구 스트리밍 내보내기 (CSV, JSONL, Parquet)
+
+레이아웃
+- statuses  : weekly_status_all (보관된 행 포함) + Member 한 행씩
+- summaries : WeeklySummary 한 행씩
+- sheet     : import_csv.py 가 읽는 시트 형식 (멤버 한 행, 주차별 열 / CSV 전용)
+
+결과는 bytes 조각을 내는 generator 이고, 조회는 yield_per 로 BATCH_SIZE 행씩
+가져오므로 데이터 크기와 관계없이 메모리 사용량이 일정하다.
+generator 가 자체 커넥션을 열기 때문에 요청 세션이 닫힌 뒤에도 계속 읽을 수 있다.
+"""
+import csv
+import io
+import json
+import zlib
+from sqlalchemy import and_, func, select
+from app.database import read_engine
+from app.models import Member, WeeklyStatusAll, WeeklySummary
+from app.services.settlement import EXCLUDE_LABELS
+from app.services.weeks import week_label_to_monday, week_labels_between
+
+FORMATS = ("csv", "jsonl", "parquet")
+LAYOUTS = ("statuses", "summaries", "sheet")
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+BATCH_SIZE = 1000  # DB에서 한 번에 가져오는 행 수 / 출력 조각 단위
+PARQUET_BATCH_SIZE = 10000  # Parquet row group 크기
+
+# (컬럼 이름, 타입) - 타입은 Parquet 스키마용
+STATUS_COLUMNS = [
+    ("week_label", "str"), ("member_id", "int"), ("name", "str"), ("birth_date", "str"),
+    ("is_active", "bool"), ("status", "str"), ("exclude_reason", "str"),
+    ("exclude_reason_detail", "str"), ("certified_date", "str"), ("certified_at", "str"),
+    ("is_exclude_but_certified", "bool"),
+]
+SUMMARY_COLUMNS = [("week_label", "str"), ("summary_text", "str"), ("created_at", "str")]
+SHEET_COLUMNS = ["이름", "생년", "비고", "탈퇴", "탈퇴일", "탈퇴사유"]
+
+
+class ExportError(ValueError):
+    """잘못된 내보내기 옵션. 메시지는 API 응답의 detail 값으로 그대로 사용"""
+
+
+def sheet_date(week_label: str) -> str:
+    """시트의 주차 열 이름 (해당 주 월요일). 예: 2026-W02 -> '2026. 1. 5'"""
+    monday = week_label_to_monday(week_label)
+    return f"{monday.year}. {monday.month}. {monday.day}"
+
+
+def sheet_cell(status: str, exclude_reason: str, exclude_detail: str) -> str:
+    """상태를 시트 값으로 변환 (import_csv.parse_status 의 역변환)"""
+    if status == "injeung":
+        return "Y"
+    if status == "fine":
+        return "N"
+    if status == "penalty":
+        return "N(벌점)"
+    if status == "exclude":
+        if exclude_reason is None:
+            return "P"  # 사유 없는 제외
+        if exclude_reason == "custom" or exclude_reason not in EXCLUDE_LABELS:
+            return f"P({exclude_detail or '기타'})"
+        return f"P({EXCLUDE_LABELS[exclude_reason]})"
+    return ""
+
+
+def export_chunks(
+    layout: str = "statuses",
+    fmt: str = "csv",
+    start: str = None,
+    end: str = None,
+    member_ids: list = None,
+    include_left: bool = True,
+    compress: bool = False,
+):
+    """옵션을 검증하고 bytes 조각 generator 반환 (검증 실패 시 ExportError 를 바로 발생)"""
+    if layout not in LAYOUTS:
+        raise ExportError("invalid_layout")
+    if fmt not in FORMATS:
+        raise ExportError("invalid_format")
+    if layout == "sheet" and fmt != "csv":
+        raise ExportError("sheet_layout_requires_csv")
+    if (start or end) and not week_labels_between(start or end, end or start):
+        raise ExportError("invalid_week_range")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401  (선택 의존성)
+        except ImportError:
+            raise ExportError("parquet_unavailable")
+
+    if layout == "sheet":
+        chunks = _sheet_chunks(start, end, member_ids, include_left)
+    else:
+        columns = STATUS_COLUMNS if layout == "statuses" else SUMMARY_COLUMNS
+        rows = _rows(layout, start, end, member_ids, include_left)
+        if fmt == "csv":
+            chunks = _csv_chunks([name for name, _ in columns], rows)
+        elif fmt == "jsonl":
+            chunks = _jsonl_chunks([name for name, _ in columns], rows)
+        else:
+            chunks = _parquet_chunks(columns, rows)
+    return _gzip_chunks(chunks) if compress else chunks
+
+
+def filename_for(layout: str, fmt: str, compress: bool) -> str:
+    return f"corgi_check_{layout}.{fmt}" + (".gz" if compress else "")
+
+
+def _week_filter(column, start: str, end: str) -> list:
+    conditions = []
+    if start:
+        conditions.append(column >= start)
+    if end:
+        conditions.append(column <= end)
+    return conditions
+
+
+def _member_filter(member_ids: list, include_left: bool) -> list:
+    conditions = []
+    if member_ids:
+        conditions.append(Member.id.in_(member_ids))
+    if not include_left:
+        conditions.append(Member.is_active == True)
+    return conditions
+
+
+def _rows(layout: str, start: str, end: str, member_ids: list, include_left: bool):
+    if layout == "statuses":
+        query = (
+            select(
+                WeeklyStatusAll.week_label, WeeklyStatusAll.member_id, Member.name, Member.birth_date,
+                Member.is_active, WeeklyStatusAll.status, WeeklyStatusAll.exclude_reason,
+                WeeklyStatusAll.exclude_reason_detail, WeeklyStatusAll.certified_date,
+                WeeklyStatusAll.certified_at, WeeklyStatusAll.is_exclude_but_certified,
+            )
+            .join(Member, Member.id == WeeklyStatusAll.member_id)
+            .where(
+                *_week_filter(WeeklyStatusAll.week_label, start, end),
+                *_member_filter(member_ids, include_left),
+            )
+            .order_by(WeeklyStatusAll.week_label, WeeklyStatusAll.member_id)
+        )
+    else:
+        query = (
+            select(WeeklySummary.week_label, WeeklySummary.summary_text, WeeklySummary.created_at)
+            .where(*_week_filter(WeeklySummary.week_label, start, end))
+            .order_by(WeeklySummary.week_label)
+        )
+
+    with read_engine.connect() as conn:
+        for row in conn.execution_options(yield_per=BATCH_SIZE).execute(query):
+            yield tuple(row)
+
+
+def _csv_chunks(header: list, rows, bom: bool = False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if bom:
+        buffer.write("\ufeff")
+    writer.writerow(header)
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _jsonl_chunks(columns: list, rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+        if len(lines) >= BATCH_SIZE:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+class _ParquetSink(io.RawIOBase):
+    """ParquetWriter 출력을 모아 두었다가 조각 단위로 넘기는 쓰기 전용 파일 객체"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_chunks(columns: list, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"str": pa.string(), "int": pa.int64(), "bool": pa.bool_()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def write_batch(batch):
+        table = pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)],
+            schema=schema,
+        )
+        writer.write_table(table)
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= PARQUET_BATCH_SIZE:
+            write_batch(batch)
+            batch = []
+            yield sink.drain()
+    if batch:
+        write_batch(batch)
+    writer.close()
+    yield sink.drain()
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip 헤더 포함
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _sheet_chunks(start: str, end: str, member_ids: list, include_left: bool):
+    with read_engine.connect() as conn:
+        # 범위를 지정하지 않으면 기록된 첫 주 ~ 마지막 주
+        if not (start and end):
+            first, last = conn.execute(
+                select(func.min(WeeklyStatusAll.week_label), func.max(WeeklyStatusAll.week_label))
+            ).one()
+            start, end = start or first, end or last
+        weeks = week_labels_between(start, end) if start and end else []
+        week_index = {wl: i for i, wl in enumerate(weeks)}
+
+        query = (
+            select(
+                Member.id, Member.name, Member.birth_date, Member.is_active,
+                Member.left_date, Member.left_reason, WeeklyStatusAll.week_label,
+                WeeklyStatusAll.status, WeeklyStatusAll.exclude_reason, WeeklyStatusAll.exclude_reason_detail,
+            )
+            .outerjoin(WeeklyStatusAll, and_(
+                WeeklyStatusAll.member_id == Member.id,
+                *_week_filter(WeeklyStatusAll.week_label, start, end),
+            ))
+            .where(*_member_filter(member_ids, include_left))
+            .order_by(Member.id)
+        )
+        rows = conn.execution_options(yield_per=BATCH_SIZE).execute(query)
+        yield from _csv_chunks(SHEET_COLUMNS + [sheet_date(wl) for wl in weeks], _sheet_rows(rows, week_index), bom=True)
+
+
+def _sheet_rows(rows, week_index: dict):
+    """멤버 id 순으로 정렬된 (멤버, 주차 상태) 행을 멤버 한 행으로 묶음"""
+    current = None
+    cells = []
+    for row in rows:
+        if current is None or row.id != current.id:
+            if current is not None:
+                yield _sheet_member(current) + cells
+            current = row
+            cells = [""] * len(week_index)
+        idx = week_index.get(row.week_label)
+        if idx is not None:
+            cells[idx] = sheet_cell(row.status, row.exclude_reason, row.exclude_reason_detail)
+    if current is not None:
+        yield _sheet_member(current) + cells
+
+
+def _sheet_member(row) -> list:
+    return [
+        row.name,
+        row.birth_date or "",
+        "",
+        "" if row.is_active else "Y",
+        row.left_date or "",
+        row.left_reason or "",
+    ]
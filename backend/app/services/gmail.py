@@ -2,12 +2,13 @@ import os
 import json
 import base64
 import tempfile
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from sqlalchemy.orm import Session
+from app import metrics
 from app.models import AppConfig
 
+# google-auth / googleapiclient 는 import 가 무거워(수백 ms) 서버 시작을 늦추므로
+# 주 1회 쓰는 Gmail 기능을 처음 호출할 때 함수 안에서 import 한다.
+
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 CLIENT_SECRETS_FILE = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
@@ -32,6 +33,8 @@ def _set_config(db: Session, key: str, value: str):
 
 
 def get_auth_url() -> str:
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_secrets_file(
         CLIENT_SECRETS_FILE, scopes=SCOPES, redirect_uri=REDIRECT_URI
     )
@@ -42,6 +45,8 @@ def get_auth_url() -> str:
 
 
 def handle_callback(code: str, db: Session) -> bool:
+    from google_auth_oauthlib.flow import Flow
+
     flow = Flow.from_client_secrets_file(
         CLIENT_SECRETS_FILE, scopes=SCOPES, redirect_uri=REDIRECT_URI
     )
@@ -60,6 +65,8 @@ def handle_callback(code: str, db: Session) -> bool:
 
 
 def _get_credentials(db: Session):
+    from google.oauth2.credentials import Credentials
+
     token_json = _get_config(db, "gmail_token")
     if not token_json:
         return None
@@ -102,6 +109,7 @@ def is_connected(db: Session) -> bool:
 
 def find_latest_chat_mail(db: Session):
     from google.auth.exceptions import RefreshError
+    from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
 
     print("=== find_latest_chat_mail START ===")
@@ -121,6 +129,7 @@ def find_latest_chat_mail(db: Session):
         results = service.users().messages().list(
             userId="me", q='subject:"Kakaotalk_Chat"', maxResults=1
         ).execute()
+        metrics.GMAIL_API_CALLS.inc(method="messages.list")
 
         messages = results.get("messages", [])
         print(f"Found {len(messages)} messages")
@@ -131,6 +140,7 @@ def find_latest_chat_mail(db: Session):
             results2 = service.users().messages().list(
                 userId="me", q='subject:Kakaotalk OR subject:KakaoTalk', maxResults=5
             ).execute()
+            metrics.GMAIL_API_CALLS.inc(method="messages.list")
             messages2 = results2.get("messages", [])
             print(f"Broader search found {len(messages2)} messages")
 
@@ -140,6 +150,7 @@ def find_latest_chat_mail(db: Session):
                 message = service.users().messages().get(
                     userId="me", id=msg_id, format="full"
                 ).execute()
+                metrics.GMAIL_API_CALLS.inc(method="messages.get")
                 # 제목 출력
                 headers = message.get("payload", {}).get("headers", [])
                 subject = next((h["value"] for h in headers if h["name"].lower() == "subject"), "Unknown")
@@ -153,6 +164,7 @@ def find_latest_chat_mail(db: Session):
         message = service.users().messages().get(
             userId="me", id=msg_id, format="full"
         ).execute()
+        metrics.GMAIL_API_CALLS.inc(method="messages.get")
 
         # 제목 출력
         headers = message.get("payload", {}).get("headers", [])
@@ -179,6 +191,7 @@ def find_latest_chat_mail(db: Session):
 
 def download_attachment(db: Session, message) -> str:
     from google.auth.exceptions import RefreshError
+    from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
 
     creds = _get_credentials(db)
@@ -196,7 +209,9 @@ def download_attachment(db: Session, message) -> str:
                     att = service.users().messages().attachments().get(
                         userId="me", messageId=message["id"], id=att_id
                     ).execute()
+                    metrics.GMAIL_API_CALLS.inc(method="messages.attachments.get")
                     data = base64.urlsafe_b64decode(att["data"])
+                    metrics.GMAIL_BYTES.inc(len(data))
                     tmp_dir = tempfile.mkdtemp()
                     zip_path = os.path.join(tmp_dir, filename)
                     with open(zip_path, "wb") as f:
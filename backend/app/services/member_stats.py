@@ -0,0 +1,277 @@
+"""멤버별 통계 (member_stats / member_quarter_stats) 증분 갱신
+
+상태를 쓰는 경로(update_status, 정산 persist, import_csv)는 커밋 전에
+record_changes 로 (member_id, week_label, 이전 상태, 새 상태) 목록을 넘긴다.
+상태별 주 수는 증감분만 더하고, 연속 인증은 마지막 주차 뒤에 새 주차가 붙는
+경우만 이어서 계산한다. 과거 주차가 바뀐 멤버는 해당 멤버 이력으로 다시 계산한다.
+
+    python -m app.services.member_stats --rebuild  # 전체 재계산
+    python -m app.services.member_stats --check    # 저장된 통계와 weekly_status 비교
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models import MemberQuarterStats, MemberStats, WeeklyStatus, WeeklyStatusAll
+from app.services.weeks import week_quarter
+
+STATUSES = ("injeung", "fine", "penalty", "exclude")
+CHUNK_SIZE = 500
+
+
+class _Accumulator:
+    """한 멤버의 상태를 주차 순서로 받아 통계를 계산 (재계산 / 검사 / 증분 공통)"""
+
+    def __init__(self, current_streak: int = 0, best_streak: int = 0, last_week: str = None):
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.quarters = defaultdict(lambda: dict.fromkeys(STATUSES, 0))
+        self.weeks = 0
+        self.current_streak = current_streak
+        self.best_streak = best_streak
+        self.last_week = last_week
+
+    def add(self, week_label: str, status: str):
+        self.weeks += 1
+        if status in STATUSES:
+            self.counts[status] += 1
+            self.quarters[week_quarter(week_label)][status] += 1
+        # 제외 주는 연속 인증을 끊지도 늘리지도 않음
+        if status == "injeung":
+            self.current_streak += 1
+            self.best_streak = max(self.best_streak, self.current_streak)
+        elif status != "exclude":
+            self.current_streak = 0
+        self.last_week = week_label
+
+    def streak_row(self, member_id: int, now_iso: str) -> dict:
+        return {
+            "member_id": member_id,
+            "current_streak": self.current_streak,
+            "best_streak": self.best_streak,
+            "last_week": self.last_week,
+            "updated_at": now_iso,
+        }
+
+
+def _chunks(items: list):
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+def _status_source(db):
+    """weekly_status_all 뷰. 뷰를 만드는 마이그레이션(8단계) 전이면 weekly_status"""
+    conn = db.connection() if isinstance(db, Session) else db
+    return WeeklyStatusAll if "weekly_status_all" in inspect(conn).get_view_names() else WeeklyStatus
+
+
+def _accumulate(db, member_ids: list = None) -> dict:
+    """weekly_status_all (보관된 행 포함) 을 멤버 / 주차 순으로 읽어 {member_id: _Accumulator}"""
+    source = _status_source(db)
+    query = select(source.member_id, source.week_label, source.status)
+    chunks = [None] if member_ids is None else list(_chunks(member_ids))
+    accumulators = {}
+    for chunk in chunks:
+        chunk_query = query if chunk is None else query.where(source.member_id.in_(chunk))
+        rows = db.execute(chunk_query.order_by(source.member_id, source.week_label))
+        for member_id, week_label, status in rows:
+            acc = accumulators.get(member_id)
+            if acc is None:
+                acc = accumulators[member_id] = _Accumulator()
+            acc.add(week_label, status)
+    return accumulators
+
+
+def _add_deltas(db, model, keys: list, rows: list):
+    """키가 없으면 삽입, 있으면 기존 값에 증감분을 더함"""
+    if not rows:
+        return
+    stmt = sqlite_insert(model)
+    columns = [c for c in rows[0] if c not in keys]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={c: getattr(model, c) + stmt.excluded[c] for c in columns},
+    )
+    for chunk in _chunks(rows):
+        db.execute(stmt, chunk)
+
+
+def record_changes(db, changes: list):
+    """상태 변경 목록을 통계에 반영 (커밋은 호출자가, 상태 쓰기와 같은 트랜잭션)
+
+    changes: [(member_id, week_label, 이전 상태 또는 None, 새 상태 또는 None), ...]
+    """
+    changes = [c for c in changes if c[2] != c[3]]
+    if not changes:
+        return
+
+    totals = defaultdict(lambda: dict.fromkeys(("weeks",) + STATUSES, 0))
+    quarters = defaultdict(lambda: dict.fromkeys(STATUSES, 0))
+    for member_id, week_label, old, new in changes:
+        for status, sign in ((old, -1), (new, 1)):
+            if status is None:
+                continue
+            totals[member_id]["weeks"] += sign
+            if status in STATUSES:
+                totals[member_id][status] += sign
+                quarters[(member_id, week_quarter(week_label))][status] += sign
+
+    _add_deltas(db, MemberStats, ["member_id"], [
+        {"member_id": member_id, **counts} for member_id, counts in totals.items()
+    ])
+    _add_deltas(db, MemberQuarterStats, ["member_id", "quarter"], [
+        {"member_id": member_id, "quarter": quarter, **counts}
+        for (member_id, quarter), counts in quarters.items()
+    ])
+    _update_streaks(db, changes)
+
+
+def _update_streaks(db, changes: list):
+    by_member = defaultdict(list)
+    for member_id, week_label, old, new in changes:
+        by_member[member_id].append((week_label, old, new))
+
+    member_ids = list(by_member)
+    current = {}
+    for chunk in _chunks(member_ids):
+        for row in db.execute(
+            select(
+                MemberStats.member_id, MemberStats.current_streak,
+                MemberStats.best_streak, MemberStats.last_week,
+            ).where(MemberStats.member_id.in_(chunk))
+        ):
+            current[row.member_id] = row
+
+    now_iso = datetime.now().isoformat()
+    updates = []
+    recompute = []
+    for member_id, items in by_member.items():
+        row = current[member_id]
+        items.sort()
+        # 마지막 주차 뒤에 새 주차만 추가된 경우 (매주 정산) 기존 연속 기록에 이어서 계산
+        if all(old is None and new is not None and (row.last_week is None or week_label > row.last_week)
+               for week_label, old, new in items):
+            acc = _Accumulator(row.current_streak, row.best_streak, row.last_week)
+            for week_label, _, new in items:
+                acc.add(week_label, new)
+            updates.append(acc.streak_row(member_id, now_iso))
+        else:
+            recompute.append(member_id)
+
+    if recompute:
+        # 세션이 autoflush=False 이므로 다시 읽기 전에 보류 중인 상태 변경을 반영
+        if isinstance(db, Session):
+            db.flush()
+        accumulators = _accumulate(db, recompute)
+        for member_id in recompute:
+            acc = accumulators.get(member_id) or _Accumulator()
+            updates.append(acc.streak_row(member_id, now_iso))
+
+    for chunk in _chunks(updates):
+        db.execute(update(MemberStats), chunk)
+
+
+def forget_member(db, member_id: int):
+    """멤버 삭제 시 통계도 삭제"""
+    db.execute(delete(MemberQuarterStats).where(MemberQuarterStats.member_id == member_id))
+    db.execute(delete(MemberStats).where(MemberStats.member_id == member_id))
+
+
+def clear(db):
+    db.execute(delete(MemberQuarterStats))
+    db.execute(delete(MemberStats))
+
+
+def _expected_rows(db) -> tuple:
+    now_iso = datetime.now().isoformat()
+    stats_rows = []
+    quarter_rows = []
+    for member_id, acc in _accumulate(db).items():
+        stats_rows.append({**acc.streak_row(member_id, now_iso), "weeks": acc.weeks, **acc.counts})
+        quarter_rows.extend(
+            {"member_id": member_id, "quarter": quarter, **counts}
+            for quarter, counts in acc.quarters.items()
+        )
+    return stats_rows, quarter_rows
+
+
+def rebuild(db) -> int:
+    """weekly_status 전체에서 통계를 다시 계산 (Session / Connection 모두 가능)"""
+    stats_rows, quarter_rows = _expected_rows(db)
+    clear(db)
+    for chunk in _chunks(stats_rows):
+        db.execute(insert(MemberStats), chunk)
+    for chunk in _chunks(quarter_rows):
+        db.execute(insert(MemberQuarterStats), chunk)
+    return len(stats_rows)
+
+
+def check(db) -> list:
+    """저장된 통계와 weekly_status_all 로 다시 계산한 값의 차이 목록 (빈 리스트면 일치)"""
+    stats_rows, quarter_rows = _expected_rows(db)
+    problems = []
+
+    stat_columns = ["weeks", *STATUSES, "current_streak", "best_streak", "last_week"]
+    expected = {row["member_id"]: row for row in stats_rows}
+    stored = {
+        row["member_id"]: row
+        for row in db.execute(select(MemberStats.member_id, *[getattr(MemberStats, c) for c in stat_columns])).mappings()
+    }
+    for member_id in sorted(expected.keys() | stored.keys()):
+        want = expected.get(member_id)
+        have = stored.get(member_id)
+        # 상태가 모두 지워진 멤버는 0 으로 남아 있어도 정상
+        if want is None and have["weeks"] == 0:
+            continue
+        for column in stat_columns:
+            want_value = want[column] if want else None
+            have_value = have[column] if have else None
+            if want_value != have_value:
+                problems.append(f"member_stats {member_id}.{column}: {have_value} (expected {want_value})")
+
+    expected_quarters = {(row["member_id"], row["quarter"]): row for row in quarter_rows}
+    stored_quarters = {
+        (row["member_id"], row["quarter"]): row
+        for row in db.execute(select(
+            MemberQuarterStats.member_id, MemberQuarterStats.quarter, *[getattr(MemberQuarterStats, c) for c in STATUSES]
+        )).mappings()
+    }
+    zero = dict.fromkeys(STATUSES, 0)
+    for key in sorted(expected_quarters.keys() | stored_quarters.keys()):
+        want = expected_quarters.get(key, zero)
+        have = stored_quarters.get(key, zero)
+        for column in STATUSES:
+            if want[column] != have[column]:
+                problems.append(f"member_quarter_stats {key[0]} {key[1]}.{column}: {have[column]} (expected {want[column]})")
+    return problems
+
+
+def main():
+    from app.database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="멤버별 통계 재계산 / 검사")
+    parser.add_argument("--rebuild", action="store_true", help="weekly_status 전체에서 통계 다시 계산")
+    parser.add_argument("--check", action="store_true", help="저장된 통계와 weekly_status 비교")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            count = rebuild(db)
+            db.commit()
+            print(f"통계 재계산 완료: 멤버 {count}명")
+        if args.check or not args.rebuild:
+            problems = check(db)
+            for line in problems:
+                print(line)
+            print("통계 일치" if not problems else f"불일치 {len(problems)}건 (--rebuild 로 재계산)")
+            if problems:
+                raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
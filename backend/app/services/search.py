@@ -0,0 +1,119 @@
+"""정산 문구 전문 검색 (SQLite FTS5, trigram 토크나이저)
+
+weekly_summary_fts 는 weekly_summary 를 content 테이블로 쓰는 external content FTS5 테이블이고,
+트리거로 INSERT / UPDATE / DELETE 가 같은 트랜잭션에서 동기화된다
+(app/migrations.py 4단계에서 생성 후 기존 행 백필).
+trigram 은 3글자 단위로 색인하므로 띄어쓰기 없는 한글 이름("96장영범")도 부분 문자열로 찾는다.
+3글자 미만 단어는 색인을 쓸 수 없어 instr 로 거른다.
+"""
+import re
+from sqlalchemy import text
+
+FTS_TABLE = "weekly_summary_fts"
+MIN_TERM_LENGTH = 3  # trigram 색인이 쓰이는 최소 검색어 길이
+SNIPPET_TOKENS = 16  # snippet 길이 (trigram 기준 토큰 = 글자 수)
+HIGHLIGHT = ("<mark>", "</mark>")
+
+CREATE_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "week_label UNINDEXED, summary_text, "
+    "content='weekly_summary', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS weekly_summary_fts_ai AFTER INSERT ON weekly_summary BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, week_label, summary_text) "
+    "VALUES (new.id, new.week_label, new.summary_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS weekly_summary_fts_ad AFTER DELETE ON weekly_summary BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, week_label, summary_text) "
+    "VALUES ('delete', old.id, old.week_label, old.summary_text); END",
+    f"CREATE TRIGGER IF NOT EXISTS weekly_summary_fts_au AFTER UPDATE ON weekly_summary BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, week_label, summary_text) "
+    "VALUES ('delete', old.id, old.week_label, old.summary_text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, week_label, summary_text) "
+    "VALUES (new.id, new.week_label, new.summary_text); END",
+]
+
+
+def create_index(conn):
+    """FTS5 테이블 / 동기화 트리거 생성 (멱등)"""
+    for statement in CREATE_STATEMENTS:
+        conn.execute(text(statement))
+
+
+def rebuild_index(conn):
+    """weekly_summary 전체로 색인을 다시 만듦 (백필 / 복구용)"""
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def search_terms(query: str) -> list:
+    return [term for term in re.split(r"\s+", query.strip()) if term]
+
+
+def fts_query(terms: list) -> str:
+    """검색어를 FTS5 구문으로 변환. 각 단어를 따옴표로 감싸 특수문자를 그대로 검색 (AND)"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _plain_snippet(summary: str, terms: list) -> str:
+    """색인 없이 찾은 결과용 snippet: 첫 번째 검색어 주변만 잘라 강조"""
+    pos = summary.find(terms[0])
+    start = max(pos - SNIPPET_TOKENS // 2, 0)
+    end = min(pos + len(terms[0]) + SNIPPET_TOKENS // 2, len(summary))
+    snippet = summary[start:end]
+    for term in terms:
+        snippet = snippet.replace(term, HIGHLIGHT[0] + term + HIGHLIGHT[1])
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(summary) else "")
+
+
+async def search_summaries(db, query: str, limit: int = 20, offset: int = 0, year: int = None) -> dict:
+    """정산 문구 검색. 공백으로 나눈 단어를 모두 포함하는 주차를 관련도(bm25) 순으로.
+
+    3글자 이상 단어는 FTS5 MATCH, 짧은 단어는 instr 로 거름
+    (trigram 테이블에서 짧은 LIKE 는 항상 빈 결과). 긴 단어가 없으면 최신 주차 순.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return {"total": 0, "results": []}
+
+    long_terms = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+    short_terms = [term for term in terms if len(term) < MIN_TERM_LENGTH]
+
+    params = {"limit": limit, "offset": offset}
+    conditions = []
+    for i, term in enumerate(short_terms):
+        conditions.append(f"instr(s.summary_text, :term{i}) > 0")
+        params[f"term{i}"] = term
+    if year:
+        conditions.append("substr(s.week_label, 1, 4) = :year")
+        params["year"] = str(year)
+
+    if long_terms:
+        params["match"] = fts_query(long_terms)
+        where = " AND ".join([f"{FTS_TABLE} MATCH :match"] + conditions)
+        total = (await db.execute(text(
+            f"SELECT COUNT(*) FROM {FTS_TABLE} s WHERE {where}"
+        ), params)).scalar()
+        rows = (await db.execute(text(
+            f"SELECT s.week_label, "
+            f"snippet({FTS_TABLE}, 1, '{HIGHLIGHT[0]}', '{HIGHLIGHT[1]}', '…', {SNIPPET_TOKENS}) AS snippet, "
+            f"bm25({FTS_TABLE}) AS score "
+            f"FROM {FTS_TABLE} s WHERE {where} "
+            "ORDER BY score, s.week_label DESC LIMIT :limit OFFSET :offset"
+        ), params)).all()
+        results = [
+            {"week_label": row.week_label, "snippet": row.snippet, "score": round(-row.score, 4)}
+            for row in rows
+        ]
+    else:
+        where = " AND ".join(conditions)
+        total = (await db.execute(text(
+            f"SELECT COUNT(*) FROM weekly_summary s WHERE {where}"
+        ), params)).scalar()
+        rows = (await db.execute(text(
+            f"SELECT s.week_label, s.summary_text FROM weekly_summary s WHERE {where} "
+            "ORDER BY s.week_label DESC LIMIT :limit OFFSET :offset"
+        ), params)).all()
+        results = [
+            {"week_label": row.week_label, "snippet": _plain_snippet(row.summary_text, terms), "score": None}
+            for row in rows
+        ]
+
+    return {"total": total, "results": results}
@@ -0,0 +1,445 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+from app import cache, events, metrics
+from app.models import Member, MidSettlementState, WeeklyStatus, WeeklyStatusArchive, WeeklySummary
+from app.services import activity, archive, changes, gmail, chat_parser, member_stats, versioning
+from app.services.weeks import week_label_of
+
+logger = logging.getLogger(__name__)
+
+DAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+
+EXCLUDE_LABELS = {
+    'illness': '질병',
+    'travel': '여행',
+    'business': '출장',
+    'injury': '부상',
+    'surgery': '수술',
+    'custom': '직접쓰기',
+}
+
+
+class SettlementError(Exception):
+    """정산 단계 실패. 메시지는 API 응답의 error 값으로 그대로 사용"""
+
+
+def format_date(d: date) -> str:
+    dn = DAY_NAMES[d.weekday()]
+    return f"{d.year}-{d.month:02d}-{d.day:02d}({dn})"
+
+
+def birth_sort_key(birth_prefix: str) -> int:
+    # 빈 값 처리
+    if not birth_prefix:
+        return 9999
+    # 2자리 숫자를 4자리로 변환 (00-29 → 2000-2029, 30-99 → 1930-1999)
+    year_2digit = int(birth_prefix)
+    if year_2digit <= 29:
+        return 2000 + year_2digit
+    return 1900 + year_2digit
+
+
+def sort_by_birth_name(lst: list) -> list:
+    """생년→가나다 순 정렬 (2000년대생 고려)"""
+    return sorted(lst, key=lambda r: (birth_sort_key(r["birth_prefix"]), r["name"]))
+
+
+class SettlementPipeline:
+    """정산 흐름을 단계별로 실행하고 단계마다 소요 시간/처리량을 기록.
+
+    단계: find_mail → download → decode → parse → match → summarize → persist
+    각 단계의 기록은 self.timings 에 {"stage", "ms", ...} 형식으로 쌓인다.
+    """
+
+    def __init__(self, db: Session, monday: date):
+        self.db = db
+        self.monday = monday
+        self.sunday = monday + timedelta(days=6)
+        self.week_label = week_label_of(monday)
+        self.timings = []
+        self.text = ""
+        self.message_id = None
+        self.mid_state = None
+        self.mid_offset = 0
+        self.photo_counts = {}
+        self.events = chat_parser.PhotoEvents()
+        self.members = []
+        self.ws_map = {}
+        self.results = []
+
+    @contextmanager
+    def stage(self, name: str):
+        record = {"stage": name}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+            self.timings.append(record)
+
+    def fetch_text(self, known_message_id: str = None) -> str:
+        """Gmail에서 최신 카카오톡 내보내기 메일을 찾아 txt 본문까지 읽음
+
+        최신 메일이 known_message_id 와 같으면(이미 읽은 내보내기) 다운로드하지 않고 None 반환.
+        """
+        if not gmail.is_connected(self.db):
+            raise SettlementError("Gmail not connected")
+
+        with self.stage("find_mail") as record:
+            message = gmail.find_latest_chat_mail(self.db)
+            record["found"] = bool(message)
+        if not message:
+            raise SettlementError("No Kakaotalk_Chat mail found")
+        self.message_id = message.get("id")
+        if known_message_id and self.message_id == known_message_id:
+            self.text = None
+            return None
+
+        with self.stage("download") as record:
+            zip_path = gmail.download_attachment(self.db, message)
+            record["bytes"] = os.path.getsize(zip_path) if zip_path else 0
+        if not zip_path:
+            raise SettlementError("No zip attachment found")
+
+        with self.stage("decode") as record:
+            text = chat_parser.unzip_and_read(zip_path)
+            record["chars"] = len(text)
+            record["lines"] = text.count("\n") + 1 if text else 0
+        if not text:
+            raise SettlementError("No txt file found in zip")
+
+        self.text = text
+        return text
+
+    def read_export(self, path: str) -> str:
+        """Gmail 대신 로컬 카카오톡 내보내기 파일(.zip / .txt)을 읽음"""
+        with self.stage("decode") as record:
+            text = chat_parser.read_export_file(path)
+            record["chars"] = len(text)
+            record["lines"] = text.count("\n") + 1 if text else 0
+        if not text:
+            raise SettlementError("No chat text found in export file")
+
+        self.text = text
+        return text
+
+    def parse(self) -> dict:
+        with self.stage("parse") as record:
+            self.events = chat_parser.PhotoEvents()
+            self.photo_counts = chat_parser.parse_chat(self.text, self.monday, self.sunday, self.events)
+            record["lines"] = self.text.count("\n") + 1
+            record["rows"] = len(self.photo_counts)
+            record["events"] = len(self.events)
+        metrics.record_parse(record["lines"], record["ms"] / 1000)
+        return self.photo_counts
+
+    def load_mid_state(self):
+        """이 주차의 이전 중간정산 상태 (없으면 None)"""
+        self.mid_state = self.db.get(MidSettlementState, self.week_label)
+        return self.mid_state
+
+    def _mid_anchor(self, offset: int) -> str:
+        """offset 직전 한 줄의 해시 (내보내기 맨 앞의 저장 시각 줄은 매번 바뀌므로 포함하지 않음)"""
+        line_start = self.text.rfind("\n", 0, max(0, offset - 1)) + 1
+        return hashlib.sha1(self.text[line_start:offset].encode()).hexdigest()
+
+    def parse_incremental(self) -> dict:
+        """중간정산: 이전 실행(mid_state)이 읽은 위치 뒤에 추가된 줄만 파싱해 누적 집계에 더함.
+
+        새 내보내기의 같은 위치 직전 내용이 이전과 다르면(다른 대화, 앞부분이 바뀐 내보내기) 처음부터 파싱.
+        fetch_text 가 이미 읽은 메일이라 본문이 없으면(None) 이전 집계를 그대로 사용.
+        """
+        state = self.mid_state
+        with self.stage("parse") as record:
+            if self.text is None:
+                self.photo_counts = json.loads(state.tally)
+                self.mid_offset = state.text_offset
+                record.update(lines=0, resumed_from=state.text_offset, rows=len(self.photo_counts))
+                return self.photo_counts
+
+            # 마지막 줄이 잘려 있으면 다음 실행에서 다시 읽도록 완전한 줄까지만
+            end = self.text.rfind("\n") + 1
+            start = 0
+            tally = {}
+            if (
+                state and state.anchor_hash and state.text_offset <= end
+                and self._mid_anchor(state.text_offset) == state.anchor_hash
+            ):
+                start = state.text_offset
+                tally = json.loads(state.tally)
+
+            chunk = self.text[start:end]
+            for nickname, data in chat_parser.parse_chat(chunk, self.monday, self.sunday).items():
+                if nickname in tally:
+                    tally[nickname]["count"] += data["count"]
+                    tally[nickname]["last_date"] = data["last_date"]
+                    tally[nickname]["last_time"] = data["last_time"]
+                else:
+                    tally[nickname] = data
+            self.photo_counts = tally
+            self.mid_offset = end
+            record["lines"] = chunk.count("\n")
+            record["resumed_from"] = start
+            record["rows"] = len(tally)
+        metrics.record_parse(record["lines"], record["ms"] / 1000)
+        return self.photo_counts
+
+    def save_mid_state(self) -> list:
+        """누적 집계 / 읽은 위치 / 벌점 대상을 저장하고, 직전 실행 이후 벌점 대상에서 빠진 멤버 반환"""
+        penalty_ids = [r["member_id"] for r in self.results if r["status"] == "penalty" and r["member_id"]]
+        previous = set(json.loads(self.mid_state.penalty_ids)) if self.mid_state else set()
+        current = set(penalty_ids)
+        cleared = sort_by_birth_name([
+            r for r in self.results if r["member_id"] in previous and r["member_id"] not in current
+        ])
+
+        state = self.mid_state or MidSettlementState(week_label=self.week_label)
+        if self.text is not None:
+            state.message_id = self.message_id
+            state.text_offset = self.mid_offset
+            state.anchor_hash = self._mid_anchor(self.mid_offset)
+        state.tally = json.dumps(self.photo_counts, ensure_ascii=False)
+        state.penalty_ids = json.dumps(sorted(current))
+        state.updated_at = datetime.now().isoformat()
+        self.db.add(state)
+        self.db.commit()
+        self.mid_state = state
+        return [
+            {
+                "member_id": r["member_id"],
+                "name": r["name"],
+                "birth_prefix": r["birth_prefix"],
+                "status": r["status"],
+                "photo_count": r["photo_count"],
+            }
+            for r in cleared
+        ]
+
+    def match(self) -> list:
+        with self.stage("match") as record:
+            members = self.db.query(Member).filter(Member.is_active == True).all()
+            self.members = members
+            statuses = self.db.query(WeeklyStatus).filter(
+                WeeklyStatus.week_label == self.week_label
+            ).all()
+            self.ws_map = {ws.member_id: ws for ws in statuses}
+            if self.week_label < archive.season_cutoff():
+                # 닫힌 시즌의 주차: 보관된 행은 읽기만 하고 되돌리기는 persist 에서 (중간정산은 쓰지 않음)
+                active_ids = {m.id for m in members}
+                archived = self.db.query(WeeklyStatusArchive).filter(
+                    WeeklyStatusArchive.week_label == self.week_label
+                ).all()
+                for ws in archived:
+                    if ws.member_id in active_ids:
+                        self.ws_map.setdefault(ws.member_id, ws)
+            self.results = chat_parser.build_result(self.photo_counts, members, self.ws_map)
+            record["rows"] = len(self.results)
+        return self.results
+
+    def summarize(self, manager_name: str) -> str:
+        with self.stage("summarize") as record:
+            summary = build_summary(self.results, self.monday, self.sunday, manager_name)
+            record["lines"] = summary.count("\n") + 1
+        return summary
+
+    def summarize_mid(self) -> str:
+        with self.stage("summarize") as record:
+            summary = build_mid_summary(self.results)
+            record["lines"] = summary.count("\n") + 1
+        return summary
+
+    def _restore_archived(self):
+        """닫힌 시즌의 주차: 정산 대상 멤버의 보관된 행을 weekly_status 로 되돌리고 ws_map 을 다시 읽음"""
+        if not archive.restore(self.db, [m.id for m in self.members], self.week_label, self.week_label):
+            return
+        restored = self.db.query(WeeklyStatus).filter(WeeklyStatus.week_label == self.week_label).all()
+        for ws in restored:
+            seen = self.ws_map.get(ws.member_id)
+            if isinstance(seen, WeeklyStatusArchive):
+                if seen.version != ws.version:
+                    # match 이후 다른 요청이 되돌려서 고친 행
+                    self.db.rollback()
+                    raise versioning.VersionConflict(
+                        versioning.current_statuses(self.db, [self.week_label], [ws.member_id])
+                    )
+                self.db.expunge(seen)
+            self.ws_map[ws.member_id] = ws
+
+    def persist(self, summary: str):
+        """WeeklyStatus / WeeklySummary 에 정산 결과 저장"""
+        with self.stage("persist") as record:
+            if self.week_label < archive.season_cutoff():
+                self._restore_archived()
+            now_iso = datetime.now().isoformat()
+            written = 0
+            stat_changes = []
+            touched = []  # 이번 정산으로 쓴 멤버 (제외 주의 is_exclude_but_certified 갱신 포함)
+            created = []  # 새로 만든 (member_id, week_label) - 같은 행을 동시에 만들었는지 확인
+
+            for result in self.results:
+                if result["member_id"] is None:
+                    continue  # DB에 없는 멤버는 스킵
+
+                # match 단계에서 조회한 해당 주차 WeeklyStatus 재사용
+                existing_ws = self.ws_map.get(result["member_id"])
+
+                if existing_ws:
+                    # 기존 데이터 업데이트 (제외 상태가 아니면 정산 결과로 덮어쓰기)
+                    if existing_ws.status != "exclude":
+                        stat_changes.append((result["member_id"], self.week_label, existing_ws.status, result["status"]))
+                        existing_ws.status = result["status"]
+                        existing_ws.exclude_reason = result["exclude_reason"]
+                        existing_ws.exclude_reason_detail = result["exclude_reason_detail"]
+                        existing_ws.certified_date = result.get("certified_date")
+                        existing_ws.certified_at = result.get("certified_at")
+                        existing_ws.is_exclude_but_certified = False
+                    else:
+                        existing_ws.is_exclude_but_certified = result.get("is_exclude_but_certified", False)
+                else:
+                    # 새로운 데이터 생성
+                    new_ws = WeeklyStatus(
+                        member_id=result["member_id"],
+                        week_label=self.week_label,
+                        status=result["status"],
+                        exclude_reason=result["exclude_reason"],
+                        exclude_reason_detail=result["exclude_reason_detail"],
+                        certified_date=result.get("certified_date"),
+                        certified_at=result.get("certified_at"),
+                        is_exclude_but_certified=result.get("is_exclude_but_certified", False),
+                        created_at=now_iso
+                    )
+                    self.db.add(new_ws)
+                    created.append((result["member_id"], self.week_label))
+                    stat_changes.append((result["member_id"], self.week_label, None, result["status"]))
+                touched.append(result["member_id"])
+                written += 1
+
+            # WeeklySummary에 저장 (과거 내역용)
+            existing_summary = self.db.query(WeeklySummary).filter(
+                WeeklySummary.week_label == self.week_label
+            ).first()
+
+            if existing_summary:
+                existing_summary.summary_text = summary
+            else:
+                self.db.add(WeeklySummary(
+                    week_label=self.week_label,
+                    summary_text=summary,
+                    created_at=now_iso
+                ))
+
+            # 최종 정산이 끝난 주의 중간정산 상태는 더 쓰지 않음
+            self.db.query(MidSettlementState).filter(MidSettlementState.week_label == self.week_label).delete()
+
+            # 업로드 시간대 heatmap 용 사진 이벤트
+            record["activity_rows"] = activity.save_week(self.db, self.week_label, self.events, self.results)
+
+            member_stats.record_changes(self.db, stat_changes)
+            changes.record(self.db, "status", [(member_id, self.week_label) for member_id in touched])
+            changes.record(self.db, "summary", [self.week_label])
+            cache.bump_data_version(self.db)
+            # match 이후 다른 운영진이 먼저 고친 행이 있으면 롤백 후 VersionConflict (409)
+            versioning.commit(
+                self.db, lambda: versioning.current_statuses(self.db, [self.week_label], touched), new_keys=created,
+            )
+            record["rows"] = written
+
+        # statuses: [[member_id, 새 상태], ...] (상태가 바뀐 멤버만), versions: [[member_id, version], ...] (쓴 멤버 전체)
+        versions = versioning.current_statuses(self.db, [self.week_label], touched)
+        events.publish("settlement", {
+            "week_label": self.week_label,
+            "statuses": [[member_id, new] for member_id, _, old, new in stat_changes if old != new],
+            "versions": [[row["member_id"], row["version"]] for row in versions],
+        })
+
+    def log_timings(self, kind: str):
+        total_ms = round(sum(t["ms"] for t in self.timings), 2)
+        stages = ", ".join(
+            f"{t['stage']}={t['ms']}ms" for t in self.timings
+        )
+        logger.info("%s %s: total=%sms (%s)", kind, self.week_label, total_ms, stages)
+        logger.debug("%s %s timings: %s", kind, self.week_label, self.timings)
+
+
+def build_summary(results: list, start: date, end: date, manager_name: str) -> str:
+    total = len(results)
+    injeung_list = [r for r in results if r["status"] == "injeung"]
+    exclude_list = [r for r in results if r["status"] == "exclude"]
+    fine_list = [r for r in results if r["status"] == "fine"]
+    penalty_list = [r for r in results if r["status"] == "penalty"]
+    exclude_but_certified_list = [r for r in results if r.get("is_exclude_but_certified", False)]
+
+    lines = []
+    lines.append(f"집계 기간: {format_date(start)} ~ {format_date(end)}")
+    lines.append("")
+    lines.append(
+        f"총 인원: {total}명, "
+        f"인증 인원: {len(injeung_list)}명, "
+        f"미인증 인원: {len(fine_list) + len(penalty_list)}명, "
+        f"인증 제외 인원: {len(exclude_list)}명"
+    )
+    lines.append("")
+
+    if exclude_list:
+        sorted_exclude = sort_by_birth_name(exclude_list)
+        names = []
+        for r in sorted_exclude:
+            label = r["birth_prefix"] + r["name"]
+            # custom인 경우 상세 내용 표시, 아니면 매핑된 라벨 사용
+            if r["exclude_reason"] == "custom":
+                reason = r.get("exclude_reason_detail") or "기타"
+            else:
+                reason = EXCLUDE_LABELS.get(r["exclude_reason"], "")
+            if reason:
+                label += f"({reason})"
+            names.append(label)
+        lines.append(f"인증 제외 인원 ({len(exclude_list)}명): {', '.join(names)}")
+    else:
+        lines.append("인증 제외 인원이 없습니다.")
+    lines.append("")
+
+    # 제외됐지만 인증한 인원 (있을 때만 표시)
+    if exclude_but_certified_list:
+        sorted_certified = sort_by_birth_name(exclude_but_certified_list)
+        names = [r["birth_prefix"] + r["name"] for r in sorted_certified]
+        lines.append(f"인증 제외됐지만 인증한 인원 ({len(exclude_but_certified_list)}명): {', '.join(names)} 😎")
+        lines.append("")
+
+    if fine_list:
+        sorted_fine = sort_by_birth_name(fine_list)
+        names = [r["birth_prefix"] + r["name"] for r in sorted_fine]
+        lines.append(f"벌금 납부 인원 ({len(fine_list)}명): {', '.join(names)} 💰")
+    else:
+        lines.append("벌금 납부 인원이 없습니다.")
+    lines.append("")
+
+    if penalty_list:
+        sorted_penalty = sort_by_birth_name(penalty_list)
+        names = [r["birth_prefix"] + r["name"] for r in sorted_penalty]
+        lines.append(f"벌점 대상 인원 ({len(penalty_list)}명): {', '.join(names)} 😭")
+    else:
+        lines.append("벌점 대상 인원이 없습니다. 👍")
+    lines.append("")
+
+    lines.append(f"궁금한 사항은 담당 운영진 {manager_name}에게 문의 바랍니다.")
+
+    return "\n".join(lines)
+
+
+def build_mid_summary(results: list) -> str:
+    # 중간정산은 벌점 대상자만 포함 (벌금은 이미 납부했으므로 제외)
+    penalty_members = [r for r in results if r["status"] == "penalty"]
+    sorted_penalty = sort_by_birth_name(penalty_members)
+    names = [r["birth_prefix"] + r["name"] for r in sorted_penalty]
+
+    lines = []
+    lines.append("[알림] 태그되신 분들은 현재 시간 기준 아직 인증이 되지 않았거나 벌금을 납부하지 않은 것으로 확인 됩니다. 오늘 자정까지 늦지 않게 인증 또는 증빙 또는 벌금 납부 해주시기 바랍니다 ~")
+    lines.append(", ".join(names))
+
+    return "\n".join(lines)
@@ -0,0 +1,79 @@
+"""낙관적 동시성 제어 (weekly_status / members 의 version 열)
+
+WeeklyStatus / Member 는 mapper 의 version_id_col 이라 ORM 으로 고친 행은
+`UPDATE ... WHERE id = ? AND version = ?` 로 갱신되고 version 이 1 오른다.
+읽은 뒤 다른 요청이 먼저 고쳐 조건에 맞는 행이 없으면 flush 에서 StaleDataError 가 난다.
+
+- 클라이언트는 조회 때 받은 version 을 수정 요청에 반드시 함께 보낸다 (행이 없었으면 0, 빠지면 422)
+- 새로 만든 행은 flush 후 같은 (멤버, 주차) 행이 둘 이상이면 충돌 (쓰기 잠금을 잡은 상태에서 확인, CSV 가져오기도 같은 방식)
+- 충돌이면 롤백하고 409 {"detail": "version_conflict", "current": [현재 행]} (app.main 의 예외 처리기)
+
+전역 잠금 없이 먼저 커밋한 쪽이 반영되고, 나중 쪽은 현재 행과 병합해 다시 보낸다.
+"""
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm.exc import StaleDataError
+from app.models import Member, WeeklyStatus
+
+STATUS_FIELDS = (
+    "member_id", "week_label", "status", "exclude_reason", "exclude_reason_detail",
+    "certified_date", "certified_at", "is_exclude_but_certified", "version",
+)
+MEMBER_FIELDS = ("id", "name", "birth_date", "is_active", "left_date", "left_reason", "version")
+CHUNK_SIZE = 500
+
+
+class VersionConflict(Exception):
+    """다른 요청이 먼저 고친 행이 있음 (current: 충돌한 범위의 현재 행 dict 목록)"""
+
+    def __init__(self, current: list):
+        super().__init__("version_conflict")
+        self.current = current
+
+
+def current_statuses(db, week_labels: list, member_ids: list = None) -> list:
+    """주차(와 멤버) 범위의 현재 weekly_status 행"""
+    query = select(*[getattr(WeeklyStatus, field) for field in STATUS_FIELDS]).where(
+        WeeklyStatus.week_label.in_(list(week_labels)),
+    )
+    if member_ids is not None:
+        query = query.where(WeeklyStatus.member_id.in_(list(member_ids)))
+    rows = db.execute(query.order_by(WeeklyStatus.member_id, WeeklyStatus.week_label))
+    return [dict(zip(STATUS_FIELDS, row)) for row in rows]
+
+
+def current_member(db, member_id: int) -> list:
+    rows = db.execute(select(*[getattr(Member, field) for field in MEMBER_FIELDS]).where(Member.id == member_id))
+    return [dict(zip(MEMBER_FIELDS, row)) for row in rows]
+
+
+def check(expected: int, actual: int, load_current):
+    """클라이언트가 보낸 version(expected)이 지금 행의 version 과 다르면 VersionConflict"""
+    if expected != actual:
+        raise VersionConflict(load_current())
+
+
+def duplicated(db, keys: list) -> bool:
+    """(member_id, week_label) 중 weekly_status 에 두 행 이상 있는 키가 있는지"""
+    for i in range(0, len(keys), CHUNK_SIZE):
+        duplicate = db.execute(
+            select(WeeklyStatus.member_id)
+            .where(tuple_(WeeklyStatus.member_id, WeeklyStatus.week_label).in_(keys[i:i + CHUNK_SIZE]))
+            .group_by(WeeklyStatus.member_id, WeeklyStatus.week_label)
+            .having(func.count() > 1)
+            .limit(1)
+        ).first()
+        if duplicate:
+            return True
+    return False
+
+
+def commit(db, load_current, new_keys: list = ()):
+    """커밋. 고친 행을 다른 요청이 먼저 고쳤거나 같은 새 행을 먼저 만들었으면 롤백 후 VersionConflict"""
+    try:
+        db.flush()
+        if new_keys and duplicated(db, list(new_keys)):
+            raise StaleDataError("weekly_status row created concurrently")
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise VersionConflict(load_current())
@@ -0,0 +1,52 @@
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+
+def week_label_of(d: date) -> str:
+    """날짜가 속한 주차 라벨. 예: 2026-W05 (월요일 기준 ISO 주차)"""
+    iso = d.isocalendar()
+    return f"{iso[0]}-W{iso[1]:02d}"
+
+
+def week_label_to_monday(week_label: str) -> Optional[date]:
+    """주차 라벨(예: "2026-W06")의 월요일 날짜"""
+    match = re.match(r'(\d{4})-W(\d{2})', week_label)
+    if not match:
+        return None
+
+    year = int(match.group(1))
+    week = int(match.group(2))
+    # ISO week의 월요일 구하기
+    jan4 = date(year, 1, 4)
+    start_of_week1 = jan4 - timedelta(days=jan4.weekday())
+    return start_of_week1 + timedelta(weeks=week - 1)
+
+
+def week_labels_from(week_start_label: str, num_weeks: int) -> list:
+    """주어진 주차부터 num_weeks 주의 week_label 리스트"""
+    monday = week_label_to_monday(week_start_label)
+    if not monday:
+        return []
+    return [week_label_of(monday + timedelta(weeks=i)) for i in range(num_weeks)]
+
+
+def week_labels_between(start_label: str, end_label: str) -> list:
+    """start_label ~ end_label (양 끝 포함) 주차 라벨 리스트"""
+    start = week_label_to_monday(start_label)
+    end = week_label_to_monday(end_label)
+    if not start or not end or end < start:
+        return []
+    return week_labels_from(start_label, (end - start).days // 7 + 1)
+
+
+def year_week_range(year: int) -> tuple:
+    """해당 연도의 첫 주차와 마지막 주차 라벨"""
+    # 12월 28일은 항상 그 해의 마지막 ISO 주차에 속함
+    return f"{year}-W01", week_label_of(date(year, 12, 28))
+
+
+def week_quarter(week_label: str) -> str:
+    """주차 라벨의 분기. 예: 2026-W05 -> 2026-Q1 (13주 단위, 53주차는 Q4)"""
+    week = int(week_label[6:8])
+    return f"{week_label[:4]}-Q{min((week - 1) // 13 + 1, 4)}"
@@ -0,0 +1,126 @@
+"""
+조회 엔드포인트 요청당 CPU 시간 측정
+
+서버를 띄우지 않고 ASGI 앱을 같은 프로세스에서 직접 호출해 요청마다
+process_time(모든 스레드 CPU 합) / 경과 시간 / 응답 크기를 잰다.
+응답 캐시는 끄고(CORGI_CHECK_RESPONSE_CACHE_SIZE=0) 매번 DB 조회 + 직렬화를 측정한다.
+
+사용 예:
+    python seed_large_db.py --db ../loadtest.db
+    CORGI_CHECK_DB_PATH=../loadtest.db python bench_read_path.py --save ../bench_read.json
+    CORGI_CHECK_DB_PATH=../loadtest.db python bench_read_path.py --compare ../bench_read.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("CORGI_CHECK_RESPONSE_CACHE_SIZE", "0")
+os.environ.setdefault("CORGI_CHECK_PROFILING", "0")
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.database import async_read_engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def call(path: str, query: str = "") -> tuple:
+    """GET 요청 한 번. (상태 코드, 본문 bytes)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    status = None
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(body)
+
+
+async def endpoints() -> dict:
+    """측정 대상 {이름: (경로, 쿼리)}. 주차 / 연도는 DB에 있는 최신 값 사용"""
+    _, body = await call("/api/history/status-weeks")
+    weeks = json.loads(body)
+    week = weeks[0] if weeks else "2026-W01"
+    return {
+        "members": ("/api/members", "include_left=true"),
+        "status_current": ("/api/status/current", ""),
+        "history_week": (f"/api/history/{week}", ""),
+        "history_matrix": ("/api/history/matrix", f"year={week[:4]}&limit=1000"),
+        "stats_leaderboard": ("/api/stats/leaderboard", "limit=1000&include_left=true"),
+        "stats_member": ("/api/stats/members/1", ""),
+    }
+
+
+async def measure(requests: int, warmup: int) -> dict:
+    results = {}
+    async with app.router.lifespan_context(app):
+        for name, (path, query) in (await endpoints()).items():
+            for _ in range(warmup):
+                await call(path, query)
+            cpu, wall = [], []
+            size = 0
+            for _ in range(requests):
+                cpu_start, wall_start = time.process_time(), time.perf_counter()
+                status, body = await call(path, query)
+                cpu.append((time.process_time() - cpu_start) * 1000)
+                wall.append((time.perf_counter() - wall_start) * 1000)
+                if status != 200:
+                    sys.exit(f"{name}: HTTP {status} {body[:200]!r}")
+                size = len(body)
+            results[name] = {
+                "cpu_ms": round(statistics.median(cpu), 2),
+                "wall_ms": round(statistics.median(wall), 2),
+                "bytes": size,
+            }
+    # aiosqlite 연결 스레드가 남아 있으면 프로세스가 끝나지 않음
+    await async_read_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="조회 엔드포인트 요청당 CPU 시간 측정")
+    parser.add_argument("--requests", type=int, default=30, help="엔드포인트별 측정 요청 수 (기본 30)")
+    parser.add_argument("--warmup", type=int, default=3, help="엔드포인트별 워밍업 요청 수 (기본 3)")
+    parser.add_argument("--save", help="결과를 JSON 으로 저장할 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    args = parser.parse_args()
+
+    results = asyncio.run(measure(args.requests, args.warmup))
+    baseline = json.loads(Path(args.compare).read_text())["endpoints"] if args.compare else {}
+
+    print(f"\n{'엔드포인트':<22}{'CPU ms':>10}{'경과 ms':>10}{'bytes':>12}" + ("   기준값 대비 CPU" if baseline else ""))
+    for name, r in results.items():
+        line = f"{name:<22}{r['cpu_ms']:>10.2f}{r['wall_ms']:>10.2f}{r['bytes']:>12,}"
+        before = baseline.get(name)
+        if before:
+            line += f"   {before['cpu_ms']:.2f} -> {r['cpu_ms']:.2f} ({(r['cpu_ms'] - before['cpu_ms']) / before['cpu_ms'] * 100:+.0f}%)"
+        print(line)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({
+            "measured_at": datetime.now().isoformat(timespec="seconds"),
+            "requests": args.requests,
+            "endpoints": results,
+        }, ensure_ascii=False, indent=2))
+        print(f"\n저장: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+서버 시작(import) 시간 측정
+
+`python -X importtime -c "import app.main"` 를 새 프로세스로 여러 번 실행해
+app.main import 시간(중앙값)과 최상위 패키지별 import 시간을 출력한다.
+--save 로 결과를 JSON 으로 남겨 두고 --compare 로 이전 결과와 비교할 수 있다.
+시작 시 import 되면 안 되는 무거운 선택 의존성(LAZY_MODULES)이 로드되면 실패로 처리한다.
+
+사용 예:
+    python bench_startup.py                                # 5회 측정
+    python bench_startup.py --save bench_startup.json      # 기준값 저장
+    python bench_startup.py --compare bench_startup.json   # 기준값보다 20% 이상 느리면 exit 1
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+TARGET = "app.main"
+# 처음 사용할 때 import 해야 하는 모듈 (Gmail, Parquet 내보내기, 분석)
+LAZY_MODULES = ("google", "googleapiclient", "google_auth_oauthlib", "pyarrow", "numpy")
+
+
+def run_once(target: str) -> dict:
+    """importtime 출력 한 번 분석: 전체 시간, 패키지별 self 시간 합, 로드된 모듈"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        sys.exit(f"{target} import 실패:\n{proc.stderr[-2000:]}")
+
+    target_us = 0
+    packages = defaultdict(int)
+    modules = set()
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules.add(name)
+        packages[name.split(".")[0]] += int(self_us)
+        if name == target:
+            target_us = int(cumulative_us)
+    return {"wall_ms": wall_ms, "import_ms": target_us / 1000, "packages": packages, "modules": modules}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.main import 시간 측정")
+    parser.add_argument("--runs", type=int, default=5, help="측정 횟수 (기본 5)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 패키지 수 (기본 10)")
+    parser.add_argument("--save", help="결과를 JSON 으로 저장할 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=20, help="--compare 허용 증가율 %% (기본 20)")
+    args = parser.parse_args()
+
+    runs = [run_once(TARGET) for _ in range(args.runs)]
+    import_ms = statistics.median(r["import_ms"] for r in runs)
+    wall_ms = statistics.median(r["wall_ms"] for r in runs)
+    packages = {
+        name: statistics.median(r["packages"].get(name, 0) for r in runs) / 1000
+        for name in set().union(*(r["packages"] for r in runs))
+    }
+
+    print(f"{TARGET} import: {import_ms:.1f}ms (중앙값, {args.runs}회) / 프로세스 전체 {wall_ms:.1f}ms")
+    print(f"\n{'패키지':<28}{'ms':>10}")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<28}{ms:>10.1f}")
+
+    failed = False
+    loaded = sorted(m for m in LAZY_MODULES if m in runs[0]["modules"])
+    if loaded:
+        print(f"\n시작 시 import 되면 안 되는 모듈이 로드됨: {', '.join(loaded)}")
+        failed = True
+
+    result = {
+        "measured_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "import_ms": round(import_ms, 1),
+        "wall_ms": round(wall_ms, 1),
+        "packages": {name: round(ms, 1) for name, ms in packages.items()},
+    }
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        change = (import_ms - baseline["import_ms"]) / baseline["import_ms"] * 100
+        print(f"\n기준값({baseline['measured_at']}) {baseline['import_ms']}ms 대비 {change:+.1f}%")
+        for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            before = baseline["packages"].get(name, 0)
+            if abs(ms - before) >= 5:
+                print(f"  {name}: {before}ms -> {ms:.1f}ms")
+        if change > args.tolerance:
+            print(f"허용 범위({args.tolerance:.0f}%)를 넘었습니다.")
+            failed = True
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, ensure_ascii=False, indent=2))
+        print(f"\n저장: {args.save}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
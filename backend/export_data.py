@@ -0,0 +1,72 @@
+"""
+주차별 상태 / 정산 문구 내보내기
+
+사용 예:
+    python export_data.py -o statuses.csv                          # 전체 주차별 상태 (CSV)
+    python export_data.py --format jsonl --gzip -o statuses.jsonl.gz
+    python export_data.py --layout summaries --format parquet -o summaries.parquet
+    python export_data.py --layout sheet --year 2026 -o sheet.csv  # import_csv.py 형식
+    python import_csv.py sheet.csv                                 # 다시 가져오기
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 현재 스크립트의 상위 디렉토리를 sys.path에 추가
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services import export
+from app.services.weeks import year_week_range
+
+
+def add_arguments(parser):
+    """export_data.py 와 python -m app.cli export 가 같이 쓰는 인자"""
+    parser.add_argument("--layout", choices=export.LAYOUTS, default="statuses", help="내보낼 형태 (기본 statuses)")
+    parser.add_argument("--format", choices=export.FORMATS, default="csv", help="파일 형식 (기본 csv)")
+    parser.add_argument("--start", help="시작 주차 (예: 2026-W01)")
+    parser.add_argument("--end", help="마지막 주차 (예: 2026-W52)")
+    parser.add_argument("--year", type=int, help="해당 연도 주차만 (--start/--end 대신)")
+    parser.add_argument("--member", type=int, action="append", help="멤버 id (여러 번 지정 가능)")
+    parser.add_argument("--active-only", action="store_true", help="탈퇴 멤버 제외")
+    parser.add_argument("--gzip", action="store_true", help="gzip 압축")
+    parser.add_argument("-o", "--output", default="-", help="출력 파일 경로 (기본 '-': stdout)")
+
+
+def run(args):
+    """인자대로 내보내기. 진행 상황은 stderr 로 (stdout 은 데이터 출력용)"""
+    start, end = args.start, args.end
+    if args.year and not (start or end):
+        start, end = year_week_range(args.year)
+
+    try:
+        chunks = export.export_chunks(
+            args.layout, args.format, start, end, args.member, not args.active_only, args.gzip,
+        )
+    except export.ExportError as e:
+        print(f"내보내기 오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    written = 0
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"내보내기 완료: {args.output} ({written:,} bytes, {elapsed:.2f}초)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주차별 상태 / 정산 문구 내보내기 (CSV, JSONL, Parquet)")
+    add_arguments(parser)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,28 @@
-import sys
+import argparse
 import csv
+import hashlib
+import os
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm.exc import StaleDataError
 import requests
-from io import StringIO
 
 # 현재 스크립트의 상위 디렉토리를 sys.path에 추가
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.models import Base, Member, WeeklyStatus
+from app.models import Base, ImportRowHash, Member, WeeklyStatus
 from app.database import engine, SessionLocal
+from app import cache
+from app.services import archive, changes, member_stats, versioning
+
+CHUNK_SIZE = 500  # executemany / IN 절 묶음 크기
+
 
 def parse_status(value):
-    """상태값 파싱: Y/N/N(벌점)/P(사유)/- 등"""
+    """상태값 파싱: Y/N/N(벌점)/P/P(사유)/- 등"""
     if not value or value.strip() in ['-', '']:
         return None, None, None
 
@@ -32,6 +40,10 @@ def parse_status(value):
     if value == 'N':
         return 'fine', None, None
 
+    # P / P(): 사유 없는 제외
+    if value.replace(' ', '') in ('P', 'P()'):
+        return 'exclude', None, None
+
     # P(제외사유): 제외
     if value.startswith('P(') or value.startswith('P ('):
         # P(여행) 형식에서 사유 추출
@@ -74,18 +86,18 @@ def date_to_week_label(date_str):
         return None
 
 
-def download_google_sheet(sheet_id, sheet_name):
-    """구글 스프레드시트에서 특정 시트를 CSV로 다운로드"""
+def stream_google_sheet(sheet_id, sheet_name):
+    """구글 스프레드시트의 특정 시트를 CSV 줄 단위 iterator로 스트리밍"""
     url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
     print(f"구글 스프레드시트 '{sheet_name}' 시트 다운로드 중...")
 
     try:
-        response = requests.get(url)
+        response = requests.get(url, stream=True)
         response.encoding = 'utf-8'
 
         if response.status_code == 200:
-            print("다운로드 성공")
-            return response.text
+            print("다운로드 시작")
+            return (line + "\n" for line in response.iter_lines(decode_unicode=True))
         else:
             print(f"다운로드 실패: HTTP {response.status_code}")
             return None
@@ -94,127 +106,366 @@ def download_google_sheet(sheet_id, sheet_name):
         return None
 
 
-def main():
-    # 구글 스프레드시트 ID 및 시트 이름
-    sheet_id = "11UPzhx6mHOzFbz8pyU3gIuFDIf3A33PuOjIk5OiWa7U"
-    sheet_name = "26년"
-
-    # 구글 시트 다운로드
-    csv_text = download_google_sheet(sheet_id, sheet_name)
-
-    if not csv_text:
-        print("구글 스프레드시트를 다운로드할 수 없습니다.")
-        return
+def open_source(source, sheet_id, sheet_name):
+    """CSV 줄 iterator 반환: 로컬 파일 경로 / '-'(stdin) / None(구글 시트)"""
+    if source == '-':
+        return sys.stdin
+    if source:
+        # 엑셀에서 저장한 CSV의 BOM 처리
+        return open(source, newline='', encoding='utf-8-sig')
+    return stream_google_sheet(sheet_id, sheet_name)
+
+
+def row_key(row):
+    """행 식별자: 이름 + 생년"""
+    return f"{row[0].strip()}|{row[1].strip()}"
+
+
+def row_hash(row, week_columns):
+    """행 내용 해시. 빈 칸('-', '')은 제외해 빈 주차 열이 추가돼도 해시가 바뀌지 않음"""
+    parts = [row[i].strip() for i in (0, 1, 3, 4, 5)]
+    for col_idx, week_label in week_columns:
+        if col_idx < len(row) and row[col_idx].strip() not in ['-', '']:
+            parts.append(f"{week_label}={row[col_idx].strip()}")
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def load_row_hashes(db, source_key):
+    rows = db.execute(
+        select(ImportRowHash.row_key, ImportRowHash.row_hash)
+        .where(ImportRowHash.source == source_key)
+    )
+    return {row.row_key: row.row_hash for row in rows}
+
+
+def save_row_hashes(db, source_key, hashes):
+    """바뀐 행의 해시만 교체 (커밋은 호출자가)"""
+    keys = list(hashes)
+    for i in range(0, len(keys), CHUNK_SIZE):
+        db.execute(delete(ImportRowHash).where(
+            ImportRowHash.source == source_key,
+            ImportRowHash.row_key.in_(keys[i:i + CHUNK_SIZE]),
+        ))
+    now_iso = datetime.now().isoformat()
+    rows = [
+        {"source": source_key, "row_key": key, "row_hash": value, "updated_at": now_iso}
+        for key, value in hashes.items()
+    ]
+    for chunk in _chunks(rows):
+        db.execute(insert(ImportRowHash), chunk)
+
+
+def changed_rows(reader, week_columns, known_hashes):
+    """해시가 바뀐 행만 반환. (바뀐 행 리스트, {row_key: 새 해시}, 건너뛴 행 수)"""
+    rows = []
+    new_hashes = {}
+    skipped = 0
+    for row in reader:
+        if len(row) < 6 or not row[0].strip() or not row[1].strip():
+            continue
+        key = row_key(row)
+        digest = row_hash(row, week_columns)
+        if known_hashes.get(key) == digest:
+            skipped += 1
+            continue
+        rows.append(row)
+        new_hashes[key] = digest
+    return rows, new_hashes, skipped
+
+
+def find_week_columns(header):
+    """주차 열 찾기 (인덱스 6부터 날짜 컬럼) -> [(열 인덱스, week_label)]"""
+    week_columns = []
+    for i, col in enumerate(header[6:], start=6):
+        week_label = date_to_week_label(col)
+        if week_label:
+            week_columns.append((i, week_label))
+    return week_columns
+
+
+def load_members(db):
+    """(이름, 생년) -> 멤버 정보 (동명이인 방지: 이름 + 생년)"""
+    rows = db.execute(select(
+        Member.id, Member.name, Member.birth_date,
+        Member.is_active, Member.left_date, Member.left_reason, Member.version,
+    ))
+    members = {}
+    for row in rows:
+        members.setdefault((row.name, row.birth_date), dict(row._mapping))
+    return members
+
+
+def load_statuses(db, week_labels, member_ids):
+    """(member_id, week_label) -> 기존 WeeklyStatus 정보 (시트에 있는 주차 / 대상 멤버만)"""
+    statuses = {}
+    week_labels = list(week_labels)
+    member_ids = list(member_ids)
+    for i in range(0, len(member_ids), CHUNK_SIZE):
+        rows = db.execute(
+            select(
+                WeeklyStatus.id, WeeklyStatus.member_id, WeeklyStatus.week_label,
+                WeeklyStatus.status, WeeklyStatus.exclude_reason, WeeklyStatus.exclude_reason_detail,
+                WeeklyStatus.version,
+            ).where(
+                WeeklyStatus.member_id.in_(member_ids[i:i + CHUNK_SIZE]),
+                WeeklyStatus.week_label.in_(week_labels),
+            )
+        )
+        for row in rows:
+            statuses.setdefault((row.member_id, row.week_label), dict(row._mapping))
+    return statuses
+
+
+class ImportPlan:
+    """시트와 DB를 메모리에서 비교한 결과 (삽입/수정 목록과 건수)"""
+
+    def __init__(self):
+        self.member_inserts = []
+        self.member_updates = []
+        self.status_inserts = []
+        self.status_updates = []
+        self.members_unchanged = 0
+        self.statuses_unchanged = 0
+        self.stat_changes = []  # member_stats 반영용 (member_id, week_label, 이전 상태, 새 상태)
+        self.diff = []  # --dry-run 출력용 변경 내역
+
+
+def _describe(status, exclude_reason, exclude_detail):
+    if status == 'exclude':
+        return f"exclude({exclude_detail or exclude_reason})"
+    return status
+
+
+def plan_import(rows, week_columns, members, statuses, next_member_id):
+    """CSV 행(헤더 제외)을 기존 데이터와 비교해 ImportPlan 생성. DB 조회 없음."""
+    plan = ImportPlan()
+    now_iso = datetime.now().isoformat()
+
+    for row in rows:
+        if len(row) < 6:
+            continue
+
+        name = row[0].strip()
+        birth_year = row[1].strip()
+        is_left = row[3].strip().upper() == 'Y'
+        left_date = row[4].strip() if row[4].strip() not in ['-', ''] else None
+        left_reason = row[5].strip() if row[5].strip() not in ['-', ''] else None
+
+        if not name or not birth_year:
+            continue
+
+        member = members.get((name, birth_year))
+        if member:
+            # 기존 멤버 업데이트 (값이 바뀐 경우만)
+            changes = {}
+            if member["is_active"] != (not is_left):
+                changes["is_active"] = not is_left
+            if left_date and member["left_date"] != left_date:
+                changes["left_date"] = left_date
+            if left_reason and member["left_reason"] != left_reason:
+                changes["left_reason"] = left_reason
+            if changes:
+                plan.diff.extend(
+                    f"~ 멤버 {name}({birth_year}) {field}: {member[field]} -> {value}"
+                    for field, value in changes.items()
+                )
+                member.update(changes)
+                # version 은 읽은 값: 일괄 UPDATE 도 WHERE version = ? 조건 + 1 (그사이 바뀌었으면 StaleDataError)
+                plan.member_updates.append({"id": member["id"], "version": member["version"], **changes})
+                member["version"] += 1
+            else:
+                plan.members_unchanged += 1
+        else:
+            # 새 멤버 추가 (ID를 미리 배정해 주차별 상태와 함께 일괄 삽입)
+            member = {
+                "id": next_member_id,
+                "name": name,
+                "birth_date": birth_year,
+                "is_active": not is_left,
+                "left_date": left_date,
+                "left_reason": left_reason,
+                "version": 1,
+            }
+            next_member_id += 1
+            members[(name, birth_year)] = member
+            plan.member_inserts.append({**member, "created_at": now_iso})
+            plan.diff.append(f"+ 멤버 {name}({birth_year})")
+
+        # 주차별 상태 처리
+        for col_idx, week_label in week_columns:
+            if col_idx >= len(row):
+                continue
 
-    # CSV 파싱
-    rows = list(csv.reader(StringIO(csv_text)))
+            status, exclude_reason, exclude_detail = parse_status(row[col_idx].strip())
+            if status is None:
+                continue  # null 값은 저장 안 함
 
-    if not rows:
+            existing = statuses.get((member["id"], week_label))
+            if existing:
+                if (existing["status"], existing["exclude_reason"], existing["exclude_reason_detail"]) == (status, exclude_reason, exclude_detail):
+                    plan.statuses_unchanged += 1
+                    continue
+                plan.diff.append(
+                    f"~ {name}({birth_year}) {week_label}: "
+                    f"{_describe(existing['status'], existing['exclude_reason'], existing['exclude_reason_detail'])}"
+                    f" -> {_describe(status, exclude_reason, exclude_detail)}"
+                )
+                plan.stat_changes.append((member["id"], week_label, existing["status"], status))
+                plan.status_updates.append({
+                    "id": existing["id"],
+                    "status": status,
+                    "exclude_reason": exclude_reason,
+                    "exclude_reason_detail": exclude_detail,
+                    "version": existing["version"],
+                })
+                existing.update(
+                    status=status, exclude_reason=exclude_reason, exclude_reason_detail=exclude_detail,
+                    version=existing["version"] + 1,
+                )
+            else:
+                new_status = {
+                    "member_id": member["id"],
+                    "week_label": week_label,
+                    "status": status,
+                    "exclude_reason": exclude_reason,
+                    "exclude_reason_detail": exclude_detail,
+                    "created_at": now_iso,
+                    "version": 1,
+                }
+                plan.status_inserts.append(new_status)
+                plan.stat_changes.append((member["id"], week_label, None, status))
+                plan.diff.append(f"+ {name}({birth_year}) {week_label}: {_describe(status, exclude_reason, exclude_detail)}")
+                statuses[(member["id"], week_label)] = {"id": None, **new_status}
+
+    return plan
+
+
+def _chunks(items):
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+def apply_plan(db, plan):
+    """ImportPlan을 CHUNK_SIZE 단위 executemany로 반영 (커밋은 호출자가)"""
+    for chunk in _chunks(plan.member_inserts):
+        db.execute(insert(Member), chunk)
+    for chunk in _chunks(plan.member_updates):
+        db.execute(update(Member), chunk)
+    for chunk in _chunks(plan.status_inserts):
+        db.execute(insert(WeeklyStatus), chunk)
+    # 비교한 뒤 같은 (멤버, 주차) 행을 다른 곳에서 먼저 만들었으면 충돌 (쓰기 잠금을 잡은 상태에서 확인)
+    new_keys = [(r["member_id"], r["week_label"]) for r in plan.status_inserts]
+    if new_keys and versioning.duplicated(db, new_keys):
+        raise StaleDataError("weekly_status row created concurrently")
+    for chunk in _chunks(plan.status_updates):
+        db.execute(update(WeeklyStatus), chunk)
+    member_stats.record_changes(db, plan.stat_changes)
+    changes.record(db, "member", [m["id"] for m in plan.member_inserts + plan.member_updates])
+    changes.record(db, "status", [(m, wl) for m, wl, _, _ in plan.stat_changes])
+    if plan.member_inserts or plan.member_updates or plan.status_inserts or plan.status_updates:
+        cache.bump_data_version(db)
+
+
+def import_lines(db, lines, source_key, dry_run=False, full=False):
+    """CSV 줄(iterator)을 읽어 DB에 반영하고 ImportPlan 반환. 데이터가 없으면 None
+
+    dry_run 이면 변경 내역만 출력하고 롤백한다. 커밋은 한 번 (apply_plan 은 CHUNK_SIZE 단위 실행).
+    """
+    # CSV 파싱 (행 단위 스트리밍)
+    reader = csv.reader(lines)
+    header = next(reader, None)
+
+    if not header:
         print("CSV 데이터가 비어있습니다.")
-        return
+        return None
 
     # 헤더 확인
-    header = rows[0]
     print(f"헤더: {header[:10]}...")  # 처음 10개만 출력
 
-    # 주차 열 찾기 (인덱스 6부터 날짜 컬럼)
-    week_columns = []
-    for i, col in enumerate(header[6:], start=6):
-        week_label = date_to_week_label(col)
-        if week_label:
-            week_columns.append((i, week_label))
-
+    week_columns = find_week_columns(header)
     print(f"주차 컬럼 수: {len(week_columns)}")
 
-    db = SessionLocal()
+    # 이전 가져오기와 내용이 같은 행은 건너뜀
+    known_hashes = {} if full else load_row_hashes(db, source_key)
+    rows, new_hashes, skipped = changed_rows(reader, week_columns, known_hashes)
+    print(f"변경된 행: {len(rows)}개 (변경 없는 행 {skipped}개 건너뜀)")
+
+    # 기존 멤버 / 주차별 상태를 한 번에 읽어 메모리에서 비교
+    members = load_members(db)
+    member_ids = [
+        members[(row[0].strip(), row[1].strip())]["id"]
+        for row in rows if (row[0].strip(), row[1].strip()) in members
+    ]
+    # 보관된 주차 상태는 먼저 weekly_status 로 되돌려 비교 / 갱신 대상에 포함
+    week_labels = {week_label for _, week_label in week_columns}
+    if week_labels and member_ids:
+        archive.restore(db, member_ids, min(week_labels), max(week_labels))
+    statuses = load_statuses(db, week_labels, member_ids)
+    next_member_id = (db.execute(select(func.max(Member.id))).scalar() or 0) + 1
+
+    plan = plan_import(rows, week_columns, members, statuses, next_member_id)
+
+    if dry_run:
+        for line in plan.diff:
+            print(line)
+        db.rollback()
+        print("\n[dry-run] DB에 반영하지 않았습니다.")
+    else:
+        try:
+            apply_plan(db, plan)
+        except StaleDataError:
+            # 비교한 뒤 다른 운영진 / 정산이 먼저 고친 행이 있음 -> 덮어쓰지 않고 전체 롤백
+            db.rollback()
+            print("\n가져오는 동안 다른 곳에서 바뀐 행이 있어 반영하지 않았습니다. 다시 실행하세요.")
+            return None
+        save_row_hashes(db, source_key, new_hashes)
+        db.commit()
+    return plan
 
-    try:
 
-        # Members 및 WeeklyStatus 처리
-        member_count = 0
-        status_count = 0
+def print_plan(plan):
+    print(f"- 멤버: 추가 {len(plan.member_inserts)}명, 수정 {len(plan.member_updates)}명, 변경 없음 {plan.members_unchanged}명")
+    print(f"- 주차별 상태: 추가 {len(plan.status_inserts)}개, 수정 {len(plan.status_updates)}개, 변경 없음 {plan.statuses_unchanged}개")
 
-        for row_idx, row in enumerate(rows[1:], start=2):  # 헤더 제외
-            if len(row) < 6:
-                continue
 
-            name = row[0].strip()
-            birth_year = row[1].strip()
-            is_left = row[3].strip().upper() == 'Y'
-            left_date = row[4].strip() if row[4].strip() not in ['-', ''] else None
-            left_reason = row[5].strip() if row[5].strip() not in ['-', ''] else None
+def default_source_key(source, sheet_id, sheet_name):
+    if source and source != '-':
+        return os.path.basename(source)
+    return f"gsheet:{sheet_id}:{sheet_name}"
 
-            if not name or not birth_year:
-                continue
 
-            # Member 찾기 또는 생성 (동명이인 방지: 이름 + 생년)
-            member = db.query(Member).filter(
-                Member.name == name,
-                Member.birth_date == birth_year
-            ).first()
-
-            if member:
-                # 기존 멤버 업데이트
-                if birth_year and not member.birth_date:
-                    member.birth_date = birth_year
-                member.is_active = not is_left
-                if left_date:
-                    member.left_date = left_date
-                if left_reason:
-                    member.left_reason = left_reason
-                print(f"멤버 업데이트: {name}")
-            else:
-                # 새 멤버 추가
-                member = Member(
-                    name=name,
-                    birth_date=birth_year if birth_year else None,
-                    is_active=not is_left,
-                    left_date=left_date,
-                    left_reason=left_reason
-                )
-                db.add(member)
-                db.flush()  # ID 생성
-                member_count += 1
-                print(f"멤버 추가: {name} (ID: {member.id})")
-
-            # 주차별 상태 처리
-            for col_idx, week_label in week_columns:
-                if col_idx >= len(row):
-                    continue
+def add_arguments(parser):
+    """import_csv.py 와 python -m app.cli import 가 같이 쓰는 인자"""
+    parser.add_argument("source", nargs="?", help="로컬 CSV 파일 경로 또는 '-'(stdin). 생략 시 구글 스프레드시트")
+    parser.add_argument("--sheet-id", default="11UPzhx6mHOzFbz8pyU3gIuFDIf3A33PuOjIk5OiWa7U", help="구글 스프레드시트 ID")
+    parser.add_argument("--sheet-name", default="26년", help="시트 이름")
+    parser.add_argument("--source-key", help="행 해시 구분 키 (기본: 시트 이름 또는 파일 이름)")
+    parser.add_argument("--dry-run", action="store_true", help="DB에 반영하지 않고 변경 내역만 출력")
+    parser.add_argument("--full", action="store_true", help="행 해시를 무시하고 모든 행 다시 처리")
 
-                status_value = row[col_idx].strip() if col_idx < len(row) else ''
-                status, exclude_reason, exclude_detail = parse_status(status_value)
-
-                if status is None:
-                    continue  # null 값은 저장 안 함
-
-                # 기존 WeeklyStatus 확인
-                existing = db.query(WeeklyStatus).filter(
-                    WeeklyStatus.member_id == member.id,
-                    WeeklyStatus.week_label == week_label
-                ).first()
-
-                if existing:
-                    # 기존 데이터 업데이트
-                    existing.status = status
-                    existing.exclude_reason = exclude_reason
-                    existing.exclude_reason_detail = exclude_detail
-                else:
-                    # 새 WeeklyStatus 추가
-                    ws = WeeklyStatus(
-                        member_id=member.id,
-                        week_label=week_label,
-                        status=status,
-                        exclude_reason=exclude_reason,
-                        exclude_reason_detail=exclude_detail
-                    )
-                    db.add(ws)
-                    status_count += 1
 
-        db.commit()
-        print(f"\n완료!")
-        print(f"- 새로운 멤버: {member_count}명")
-        print(f"- 주차별 상태: {status_count}개")
+def main():
+    parser = argparse.ArgumentParser(description="구글 스프레드시트 / CSV 파일에서 멤버와 주차별 상태 가져오기")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    source_key = args.source_key or default_source_key(args.source, args.sheet_id, args.sheet_name)
+
+    lines = open_source(args.source, args.sheet_id, args.sheet_name)
+    if lines is None:
+        print("구글 스프레드시트를 다운로드할 수 없습니다.")
+        return
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    try:
+        started = time.perf_counter()
+        plan = import_lines(db, lines, source_key, args.dry_run, args.full)
+        if plan is not None:
+            elapsed = time.perf_counter() - started
+            print(f"\n완료! ({elapsed:.2f}초)")
+            print_plan(plan)
 
     except Exception as e:
         db.rollback()
@@ -223,6 +474,8 @@ def main():
         traceback.print_exc()
     finally:
         db.close()
+        if lines is not sys.stdin and hasattr(lines, "close"):
+            lines.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,168 @@
+"""
+로컬 uvicorn 대상 부하 테스트
+
+app/routers 의 모든 라우터(auth, status, history, members, admin)의 조회 엔드포인트를
+동시에 호출하고 엔드포인트별 p50/p95/p99 지연 시간과 처리량을 출력한다.
+
+사용 예:
+    python seed_large_db.py --db ../loadtest.db
+    CORGI_CHECK_DB_PATH=../loadtest.db uvicorn app.main:app --port 8000
+    python loadtest.py --duration 30 --concurrency 16
+"""
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import requests
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """nearest-rank 방식 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def week_label_to_monday(week_label: str) -> str:
+    year, week = week_label.split("-W")
+    return date.fromisocalendar(int(year), int(week), 1).isoformat()
+
+
+def build_scenarios(base_url: str, include_writes: bool) -> list:
+    """(이름, 메서드, 경로 생성 함수, body 생성 함수, 가중치[, 응답 처리 함수]) 목록"""
+    members = requests.get(f"{base_url}/api/members?include_left=true").json()
+    status_weeks = requests.get(f"{base_url}/api/history/status-weeks").json()
+    summary_weeks = requests.get(f"{base_url}/api/history/weeks").json()
+    if not members or not status_weeks:
+        raise SystemExit("DB가 비어있습니다. seed_large_db.py 로 데이터를 먼저 생성하세요.")
+
+    member_ids = [m["id"] for m in members]
+    active_ids = [m["id"] for m in members if m["is_active"]] or member_ids
+    mondays = [week_label_to_monday(w) for w in status_weeks]
+    detail_weeks = summary_weeks or status_weeks
+
+    scenarios = [
+        ("GET /api/auth/check", "GET", lambda: "/api/auth/check", None, 1),
+        ("GET /api/status/current", "GET", lambda: "/api/status/current", None, 6),
+        ("GET /api/status/current?week_start", "GET",
+         lambda: f"/api/status/current?week_start={random.choice(mondays)}", None, 4),
+        ("GET /api/status/{id}/exclude-end", "GET",
+         lambda: f"/api/status/{random.choice(active_ids)}/exclude-end?week_start={random.choice(mondays)}", None, 2),
+        ("GET /api/history/weeks", "GET", lambda: "/api/history/weeks", None, 2),
+        ("GET /api/history/status-weeks", "GET", lambda: "/api/history/status-weeks", None, 2),
+        ("GET /api/history/{week_label}", "GET",
+         lambda: f"/api/history/{random.choice(detail_weeks)}", None, 4),
+        ("GET /api/members", "GET", lambda: "/api/members", None, 3),
+        ("GET /api/members?include_left", "GET", lambda: "/api/members?include_left=true", None, 1),
+        ("GET /api/admin/manager", "GET", lambda: "/api/admin/manager", None, 1),
+        ("GET /api/admin/gmail/status", "GET", lambda: "/api/admin/gmail/status", None, 1),
+    ]
+
+    if include_writes:
+        # 최근 주차의 상태만 바꿈 (인증/벌금 사이 토글)
+        # version 은 현황판에서 읽은 값으로 시작해 응답(성공: versions, 409: current)으로 갱신
+        this_monday = date.today() - timedelta(days=date.today().weekday())
+        versions = {row["id"]: row["version"] for row in requests.get(f"{base_url}/api/status/current").json()}
+        picked = threading.local()
+
+        def write_path():
+            picked.member_id = random.choice(active_ids)
+            return f"/api/status/{picked.member_id}"
+
+        def write_body():
+            return {
+                "status": random.choice(["injeung", "fine"]),
+                "week_start": this_monday.isoformat(),
+                "version": versions.get(picked.member_id, 0),
+            }
+
+        def write_result(res):
+            if res.status_code == 200:
+                versions.update((picked.member_id, v) for v in res.json()["versions"].values())
+            elif res.status_code == 409:
+                current = res.json()["current"]
+                versions[picked.member_id] = current[0]["version"] if current else 0
+
+        scenarios.append(("PUT /api/status/{id}", "PUT", write_path, write_body, 1, write_result))
+
+    return scenarios
+
+
+def run(base_url: str, duration: float, concurrency: int, include_writes: bool):
+    scenarios = build_scenarios(base_url, include_writes)
+    weights = [s[4] for s in scenarios]
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        local_latencies = defaultdict(list)
+        local_errors = defaultdict(int)
+        while time.perf_counter() < deadline:
+            scenario = random.choices(scenarios, weights)[0]
+            name, method, path_fn, body_fn = scenario[:4]
+            path = path_fn()
+            body = body_fn() if body_fn else None
+            start = time.perf_counter()
+            try:
+                res = session.request(method, base_url + path, json=body, timeout=30)
+                ok = res.status_code < 400
+                if len(scenario) > 5:
+                    scenario[5](res)
+            except requests.RequestException:
+                ok = False
+            local_latencies[name].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                local_errors[name] += 1
+        with lock:
+            for name, values in local_latencies.items():
+                latencies[name].extend(values)
+            for name, count in local_errors.items():
+                errors[name] += count
+
+    print(f"부하 테스트: {base_url} / {duration:.0f}초 / 동시 {concurrency}명 / 시나리오 {len(scenarios)}개")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    header = f"{'endpoint':<40} {'count':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print()
+    print(header)
+    print("-" * len(header))
+    total = 0
+    for name, *_ in scenarios:
+        values = sorted(latencies.get(name, []))
+        if not values:
+            continue
+        total += len(values)
+        print(
+            f"{name:<40} {len(values):>7} {errors.get(name, 0):>5} {len(values) / elapsed:>8.1f} "
+            f"{percentile(values, 50):>8.1f} {percentile(values, 95):>8.1f} "
+            f"{percentile(values, 99):>8.1f} {values[-1]:>8.1f}"
+        )
+    print("-" * len(header))
+    print(f"전체: {total}건, {total / elapsed:.1f} req/s, 오류 {sum(errors.values())}건 (지연 시간 단위: ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corgi Check API 부하 테스트")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="API 서버 주소")
+    parser.add_argument("--duration", type=float, default=30, help="테스트 시간 (초, 기본 30)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수 (기본 16)")
+    parser.add_argument("--writes", action="store_true", help="상태 변경(PUT) 요청도 섞기 (DB가 변경됨)")
+    args = parser.parse_args()
+
+    run(args.base_url.rstrip("/"), args.duration, args.concurrency, args.writes)
+
+
+if __name__ == '__main__':
+    main()
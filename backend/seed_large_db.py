@@ -0,0 +1,190 @@
+"""
+부하 테스트용 대용량 DB 생성기
+
+멤버 / 주차별 상태(연속 제외 구간 포함) / 주간 정산 문구를 실제와 비슷한 분포로 채운다.
+
+사용 예:
+    python seed_large_db.py --db ../loadtest.db --members 1000 --years 5
+    CORGI_CHECK_DB_PATH=../loadtest.db uvicorn app.main:app --port 8000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+# 현재 스크립트의 상위 디렉토리를 sys.path에 추가
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.database import create_db_engine
+from app.models import Base, Member, WeeklyStatus, WeeklySummary
+from app.services.chat_parser import get_birth_prefix_from_date
+from app.services.settlement import build_summary
+from app.services.weeks import week_label_of
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN_SYLLABLES = "민서준지현우영수호진성은하윤재훈동혁태경용범철희연"
+EXCLUDE_REASONS = ['illness', 'travel', 'business', 'injury', 'surgery', 'custom']
+EXCLUDE_WEIGHTS = [30, 30, 15, 12, 5, 8]
+CUSTOM_DETAILS = ['이사', '시험', '육아', '경조사', '군 훈련']
+LEFT_REASONS = ['개인 사정', '이사', '벌점 누적', '바쁜 일정']
+CHUNK_SIZE = 5000
+
+
+def random_name(rng: random.Random, used: set) -> str:
+    while True:
+        name = rng.choice(SURNAMES) + rng.choice(GIVEN_SYLLABLES) + rng.choice(GIVEN_SYLLABLES)
+        if name not in used:
+            used.add(name)
+            return name
+
+
+def generate(db_path: str, num_members: int, years: int, seed: int, left_ratio: float):
+    rng = random.Random(seed)
+    engine = create_db_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+
+    # 이번 주 월요일부터 years 년 전까지의 주차
+    today = date.today()
+    last_monday = today - timedelta(days=today.weekday())
+    num_weeks = years * 52
+    mondays = [last_monday - timedelta(weeks=num_weeks - 1 - i) for i in range(num_weeks)]
+    week_labels = [week_label_of(m) for m in mondays]
+    now_iso = datetime.now().isoformat()
+
+    started = time.perf_counter()
+
+    # 멤버: 대부분 초기 가입, 일부는 중간 가입 / 탈퇴
+    used_names = set()
+    members = []
+    for member_id in range(1, num_members + 1):
+        join_week = 0 if rng.random() < 0.6 else rng.randrange(num_weeks)
+        left_week = None
+        if rng.random() < left_ratio and join_week < num_weeks - 1:
+            left_week = rng.randrange(join_week + 1, num_weeks)
+        members.append({
+            "id": member_id,
+            "name": random_name(rng, used_names),
+            "birth_date": str(rng.randint(1975, 2005)),
+            "is_active": left_week is None,
+            "left_date": mondays[left_week].isoformat() if left_week is not None else None,
+            "left_reason": rng.choice(LEFT_REASONS) if left_week is not None else None,
+            "created_at": mondays[join_week].isoformat(),
+            "_join": join_week,
+            "_left": left_week if left_week is not None else num_weeks,
+        })
+    db.execute(insert(Member), [
+        {k: v for k, v in m.items() if not k.startswith("_")} for m in members
+    ])
+
+    # 주차별 상태 + 주간 정산 문구
+    exclude_runs = {}  # member_id -> (남은 주 수, 사유, 상세)
+    status_rows = []
+    summary_rows = []
+    total_statuses = 0
+
+    for week_idx, (monday, week_label) in enumerate(zip(mondays, week_labels)):
+        results = []
+        for m in members:
+            if not (m["_join"] <= week_idx < m["_left"]):
+                continue
+
+            run = exclude_runs.pop(m["id"], None)
+            if run is None and rng.random() < 0.04:
+                reason = rng.choices(EXCLUDE_REASONS, EXCLUDE_WEIGHTS)[0]
+                length = rng.randint(1, 2) if reason == 'travel' else rng.randint(1, 8)
+                detail = rng.choice(CUSTOM_DETAILS) if reason == 'custom' else None
+                run = (length, reason, detail)
+
+            certified_date = None
+            certified_at = None
+            exclude_reason = None
+            exclude_reason_detail = None
+            if run is not None:
+                status = "exclude"
+                remaining, exclude_reason, exclude_reason_detail = run
+                if remaining > 1:
+                    exclude_runs[m["id"]] = (remaining - 1, exclude_reason, exclude_reason_detail)
+            else:
+                status = rng.choices(["injeung", "fine", "penalty"], [85, 7, 8])[0]
+                if status == "injeung":
+                    day = monday + timedelta(days=rng.choices(range(7), [8, 10, 10, 10, 12, 20, 30])[0])
+                    certified_date = f"{day.year % 100:02d}-{day.month:02d}-{day.day:02d}"
+                    certified_at = f"{rng.randint(5, 23):02d}:{rng.randint(0, 59):02d}"
+
+            status_rows.append({
+                "member_id": m["id"],
+                "week_label": week_label,
+                "status": status,
+                "exclude_reason": exclude_reason,
+                "exclude_reason_detail": exclude_reason_detail,
+                "certified_date": certified_date,
+                "certified_at": certified_at,
+                "is_exclude_but_certified": status == "exclude" and rng.random() < 0.05,
+                "created_at": now_iso,
+            })
+            results.append({
+                "name": m["name"],
+                "birth_prefix": get_birth_prefix_from_date(m["birth_date"]),
+                "status": status,
+                "exclude_reason": exclude_reason,
+                "exclude_reason_detail": exclude_reason_detail,
+                "is_exclude_but_certified": status_rows[-1]["is_exclude_but_certified"],
+            })
+
+        # 이번 주는 아직 정산 전
+        if week_idx < num_weeks - 1:
+            summary_rows.append({
+                "week_label": week_label,
+                "summary_text": build_summary(results, monday, monday + timedelta(days=6), "운영진"),
+                "created_at": now_iso,
+            })
+
+        if len(status_rows) >= CHUNK_SIZE:
+            db.execute(insert(WeeklyStatus), status_rows)
+            total_statuses += len(status_rows)
+            status_rows = []
+
+    if status_rows:
+        db.execute(insert(WeeklyStatus), status_rows)
+        total_statuses += len(status_rows)
+    if summary_rows:
+        db.execute(insert(WeeklySummary), summary_rows)
+    db.commit()
+    db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"생성 완료: {db_path} ({elapsed:.1f}초)")
+    print(f"- 멤버: {len(members)}명 (탈퇴 {sum(1 for m in members if not m['is_active'])}명)")
+    print(f"- 주차: {num_weeks}주 ({week_labels[0]} ~ {week_labels[-1]})")
+    print(f"- 주차별 상태: {total_statuses}개")
+    print(f"- 주간 정산 문구: {len(summary_rows)}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="부하 테스트용 대용량 SQLite DB 생성")
+    parser.add_argument("--db", required=True, help="생성할 DB 파일 경로")
+    parser.add_argument("--members", type=int, default=1000, help="멤버 수 (기본 1000)")
+    parser.add_argument("--years", type=int, default=5, help="주차 이력 기간 (년, 기본 5)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (기본 42)")
+    parser.add_argument("--left-ratio", type=float, default=0.1, help="탈퇴 멤버 비율 (기본 0.1)")
+    parser.add_argument("--force", action="store_true", help="기존 파일 덮어쓰기")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            print(f"이미 존재하는 파일입니다: {args.db} (--force 로 덮어쓰기)")
+            sys.exit(1)
+        os.remove(args.db)
+
+    generate(args.db, args.members, args.years, args.seed, args.left_ratio)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+// vite build 결과(dist)에 .br / .gz 사전 압축 파일 생성
+// FastAPI(app/frontend.py)가 Accept-Encoding 에 따라 압축 파일을 그대로 보냄
+import { readdir, readFile, writeFile } from 'node:fs/promises';
+import { extname, join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib';
+
+const DIST_DIR = fileURLToPath(new URL('../dist/', import.meta.url));
+const EXTENSIONS = new Set(['.html', '.js', '.css', '.svg', '.json', '.txt', '.ico', '.map', '.webmanifest']);
+const MIN_SIZE = 1024; // 이보다 작은 파일은 압축 이득이 거의 없음
+
+async function* walk(dir) {
+  for (const entry of await readdir(dir, { withFileTypes: true })) {
+    const path = join(dir, entry.name);
+    if (entry.isDirectory()) yield* walk(path);
+    else yield path;
+  }
+}
+
+let files = 0;
+let original = 0;
+let brotli = 0;
+for await (const path of walk(DIST_DIR)) {
+  if (!EXTENSIONS.has(extname(path))) continue;
+  const data = await readFile(path);
+  if (data.length < MIN_SIZE) continue;
+
+  const br = brotliCompressSync(data, {
+    params: {
+      [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+      [constants.BROTLI_PARAM_SIZE_HINT]: data.length,
+    },
+  });
+  const gz = gzipSync(data, { level: 9 });
+  // 원본보다 작을 때만 저장 (없으면 서버가 원본을 보냄)
+  if (br.length < data.length) await writeFile(path + '.br', br);
+  if (gz.length < data.length) await writeFile(path + '.gz', gz);
+
+  files += 1;
+  original += data.length;
+  brotli += Math.min(br.length, data.length);
+}
+
+const kb = (bytes) => (bytes / 1024).toFixed(1) + 'KB';
+console.log(`compressed ${files} files: ${kb(original)} -> ${kb(brotli)} (br)`);
@@ -1,5 +1,19 @@
 const BASE = '/api';
 
+// 응답 본문이 필요한 오류 (409 version_conflict 의 current: 서버의 현재 행)
+export class ApiError extends Error {
+  status: number;
+  body: any;
+
+  constructor(message: string, status: number, body: any) {
+    super(message);
+    this.status = status;
+    this.body = body;
+  }
+}
+
+export const isConflict = (e: unknown): e is ApiError => e instanceof ApiError && e.status === 409;
+
 async function request<T>(url: string, options?: RequestInit): Promise<T> {
   const res = await fetch(`${BASE}${url}`, {
     headers: { 'Content-Type': 'application/json' },
@@ -7,11 +21,25 @@ async function request<T>(url: string, options?: RequestInit): Promise<T> {
   });
   if (!res.ok) {
     const err = await res.json().catch(() => ({}));
-    throw new Error(err.detail || res.statusText);
+    throw new ApiError(err.detail || res.statusText, res.status, err);
   }
   return res.json();
 }
 
+// GET /changes 응답 (resync 면 cursor 만 옴)
+export interface ChangesResponse {
+  resync: boolean;
+  cursor: number;
+  has_more?: boolean;
+  members?: any[];
+  deleted_members?: number[];
+  status_fields?: string[];
+  statuses?: any[][];
+  deleted_statuses?: [number, string][];
+  summaries?: { week_label: string; summary_text: string }[];
+  deleted_summaries?: string[];
+}
+
 export const api = {
   auth: {
     check: () => request<{ exists: boolean }>('/auth/check'),
@@ -30,6 +58,7 @@ export const api = {
       exclude_reason_detail?: string | null;
       consecutive_weeks?: number;
       week_start?: string | null;
+      version: number;  // 조회 때 받은 version (없으면 422, 다르면 409)
     }) =>
       request<any>('/status/' + memberId, {
         method: 'PUT',
@@ -37,6 +66,8 @@ export const api = {
       }),
     getExcludeEnd: (memberId: number, weekStart?: string) =>
       request<{ last_week_label: string | null }>('/status/' + memberId + '/exclude-end' + (weekStart ? `?week_start=${weekStart}` : '')),
+    // 상태 변경 실시간 알림 (SSE, 재연결 시 Last-Event-ID 로 자동 이어받기)
+    events: () => new EventSource(`${BASE}/status/events`),
   },
   history: {
     weeks: () => request<string[]>('/history/weeks'),
@@ -60,6 +91,11 @@ export const api = {
     remove: (id: number) =>
       request('/members/' + id, { method: 'DELETE' }),
   },
+  changes: {
+    // cursor 없이 부르면 현재 cursor 만 받음 (전체 조회 직전에 호출)
+    since: (cursor?: number) =>
+      request<ChangesResponse>(cursor === undefined ? '/changes' : `/changes?since=${cursor}`),
+  },
   admin: {
     setPassword: (password: string) =>
       request('/admin/password', {
@@ -1,6 +1,6 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { Dialog, DialogPanel, DialogTitle } from '@headlessui/react';
-import { api } from '../api/client';
+import { api, isConflict } from '../api/client';
 
 interface MemberData {
   id: number;
@@ -9,6 +9,7 @@ interface MemberData {
   is_active: boolean;
   left_date: string | null;
   left_reason: string | null;
+  version: number;
 }
 
 function sortByBirthName(list: MemberData[], asc: boolean): MemberData[] {
@@ -30,11 +31,32 @@ export default function MembersPage() {
   const [form, setForm] = useState({ name: '', birth_year: '' });
   const [leaveForm, setLeaveForm] = useState({ left_date: '', left_reason: '' });
 
-  const load = () => {
-    api.members.list(!hideLeft).then(setMembers);
+  const cursorRef = useRef<number | null>(null);
+
+  // 전체 목록(탈퇴 포함)은 처음 한 번만 받고, 이후에는 /changes 로 바뀐 멤버만 반영
+  const load = async () => {
+    const { cursor } = await api.changes.since();
+    cursorRef.current = cursor;
+    setMembers(await api.members.list(true));
+  };
+
+  const sync = async () => {
+    if (cursorRef.current === null) return load();
+    let res;
+    do {
+      res = await api.changes.since(cursorRef.current);
+      if (res.resync) return load();
+      const changed = new Map<number, MemberData>((res.members || []).map((m) => [m.id, m]));
+      const deleted = new Set(res.deleted_members || []);
+      setMembers((prev) => [
+        ...prev.filter((m) => !changed.has(m.id) && !deleted.has(m.id)),
+        ...changed.values(),
+      ]);
+      cursorRef.current = res.cursor;
+    } while (res.has_more);
   };
 
-  useEffect(() => { load(); }, [hideLeft]);
+  useEffect(() => { load(); }, []);
 
   const handleAdd = async () => {
     if (!form.name) return;
@@ -44,37 +66,48 @@ export default function MembersPage() {
     });
     setForm({ name: '', birth_year: '' });
     setShowAdd(false);
-    load();
+    sync();
   };
 
   const handleEdit = async () => {
     if (!showEdit) return;
-    await api.members.update(showEdit.id, {
-      name: form.name,
-      birth_year: form.birth_year ? Number(form.birth_year) : null,
-    });
+    try {
+      await api.members.update(showEdit.id, {
+        name: form.name,
+        birth_year: form.birth_year ? Number(form.birth_year) : null,
+        version: showEdit.version,
+      });
+    } catch (e) {
+      if (!isConflict(e)) throw e;
+      alert('다른 운영진이 먼저 수정했습니다. 최신 정보를 확인한 뒤 다시 수정해 주세요.');
+    }
     setShowEdit(null);
-    load();
+    sync();
   };
 
   const handleLeave = async () => {
     if (!showLeave || !leaveForm.left_date || !leaveForm.left_reason) return;
-    await api.members.leave(showLeave.id, leaveForm);
+    try {
+      await api.members.leave(showLeave.id, { ...leaveForm, version: showLeave.version });
+    } catch (e) {
+      if (!isConflict(e)) throw e;
+      alert('다른 운영진이 먼저 수정했습니다. 최신 정보를 확인한 뒤 다시 처리해 주세요.');
+    }
     setShowLeave(null);
     setLeaveForm({ left_date: '', left_reason: '' });
-    load();
+    sync();
   };
 
   const handleReturn = async (m: MemberData) => {
     if (!confirm(`${m.name} 멤버를 복귀 처리하시겠습니까?`)) return;
     await api.members.return(m.id);
-    load();
+    sync();
   };
 
   const handleDelete = async (m: MemberData) => {
     if (!confirm(`${m.name} 멤버를 완전히 삭제하시겠습니까? 이 작업은 되돌릴 수 없습니다.`)) return;
     await api.members.remove(m.id);
-    load();
+    sync();
   };
 
   const openEdit = (m: MemberData) => {
@@ -84,12 +117,13 @@ export default function MembersPage() {
 
   const toggleSort = () => setSortAsc(!sortAsc);
 
-  const sortedMembers = sortByBirthName(members, sortAsc);
+  const visibleMembers = hideLeft ? members.filter(m => m.is_active) : members;
+  const sortedMembers = sortByBirthName(visibleMembers, sortAsc);
 
   // 통계 계산
-  const totalCount = members.length;
-  const activeCount = members.filter(m => m.is_active).length;
-  const leftCount = members.filter(m => !m.is_active).length;
+  const totalCount = visibleMembers.length;
+  const activeCount = visibleMembers.filter(m => m.is_active).length;
+  const leftCount = visibleMembers.filter(m => !m.is_active).length;
 
   return (
     <div>
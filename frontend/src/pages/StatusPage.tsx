@@ -1,5 +1,5 @@
 import { useEffect, useState, useRef } from 'react';
-import { api } from '../api/client';
+import { api, ApiError, isConflict } from '../api/client';
 
 const EXCLUDE_OPTIONS = ['illness', 'travel', 'business', 'injury', 'surgery', 'custom'];
 const EXCLUDE_LABELS: Record<string, string> = {
@@ -21,6 +21,7 @@ interface MemberStatus {
   week_label: string;
   week_display: string;
   exclude_end_label: string | null;
+  version: number;
 }
 
 function getMonday(d: Date): Date {
@@ -127,6 +128,9 @@ export default function StatusPage() {
     return generateWeeks(16, futureCount)[futureCount];
   });
 
+  const selectedWeekRef = useRef(selectedWeek);
+  selectedWeekRef.current = selectedWeek;
+
   const showToast = (text: string) => {
     setToast(text);
     setTimeout(() => setToast(''), 1500);
@@ -150,6 +154,48 @@ export default function StatusPage() {
     });
   }, []);
 
+  // 다른 운영진의 변경을 SSE 로 받아 현황판을 부분 갱신
+  useEffect(() => {
+    const source = api.status.events();
+    const reload = () => load(selectedWeekRef.current.value);
+
+    source.addEventListener('status', (e) => {
+      const ev = JSON.parse((e as MessageEvent).data);
+      setData((prev) =>
+        prev.map((m) =>
+          m.id === ev.member_id && ev.week_labels.includes(m.week_label)
+            ? {
+                ...m,
+                status: ev.status,
+                exclude_reason: ev.exclude_reason,
+                exclude_reason_detail: ev.exclude_reason_detail,
+                exclude_end_label: ev.exclude_end_label,
+                version: ev.versions?.[m.week_label] ?? m.version,
+              }
+            : m,
+        ),
+      );
+    });
+    source.addEventListener('settlement', (e) => {
+      const ev = JSON.parse((e as MessageEvent).data);
+      const statuses = new Map<number, string>(ev.statuses);
+      const versions = new Map<number, number>(ev.versions || []);
+      setData((prev) =>
+        prev.map((m) => {
+          if (m.week_label !== ev.week_label) return m;
+          const version = versions.get(m.id) ?? m.version;
+          return statuses.has(m.id)
+            ? { ...m, status: statuses.get(m.id)!, exclude_reason: null, exclude_reason_detail: null, version }
+            : { ...m, version };
+        }),
+      );
+    });
+    source.addEventListener('reset', reload);
+    source.addEventListener('resync', reload);
+
+    return () => source.close();
+  }, []);
+
   useEffect(() => {
     const handleClickOutside = (e: MouseEvent) => {
       if (dropdownRef.current && !dropdownRef.current.contains(e.target as Node)) {
@@ -160,11 +206,32 @@ export default function StatusPage() {
     return () => document.removeEventListener('mousedown', handleClickOutside);
   }, []);
 
+  // 다른 운영진 / 정산이 먼저 고친 경우: 서버의 현재 행으로 병합하고 다시 선택하게 함
+  const mergeConflict = (e: ApiError) => {
+    const rows: any[] = e.body.current || [];
+    setData((prev) =>
+      prev.map((m) => {
+        const row = rows.find((r) => r.member_id === m.id && r.week_label === m.week_label);
+        return row
+          ? {
+              ...m,
+              status: row.status,
+              exclude_reason: row.exclude_reason,
+              exclude_reason_detail: row.exclude_reason_detail,
+              version: row.version,
+            }
+          : m;
+      }),
+    );
+    alert('다른 운영진이 먼저 변경했습니다. 최신 상태를 확인한 뒤 다시 변경해 주세요.');
+  };
+
   const handleStatusChange = async (member: MemberStatus, newStatus: string) => {
     const update: any = {
       status: newStatus,
       week_start: selectedWeek.value,
       consecutive_weeks: 1,
+      version: member.version,
     };
     if (newStatus !== 'exclude') {
       update.exclude_reason = null;
@@ -175,7 +242,8 @@ export default function StatusPage() {
       await api.status.update(member.id, update);
       load(selectedWeek.value);
     } catch (e: any) {
-      alert(e.message || '상태 변경 실패');
+      if (isConflict(e)) mergeConflict(e);
+      else alert(e.message || '상태 변경 실패');
     }
   };
 
@@ -194,10 +262,12 @@ export default function StatusPage() {
         exclude_reason_detail: detail,
         consecutive_weeks: 1,
         week_start: selectedWeek.value,
+        version: member.version,
       });
       load(selectedWeek.value);
     } catch (e: any) {
-      alert(e.message || '사유 변경 실패');
+      if (isConflict(e)) mergeConflict(e);
+      else alert(e.message || '사유 변경 실패');
     }
   };
 
@@ -215,6 +285,7 @@ export default function StatusPage() {
         exclude_reason_detail: excludeDetail || undefined,
         consecutive_weeks: numWeeks,
         week_start: selectedWeek.value,
+        version: member.version,
       });
 
       // 성공 배너 표시
@@ -255,7 +326,8 @@ export default function StatusPage() {
       // 데이터 새로고침
       load(selectedWeek.value);
     } catch (e: any) {
-      alert(e.message || '상태 변경 실패');
+      if (isConflict(e)) mergeConflict(e);
+      else alert(e.message || '상태 변경 실패');
     }
   };
 
@@ -288,6 +360,10 @@ export default function StatusPage() {
       } else {
         setSummaryText(res.summary || '');
         setShowPopup(true);
+        // 직전 중간정산 이후 벌점 대상에서 빠진 멤버
+        if (res.newly_cleared?.length) {
+          showToast(`새로 인증: ${res.newly_cleared.map((r: any) => r.birth_prefix + r.name).join(', ')}`);
+        }
       }
     } catch (e: any) {
       setMsg(e.message || '중간정산 실패');
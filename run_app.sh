@@ -1,6 +1,8 @@
 #!/bin/bash
 
 # Corgi Check 로컬 실행 스크립트
+#   ./run_app.sh         개발 모드 (uvicorn --reload + Vite dev server)
+#   ./run_app.sh --prod  프론트엔드를 빌드해 백엔드 한 프로세스로 실행
 
 echo "🐶 Corgi Check 시작 중..."
 
@@ -9,6 +11,14 @@ echo "🔧 Conda 환경 활성화..."
 eval "$(conda shell.bash hook)"
 conda activate corgi_check
 
+if [ "$1" == "--prod" ]; then
+    echo "🏗️  Frontend 빌드..."
+    (cd frontend && npm run build) || exit 1
+    echo "📍 http://localhost:8000"
+    cd backend
+    exec uvicorn app.main:app --port 8000
+fi
+
 # Backend 실행 (백그라운드)
 echo "📦 Backend 시작..."
 cd backend